@@ -0,0 +1,184 @@
+"""API HTTP local com os agregados do censo em JSON ou Arrow.
+
+Expõe os mesmos números calculados pelas páginas do Streamlit para outras
+ferramentas internas. Cada resposta leva um ETag derivado do hash dos dados
+e dos parâmetros, e um Cache-Control público: clientes e proxies reutilizam
+a resposta, e um If-None-Match válido recebe 304 sem passar pelo cálculo.
+
+Uso: python api.py [--host 127.0.0.1] [--porta 8502] [--csv GALINACEOS.csv]
+"""
+import argparse
+import hashlib
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from dados import (
+    CAMINHO_CSV,
+    ErroConsistencia,
+    banco_configurado,
+    estabelecimentos_por_classe,
+    ler_censo,
+    matrizes_por_uf,
+    producao_por_sistema,
+)
+from dados.cache import cache_resultados
+from dados.versao import versao_arquivo
+
+try:
+    import pyarrow as pa
+except ImportError:  # sem pyarrow a API responde apenas JSON
+    pa = None
+
+MAX_AGE = 300
+TIPO_ARROW = "application/vnd.apache.arrow.stream"
+
+# Rota -> (função de agregação, parâmetros aceitos com seus valores padrão)
+ROTAS = {
+    "/matrizes-por-uf": (matrizes_por_uf, {"medida": "GAL_MATR"}),
+    "/producao-por-sistema": (producao_por_sistema, {"medida": "GAL_VEND", "nivel": "BR"}),
+    "/estabelecimentos-por-classe": (
+        estabelecimentos_por_classe,
+        {"medida": "E_TEM_GAL", "nivel": "BR", "sistema": None},
+    ),
+}
+
+
+class FonteDados:
+    """Quadro do CSV (recarregado quando o arquivo muda) ou banco embarcado."""
+
+    def __init__(self, caminho_csv=CAMINHO_CSV):
+        self.caminho_csv = caminho_csv
+        self.banco = banco_configurado()
+        self._trava = threading.Lock()
+
+    def versao(self):
+        caminho = self.banco.caminho if self.banco is not None else self.caminho_csv
+        return versao_arquivo(caminho)
+
+    def agregar(self, funcao, versao, **parametros):
+        if self.banco is not None:
+            # Conexões DuckDB/SQLite não aceitam consultas simultâneas
+            with self._trava:
+                return funcao(self.banco, **parametros)
+        quadro = cache_resultados.obter_ou_calcular(
+            ("quadro", versao), lambda: ler_censo(self.caminho_csv)
+        )
+        return funcao(quadro, **parametros)
+
+
+def calcular_etag(versao, rota, parametros, formato):
+    chave = json.dumps([versao, rota, parametros, formato], sort_keys=True)
+    return '"' + hashlib.sha256(chave.encode()).hexdigest()[:32] + '"'
+
+
+def serializar(resultado, versao, formato):
+    if formato == "arrow":
+        tabela = pa.Table.from_pandas(resultado, preserve_index=False)
+        tabela = tabela.replace_schema_metadata({"versao": versao})
+        destino = pa.BufferOutputStream()
+        with pa.ipc.new_stream(destino, tabela.schema) as escritor:
+            escritor.write_table(tabela)
+        return destino.getvalue().to_pybytes()
+    registros = resultado.to_json(orient="records", force_ascii=False)
+    return f'{{"versao": "{versao}", "dados": {registros}}}'.encode("utf-8")
+
+
+class ManipuladorAPI(BaseHTTPRequestHandler):
+    fonte = None  # definida em servir()
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/versao":
+            self._responder_json(200, {"versao": self.fonte.versao()})
+            return
+        if url.path not in ROTAS:
+            self._responder_json(404, {"erro": f"Rota desconhecida: {url.path}", "rotas": sorted(ROTAS)})
+            return
+
+        funcao, padroes = ROTAS[url.path]
+        consulta = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        formato = self._formato(consulta.pop("formato", None))
+        if formato is None:
+            self._responder_json(406, {"erro": "Formato Arrow indisponível (pyarrow não instalado)."})
+            return
+        desconhecidos = set(consulta) - set(padroes)
+        if desconhecidos:
+            self._responder_json(400, {"erro": f"Parâmetros desconhecidos: {sorted(desconhecidos)}"})
+            return
+        parametros = {**padroes, **consulta}
+
+        versao = self.fonte.versao()
+        etag = calcular_etag(versao, url.path, parametros, formato)
+        if etag in _etags_enviados(self.headers.get("If-None-Match")):
+            self._responder(304, b"", None, etag)
+            return
+
+        def calcular():
+            resultado = self.fonte.agregar(funcao, versao, **parametros)
+            return serializar(resultado, versao, formato)
+
+        try:
+            corpo = cache_resultados.obter_ou_calcular(("api", etag), calcular)
+        except ErroConsistencia as erro:
+            # Os dados do servidor não fecham (BR, GR e UF): não é erro do pedido
+            self._responder_json(503, {"erro": str(erro)})
+            return
+        except ValueError as erro:
+            self._responder_json(400, {"erro": str(erro)})
+            return
+        tipo = TIPO_ARROW if formato == "arrow" else "application/json; charset=utf-8"
+        self._responder(200, corpo, tipo, etag)
+
+    def _formato(self, pedido):
+        if pedido is None:
+            pedido = "arrow" if TIPO_ARROW in self.headers.get("Accept", "") else "json"
+        if pedido == "arrow" and pa is None:
+            return None
+        return "arrow" if pedido == "arrow" else "json"
+
+    def _responder(self, status, corpo, tipo, etag=None):
+        self.send_response(status)
+        if tipo:
+            self.send_header("Content-Type", tipo)
+        if etag:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", f"public, max-age={MAX_AGE}")
+            self.send_header("Vary", "Accept")
+        if status != 304:
+            self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        if corpo:
+            self.wfile.write(corpo)
+
+    def _responder_json(self, status, conteudo):
+        corpo = json.dumps(conteudo, ensure_ascii=False).encode("utf-8")
+        self._responder(status, corpo, "application/json; charset=utf-8")
+
+
+def _etags_enviados(cabecalho):
+    if not cabecalho:
+        return set()
+    return {parte.strip().removeprefix("W/") for parte in cabecalho.split(",")}
+
+
+def servir(host="127.0.0.1", porta=8502, caminho_csv=CAMINHO_CSV):
+    ManipuladorAPI.fonte = FonteDados(caminho_csv)
+    servidor = ThreadingHTTPServer((host, porta), ManipuladorAPI)
+    print(f"API do censo em http://{host}:{porta} (rotas: {', '.join(sorted(ROTAS))})")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="API local dos agregados do censo.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8502)
+    parser.add_argument("--csv", default=str(CAMINHO_CSV))
+    args = parser.parse_args()
+    servir(args.host, args.porta, args.csv)
@@ -0,0 +1,32 @@
+"""Camada de dados compartilhada pelas páginas do painel."""
+from .agregacoes import agregar, estabelecimentos_por_classe, matrizes_por_uf, producao_por_sistema
+from .carregamento import (
+    TAMANHO_BLOCO,
+    colunas_leitura,
+    compactar_medidas,
+    gravar_instantaneo,
+    instantaneo_atual,
+    ler_censo,
+    mapear_distintos,
+    preparar_dimensoes,
+)
+from .compartilhado import congelar, vista
+from .cubo import CuboCenso, montar_cubo
+from .derivadas import DERIVADAS, DESCRICAO_DERIVADAS, acrescentar_derivadas, dividir
+from .distribuicao import MEDIDAS_DISTRIBUICAO, NIVEIS_DISTRIBUICAO, DistribuicaoBanco, DistribuicaoPorte
+from .esquema import (
+    CAMINHO_CSV,
+    CAMINHO_DESCRICOES,
+    CHAVES,
+    CLASSE_TOTAL,
+    COLUNAS,
+    DIMENSOES,
+    MAPEAMENTO_SISTEMAS,
+    MEDIDAS,
+    NIVEIS,
+    REGIOES,
+    SISTEMAS,
+    TIPOS_MEDIDAS,
+)
+from .sql import BancoCenso, banco_configurado, banco_das_paginas, versao_banco
+from .validacao import ErroConsistencia, validar_hierarquia, verificar_hierarquia
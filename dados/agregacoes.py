@@ -0,0 +1,74 @@
+"""Agregações usadas pelas páginas, sobre o quadro em memória ou o banco embarcado.
+
+Todas filtram um único nível territorial: o CSV empilha Brasil, regiões e
+estados, e somar sem filtrar conta o mesmo estabelecimento até três vezes.
+Totais por território usam a linha "Total" (classe 10), que inclui os
+valores sob sigilo nas classes.
+"""
+from .derivadas import DERIVADAS, dividir
+from .esquema import CLASSE_TOTAL, COLUNAS
+
+
+def _validar_colunas(*colunas):
+    for col in colunas:
+        if col not in COLUNAS and col not in DERIVADAS:
+            raise ValueError(f"Coluna desconhecida no censo: {col!r}")
+
+
+def agregar(fonte, medida, por, nivel, sistema=None, classes="total", regiao=None):
+    """Soma ``medida`` agrupando por ``por`` dentro de um nível territorial.
+
+    ``fonte`` é o quadro do censo ou um ``BancoCenso``; no segundo caso a
+    consulta é executada no banco. ``classes`` é ``"total"`` (só a linha
+    Total) ou ``"faixas"`` (as classes de cabeças, sem a linha Total).
+    ``regiao`` (código da grande região) restringe GR e UF a uma região.
+    Para uma derivada, soma numerador e denominador e divide as somas.
+    """
+    por = [por] if isinstance(por, str) else list(por)
+    _validar_colunas(medida, *por)
+    if classes not in ("total", "faixas"):
+        raise ValueError("classes deve ser 'total' ou 'faixas'")
+
+    if medida in DERIVADAS:
+        num, den, _ = DERIVADAS[medida]
+        resultado = agregar(fonte, num, por, nivel, sistema=sistema, classes=classes, regiao=regiao)
+        denominador = agregar(fonte, den, por, nivel, sistema=sistema, classes=classes, regiao=regiao)
+        resultado[medida] = dividir(resultado[num], denominador[den])
+        return resultado[por + [medida]]
+
+    if not hasattr(fonte, "columns"):
+        return fonte.agregar(medida, por, nivel, sistema=sistema, classes=classes, regiao=regiao)
+
+    mascara = fonte["NIV_TERR"] == nivel
+    if classes == "total":
+        mascara &= fonte["CL_GAL"] == CLASSE_TOTAL
+    else:
+        mascara &= fonte["CL_GAL"] != CLASSE_TOTAL
+    if sistema is not None:
+        mascara &= fonte["SIST_CRIA"] == sistema
+    if regiao is not None:
+        # Região de cada território: o próprio código em GR, código // 10 em UF
+        codigos = fonte["COD_TERR"] if nivel == "GR" else fonte["COD_TERR"] // 10
+        mascara &= codigos == regiao
+    return (
+        fonte.loc[mascara, por + [medida]]
+        .groupby(por, as_index=False, sort=True)[medida]
+        .sum(min_count=1)
+    )
+
+
+def matrizes_por_uf(fonte, medida="GAL_MATR"):
+    """Total de matrizes (ou outra medida) por estado, em ordem decrescente."""
+    resultado = agregar(fonte, medida, "NOM_TERR", "UF")
+    return resultado.sort_values(medida, ascending=False, ignore_index=True)
+
+
+def producao_por_sistema(fonte, medida, nivel="BR"):
+    """Soma da medida por sistema de criação em um nível territorial."""
+    return agregar(fonte, medida, "SIST_CRIA", nivel)
+
+
+def estabelecimentos_por_classe(fonte, medida="E_TEM_GAL", nivel="BR", sistema=None, regiao=None):
+    """Estabelecimentos por classe de cabeças, na ordem das classes do IBGE."""
+    return agregar(fonte, medida, ["CL_GAL", "NOM_CL_GAL"], nivel, sistema=sistema, classes="faixas",
+                   regiao=regiao)
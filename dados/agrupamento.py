@@ -0,0 +1,196 @@
+"""Agrupamento de territórios pelo perfil da avicultura.
+
+Cada território (UF; municípios quando o arquivo os tiver) vira uma linha de
+atributos relativos, comparáveis entre estados grandes e pequenos:
+
+- composição do plantel por sistema de criação (parcela de ``GAL_TOTAL``);
+- distribuição dos estabelecimentos por classe de cabeças (``E_TEM_GAL``);
+- intensidade de mão de obra (aves e estabelecimentos por trabalhador);
+- orientação ao mercado (estabelecimentos que comercializam, parcela das
+  aves e dos ovos vendida).
+
+As colunas são padronizadas (escore z; ausente vira a média) e o k-means
+(com vários reinícios) e o hierárquico (Ward) rodam para cada k de uma
+faixa. Os ajustes são independentes e vão para um pool de processos; o
+resultado guarda os rótulos de cada (método, k) e a silhueta de cada um.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from .derivadas import dividir
+from .esquema import CLASSE_TOTAL
+
+FAIXA_K = range(2, 9)
+REINICIOS = 10
+METODOS = ["kmeans", "hierarquico"]
+NOMES_METODOS = {"kmeans": "k-means", "hierarquico": "Hierárquico (Ward)"}
+
+# Classes de cabeças que entram no perfil (0 = sem galináceos, 10 = total)
+CLASSES_PERFIL = range(1, 10)
+
+
+def matriz_perfis(cubo, nivel="UF"):
+    """Quadro território × atributo (valores brutos, antes da padronização)."""
+    linhas = np.flatnonzero(cubo.mascara_nivel(nivel))
+    valores = cubo.valores[linhas]
+    classes = cubo.classes["CL_GAL"].tolist()
+    total = classes.index(CLASSE_TOTAL)
+
+    def medida(nome):
+        return valores[..., cubo.indice_medida(nome)]
+
+    # Somas de todos os sistemas, na classe total (ausente conta como zero)
+    def soma_sistemas(nome):
+        return np.nansum(medida(nome)[:, :, total], axis=1)
+
+    atributos = {}
+    plantel = medida("GAL_TOTAL")[:, :, total]
+    for s, sistema in enumerate(cubo.sistemas):
+        atributos[f"SIST_{sistema}"] = dividir(np.nan_to_num(plantel[:, s]), soma_sistemas("GAL_TOTAL"))
+
+    estab_classe = np.nansum(medida("E_TEM_GAL"), axis=1)
+    posicoes = [classes.index(c) for c in CLASSES_PERFIL if c in classes]
+    estab_perfil = estab_classe[:, posicoes].sum(axis=1)
+    for c in posicoes:
+        atributos[f"CLASSE_{classes[c]}"] = dividir(estab_classe[:, c], estab_perfil)
+
+    trabalhadores = soma_sistemas("N_TRAB_TOTAL")
+    atributos["GAL_POR_TRAB"] = np.log1p(dividir(soma_sistemas("GAL_TOTAL"), trabalhadores))
+    atributos["TRAB_POR_ESTAB"] = dividir(trabalhadores, soma_sistemas("E_TEM_GAL"))
+    atributos["ESTAB_COMERC"] = dividir(soma_sistemas("E_COMERC"), soma_sistemas("E_TEM_GAL"))
+    atributos["GAL_VENDIDAS"] = dividir(soma_sistemas("GAL_VEND"), soma_sistemas("GAL_TOTAL"))
+    atributos["OVOS_VENDIDOS"] = dividir(soma_sistemas("Q_DZ_VEND"), soma_sistemas("Q_DZ_PROD"))
+
+    territorios = cubo.territorios.iloc[linhas]
+    return pd.DataFrame(atributos, index=pd.Index(territorios["NOM_TERR"].to_numpy(), name="NOM_TERR"))
+
+
+def padronizar(perfis):
+    """Escore z de cada coluna; ausentes viram 0 (a média) e colunas constantes, 0."""
+    valores = perfis.to_numpy(dtype="float64")
+    media = np.nanmean(valores, axis=0)
+    desvio = np.nanstd(valores, axis=0)
+    z = np.zeros(valores.shape)
+    np.divide(valores - media, desvio, out=z, where=desvio > 0)
+    return np.nan_to_num(z)
+
+
+def _ajustar(tarefa):
+    """(método, k, semente, matriz) → (método, k, semente, rótulos, inércia)."""
+    from sklearn.cluster import AgglomerativeClustering, KMeans
+
+    metodo, k, semente, matriz = tarefa
+    if metodo == "kmeans":
+        modelo = KMeans(n_clusters=k, n_init=1, random_state=semente).fit(matriz)
+        return metodo, k, semente, modelo.labels_, modelo.inertia_
+    rotulos = AgglomerativeClustering(n_clusters=k, linkage="ward").fit_predict(matriz)
+    return metodo, k, semente, rotulos, _inercia(matriz, rotulos)
+
+
+def _inercia(matriz, rotulos):
+    """Soma dos quadrados dentro dos grupos."""
+    return float(sum(((matriz[rotulos == g] - matriz[rotulos == g].mean(axis=0)) ** 2).sum()
+                     for g in np.unique(rotulos)))
+
+
+class Agrupamentos:
+    """Rótulos e silhueta de cada (método, k) de um conjunto de territórios."""
+
+    def __init__(self, perfis, matriz, resumo, rotulos):
+        self.perfis = perfis  # atributos brutos, território × atributo
+        self.matriz = matriz  # atributos padronizados (entrada dos modelos)
+        self.resumo = resumo  # METODO, K, SILHUETA, INERCIA, REINICIOS
+        self.rotulos = rotulos  # {(método, k): grupo de cada território, a partir de 1}
+
+    def melhor(self, metodo):
+        """k de maior silhueta para o método."""
+        do_metodo = self.resumo[self.resumo["METODO"] == metodo]
+        return int(do_metodo.loc[do_metodo["SILHUETA"].idxmax(), "K"])
+
+    def grupos(self, metodo, k):
+        return pd.Series(self.rotulos[(metodo, k)], index=self.perfis.index, name="GRUPO")
+
+    def centroides(self, metodo, k):
+        """Média padronizada de cada atributo por grupo (grupo × atributo)."""
+        matriz = pd.DataFrame(self.matriz, index=self.perfis.index, columns=self.perfis.columns)
+        return matriz.groupby(self.rotulos[(metodo, k)]).mean().rename_axis("GRUPO")
+
+
+def agrupar(perfis, faixa_k=FAIXA_K, reinicios=REINICIOS, metodos=METODOS, processos=None):
+    """Ajusta todos os modelos em um pool de processos e escolhe o melhor reinício de cada k.
+
+    ``processos=0`` ajusta no próprio processo (útil para depurar). O pool é
+    o do joblib (loky), o mesmo do scikit-learn: os processos são iniciados
+    sem reexecutar o script principal (a página do Streamlit), ficam vivos
+    entre chamadas e têm as threads de BLAS/OpenMP limitadas, para não
+    disputarem os núcleos.
+    """
+    from joblib import Parallel, delayed
+    from sklearn.metrics import silhouette_score
+
+    matriz = padronizar(perfis)
+    faixa_k = [k for k in faixa_k if 2 <= k < len(matriz)]
+    tarefas = [
+        (metodo, k, semente, matriz)
+        for metodo in metodos
+        for k in faixa_k
+        # O hierárquico é determinístico: um ajuste por k
+        for semente in (range(reinicios) if metodo == "kmeans" else [0])
+    ]
+    if processos == 0:
+        ajustes = list(map(_ajustar, tarefas))
+    else:
+        processos = processos or min(len(tarefas), os.cpu_count() or 1)
+        ajustes = Parallel(n_jobs=processos, backend="loky", batch_size="auto")(
+            delayed(_ajustar)(tarefa) for tarefa in tarefas
+        )
+
+    # Menor inércia entre os reinícios de cada (método, k)
+    melhores = {}
+    for metodo, k, semente, rotulos, inercia in ajustes:
+        if (metodo, k) not in melhores or inercia < melhores[(metodo, k)][1]:
+            melhores[(metodo, k)] = (rotulos, inercia)
+
+    linhas, rotulos = [], {}
+    for (metodo, k), (rotulos_k, inercia) in melhores.items():
+        rotulos[(metodo, k)] = rotulos_k + 1
+        linhas.append({
+            "METODO": metodo,
+            "K": k,
+            "SILHUETA": silhouette_score(matriz, rotulos_k),
+            "INERCIA": inercia,
+            "REINICIOS": reinicios if metodo == "kmeans" else 1,
+        })
+    return Agrupamentos(perfis, matriz, pd.DataFrame(linhas), rotulos)
+
+
+if __name__ == "__main__":
+    import time
+
+    from .carregamento import ler_censo
+    from .cubo import montar_cubo
+
+    perfis = matriz_perfis(montar_cubo(ler_censo(validar=False)))
+    print(f"{perfis.shape[0]} territórios × {perfis.shape[1]} atributos")
+
+    agrupar(perfis, faixa_k=[2], reinicios=1, processos=0)  # importa o scikit-learn
+    inicio = time.perf_counter()
+    sequencial = agrupar(perfis, processos=0)
+    print(f"no processo: {time.perf_counter() - inicio:.2f}s")
+
+    processos = max(2, os.cpu_count() or 1)
+    for rodada in ("a frio", "com o pool aquecido"):
+        inicio = time.perf_counter()
+        resultado = agrupar(perfis, processos=processos)
+        print(f"pool de {processos} processos, {rodada}: {time.perf_counter() - inicio:.2f}s")
+    pd.testing.assert_frame_equal(resultado.resumo, sequencial.resumo)
+
+    print(resultado.resumo.to_string(index=False))
+    for metodo in METODOS:
+        k = resultado.melhor(metodo)
+        grupos = resultado.grupos(metodo, k)
+        print(f"\n{NOMES_METODOS[metodo]}, k={k}:")
+        for grupo, estados in grupos.groupby(grupos).groups.items():
+            print(f"  {grupo}: {', '.join(estados)}")
@@ -0,0 +1,134 @@
+"""Triagem de valores atípicos entre as UFs, para todas as medidas e sistemas.
+
+Sobre o cubo, cada combinação sistema × medida da classe total é uma coluna
+e cada UF uma linha. Numa única passada matricial:
+
+- escore z robusto: ``(x - mediana) / (1,4826 · MAD)``, insensível aos
+  próprios valores extremos que se quer achar (a média e o desvio padrão
+  seriam puxados por SP ou MG);
+- razão à região: o valor da UF sobre a média das UFs da sua Grande Região
+  (matriz de incidência regiões × UFs), que separa o estado atípico do
+  estado típico de uma região atípica.
+
+Com poucas UFs e caudas longas, o MAD pode ser degenerado: zero, ou
+minúsculo diante da dispersão da coluna (em E_FINANC_INTEG do sistema
+POC, mediana 3,5 e MAD escalado 3,7 davam z perto de 200). A escala tem
+então um piso, uma fração do desvio absoluto médio escalado (1,2533 ·
+média de ``|x - mediana|``, o substituto de Iglewicz e Hoaglin quando o
+MAD é zero). Colunas sem dispersão nenhuma ficam sem escore, em vez de
+produzir infinitos.
+"""
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from .esquema import CLASSE_TOTAL
+
+# |z| a partir do qual o valor é considerado atípico (Iglewicz e Hoaglin)
+LIMIAR_Z = 3.5
+
+# Torna o MAD e o desvio absoluto médio comparáveis ao desvio padrão em dados normais
+ESCALA_MAD = 1.4826
+ESCALA_DESVIO_MEDIO = 1.2533
+
+# Piso da escala, em fração do desvio absoluto médio escalado (em dados normais os dois coincidem;
+# nas colunas do censo o MAD fica, na mediana, em metade dele)
+FRACAO_MINIMA_MAD = 0.25
+
+COLUNAS_TRIAGEM = [
+    "COD_TERR", "NOM_TERR", "REGIAO", "SIST_CRIA", "MEDIDA",
+    "VALOR", "MEDIANA", "MAD", "Z_ROBUSTO", "RAZAO_REGIAO",
+]
+
+
+def escores_robustos(valores):
+    """Mediana, MAD escalado (com o piso) e escore z de cada coluna de ``valores`` (UF no eixo 0)."""
+    with warnings.catch_warnings():
+        # Colunas inteiramente sem valor dão NaN, que é o resultado esperado
+        warnings.simplefilter("ignore", RuntimeWarning)
+        mediana = np.nanmedian(valores, axis=0)
+        desvios = np.abs(valores - mediana)
+        mad = ESCALA_MAD * np.nanmedian(desvios, axis=0)
+        piso = FRACAO_MINIMA_MAD * ESCALA_DESVIO_MEDIO * np.nanmean(desvios, axis=0)
+    mad = np.fmax(mad, piso)
+    z = np.full(valores.shape, np.nan)
+    np.divide(valores - mediana, mad, out=z, where=mad > 0)
+    return mediana, mad, z
+
+
+def razao_regiao(valores, regiao_de):
+    """Valor de cada UF sobre a média das UFs informadas da sua região."""
+    regioes, posicao = np.unique(regiao_de, return_inverse=True)
+    incidencia = np.zeros((len(regioes), len(regiao_de)))
+    incidencia[posicao, np.arange(len(regiao_de))] = 1.0
+    ausentes = np.isnan(valores)
+    soma = incidencia @ np.where(ausentes, 0.0, valores)
+    contagem = incidencia @ ~ausentes
+    media = np.full(soma.shape, np.nan)
+    np.divide(soma, contagem, out=media, where=contagem > 0)
+    media_da_uf = media[posicao]
+    razao = np.full(valores.shape, np.nan)
+    np.divide(valores, media_da_uf, out=razao, where=media_da_uf != 0)
+    return razao
+
+
+def triagem(cubo, classe=CLASSE_TOTAL):
+    """Quadro longo UF × sistema × medida com escore robusto e razão à região."""
+    territorios = cubo.territorios
+    ufs = np.flatnonzero(cubo.mascara_nivel("UF"))
+    c = cubo.classes["CL_GAL"].tolist().index(classe)
+    n_sist, n_med = len(cubo.sistemas), len(cubo.medidas)
+
+    # (UF, sistema × medida): todas as colunas tratadas na mesma operação
+    valores = cubo.valores[ufs, :, c, :].reshape(len(ufs), -1)
+    codigos = territorios["COD_TERR"].to_numpy()[ufs]
+    regiao_de = codigos // 10
+
+    mediana, mad, z = escores_robustos(valores)
+    razao = razao_regiao(valores, regiao_de)
+
+    grandes_regioes = territorios[territorios["NIV_TERR"] == "GR"]
+    nome_regiao = dict(zip(grandes_regioes["COD_TERR"], grandes_regioes["NOM_TERR"]))
+
+    n_colunas = n_sist * n_med
+    return pd.DataFrame({
+        "COD_TERR": np.repeat(codigos, n_colunas),
+        "NOM_TERR": np.repeat(territorios["NOM_TERR"].to_numpy()[ufs], n_colunas),
+        "REGIAO": np.repeat([nome_regiao.get(r) for r in regiao_de], n_colunas),
+        "SIST_CRIA": np.tile(np.repeat(np.asarray(cubo.sistemas, dtype=object), n_med), len(ufs)),
+        "MEDIDA": np.tile(np.asarray(cubo.medidas, dtype=object), n_sist * len(ufs)),
+        "VALOR": valores.ravel(),
+        "MEDIANA": np.tile(mediana, len(ufs)),
+        "MAD": np.tile(mad, len(ufs)),
+        "Z_ROBUSTO": z.ravel(),
+        "RAZAO_REGIAO": razao.ravel(),
+    }, columns=COLUNAS_TRIAGEM)
+
+
+def principais(tabela, n=20, limiar=LIMIAR_Z):
+    """As ``n`` células com maior |z| acima do limiar."""
+    magnitude = tabela["Z_ROBUSTO"].abs()
+    selecionadas = tabela[magnitude >= limiar]
+    ordem = magnitude[selecionadas.index].sort_values(ascending=False).index
+    return selecionadas.loc[ordem[:n]]
+
+
+if __name__ == "__main__":
+    import time
+
+    from .carregamento import ler_censo
+    from .cubo import montar_cubo
+
+    cubo = montar_cubo(ler_censo(validar=False))
+    triagem(cubo)
+    repeticoes = 50
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        tabela = triagem(cubo)
+    decorrido = 1000 * (time.perf_counter() - inicio) / repeticoes
+    print(f"{len(cubo.sistemas)} sistemas × {len(cubo.medidas)} medidas × "
+          f"{int(cubo.mascara_nivel('UF').sum())} UFs: triagem em {decorrido:.2f} ms")
+    atipicos = principais(tabela, n=10)
+    print(f"{int((tabela['Z_ROBUSTO'].abs() >= LIMIAR_Z).sum())} células com |z| ≥ {LIMIAR_Z}; as maiores:")
+    print(atipicos[["NOM_TERR", "SIST_CRIA", "MEDIDA", "VALOR", "Z_ROBUSTO", "RAZAO_REGIAO"]].to_string(index=False))
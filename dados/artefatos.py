@@ -0,0 +1,102 @@
+"""Artefatos pré-calculados pelo ``precomputar.py`` e lidos pelas páginas.
+
+A pasta (``artefatos/`` na raiz, ou ``PAINEL_ARTEFATOS`` no ambiente) guarda
+um arquivo por artefato e um ``manifesto.json`` com, para cada um, o arquivo,
+a versão dos arquivos de origem de que ele foi calculado (``origem``) e o
+hash das entradas usado para pular o que já está em dia. ``ler`` só devolve
+o artefato se a origem registrada for a versão pedida: com o CSV alterado,
+a página volta a calcular sozinha até o próximo ``precomputar.py``.
+
+O formato sai da extensão: ``.parquet`` (quadros), ``.fig.json`` (figuras
+Plotly), ``.json`` e ``.pkl`` (demais objetos).
+"""
+import json
+import os
+import pickle
+import threading
+from pathlib import Path
+
+import pandas as pd
+import plotly.io as pio
+
+from .esquema import CAMINHO_CSV
+
+VARIAVEL_AMBIENTE = "PAINEL_ARTEFATOS"
+PASTA_PADRAO = CAMINHO_CSV.parent / "artefatos"
+MANIFESTO = "manifesto.json"
+
+_trava = threading.Lock()
+_manifestos = {}  # pasta -> (mtime_ns, manifesto)
+
+
+def pasta_artefatos():
+    return Path(os.environ.get(VARIAVEL_AMBIENTE) or PASTA_PADRAO)
+
+
+def ler_manifesto(pasta=None):
+    """Manifesto da pasta (relido só quando o arquivo muda); vazio se não houver."""
+    caminho = Path(pasta or pasta_artefatos()) / MANIFESTO
+    try:
+        mtime = caminho.stat().st_mtime_ns
+    except FileNotFoundError:
+        return {}
+    with _trava:
+        guardado = _manifestos.get(caminho)
+    if guardado is not None and guardado[0] == mtime:
+        return guardado[1]
+    try:
+        manifesto = json.loads(caminho.read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    with _trava:
+        _manifestos[caminho] = (mtime, manifesto)
+    return manifesto
+
+
+def gravar_manifesto(manifesto, pasta=None):
+    pasta = Path(pasta or pasta_artefatos())
+    temporario = pasta / (MANIFESTO + ".tmp")
+    temporario.write_text(json.dumps(manifesto, indent=2, ensure_ascii=False, sort_keys=True), encoding="utf-8")
+    os.replace(temporario, pasta / MANIFESTO)
+
+
+def gravar(objeto, caminho):
+    """Grava ``objeto`` no formato da extensão de ``caminho``, de uma vez (rename atômico)."""
+    caminho = Path(caminho)
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    temporario = caminho.with_name(f".{caminho.name}.{os.getpid()}.tmp")
+    if caminho.name.endswith(".parquet"):
+        objeto.to_parquet(temporario, index=False)
+    elif caminho.name.endswith(".fig.json"):
+        pio.write_json(objeto, temporario)
+    elif caminho.suffix == ".json":
+        temporario.write_text(json.dumps(objeto, ensure_ascii=False), encoding="utf-8")
+    else:
+        temporario.write_bytes(pickle.dumps(objeto, protocol=pickle.HIGHEST_PROTOCOL))
+    os.replace(temporario, caminho)
+    return caminho
+
+
+def carregar(caminho):
+    if caminho.name.endswith(".parquet"):
+        return pd.read_parquet(caminho)
+    if caminho.name.endswith(".fig.json"):
+        return pio.read_json(caminho)
+    if caminho.suffix == ".json":
+        return json.loads(caminho.read_text(encoding="utf-8"))
+    return pickle.loads(caminho.read_bytes())
+
+
+def ler(nome, **versoes):
+    """O artefato ``nome`` se ele foi calculado das ``versoes`` pedidas (ex.: ``censo=...``), senão None."""
+    pasta = pasta_artefatos()
+    registro = ler_manifesto(pasta).get(nome)
+    if registro is None:
+        return None
+    origem = registro.get("origem", {})
+    if any(origem.get(ativo) != versao for ativo, versao in versoes.items()):
+        return None
+    try:
+        return carregar(pasta / registro["arquivo"])
+    except (OSError, ValueError, pickle.UnpicklingError):
+        return None
@@ -0,0 +1,213 @@
+"""Cache de resultados compartilhado entre requisições e sessões.
+
+``CacheMemoria`` vale para o processo. ``CacheDisco`` guarda os resultados
+num arquivo SQLite que todos os processos do host (réplicas do painel atrás
+de um balanceador, a API) leem e escrevem: o que uma réplica calculou as
+outras recebem prontas. Com ``PAINEL_CACHE_DISCO=<arquivo>`` no ambiente,
+``cache_disco`` aponta para ele e as funções marcadas com ``persistente``
+passam a consultá-lo antes de calcular. As chaves incluem a versão dos dados
+(ver ``versao.registro_versoes``) e a do código, então arquivos ou deploys
+novos nunca leem resultados velhos; os velhos saem pela política LRU,
+limitada em bytes.
+"""
+import functools
+import hashlib
+import inspect
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from .versao import versao_arquivo
+
+# Arquivo do cache em disco compartilhado, quando definido no ambiente
+VARIAVEL_AMBIENTE = "PAINEL_CACHE_DISCO"
+VARIAVEL_TAMANHO = "PAINEL_CACHE_DISCO_MB"
+MAX_MB_PADRAO = 512
+
+# Raiz do painel: só os módulos daqui entram na impressão do código de ``persistente``
+RAIZ = Path(__file__).resolve().parent.parent
+
+
+class CacheMemoria:
+    """Dicionário LRU limitado a ``max_itens`` entradas, seguro entre threads."""
+
+    def __init__(self, max_itens=256):
+        self.max_itens = max_itens
+        self._itens = OrderedDict()
+        self._trava = threading.Lock()
+
+    def obter(self, chave, padrao=None):
+        with self._trava:
+            if chave not in self._itens:
+                return padrao
+            self._itens.move_to_end(chave)
+            return self._itens[chave]
+
+    def guardar(self, chave, valor):
+        with self._trava:
+            self._itens[chave] = valor
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.max_itens:
+                self._itens.popitem(last=False)
+
+    def obter_ou_calcular(self, chave, calcular):
+        """Devolve o valor em cache ou calcula, guarda e devolve."""
+        valor = self.obter(chave, _AUSENTE)
+        if valor is _AUSENTE:
+            valor = calcular()
+            self.guardar(chave, valor)
+        return valor
+
+    def limpar(self):
+        with self._trava:
+            self._itens.clear()
+
+    def __len__(self):
+        return len(self._itens)
+
+
+_AUSENTE = object()
+
+def _chave_disco(chave):
+    """Chave textual estável (entre processos) de uma chave de tuplas, textos e números."""
+    return hashlib.sha256(pickle.dumps(chave, protocol=4)).hexdigest()
+
+
+class CacheDisco:
+    """Cache LRU em SQLite, limitado a ``max_bytes`` e compartilhado pelos processos do host.
+
+    Os valores vão em pickle. Cada gravação é uma transação (o SQLite
+    garante que nenhum processo lê um valor pela metade) e, em modo WAL,
+    leituras de uma réplica não esperam as gravações das outras.
+    """
+
+    def __init__(self, caminho, max_bytes=MAX_MB_PADRAO << 20):
+        self.caminho = os.fspath(caminho)
+        self.max_bytes = max_bytes
+        self._trava = threading.Lock()
+        self._conexao = sqlite3.connect(self.caminho, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conexao.execute("PRAGMA journal_mode=WAL")
+        self._conexao.execute("PRAGMA synchronous=NORMAL")
+        self._conexao.execute(
+            "CREATE TABLE IF NOT EXISTS itens ("
+            "chave TEXT PRIMARY KEY, valor BLOB NOT NULL, tamanho INTEGER NOT NULL, acesso REAL NOT NULL)"
+        )
+        self._conexao.execute("CREATE INDEX IF NOT EXISTS itens_acesso ON itens (acesso)")
+
+    def obter(self, chave, padrao=None):
+        chave = _chave_disco(chave)
+        with self._trava:
+            linha = self._conexao.execute("SELECT valor FROM itens WHERE chave = ?", (chave,)).fetchone()
+            if linha is None:
+                return padrao
+            self._conexao.execute("UPDATE itens SET acesso = ? WHERE chave = ?", (time.time(), chave))
+        return pickle.loads(linha[0])
+
+    def guardar(self, chave, valor):
+        dados = pickle.dumps(valor, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(dados) > self.max_bytes:
+            return
+        with self._trava:
+            self._conexao.execute("BEGIN IMMEDIATE")
+            try:
+                self._conexao.execute(
+                    "INSERT OR REPLACE INTO itens VALUES (?, ?, ?, ?)",
+                    (_chave_disco(chave), dados, len(dados), time.time()),
+                )
+                self._despejar()
+                self._conexao.execute("COMMIT")
+            except BaseException:
+                self._conexao.execute("ROLLBACK")
+                raise
+
+    def _despejar(self):
+        """Apaga os itens menos usados até o total caber em ``max_bytes``."""
+        total = self._conexao.execute("SELECT COALESCE(SUM(tamanho), 0) FROM itens").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        apagar = []
+        for chave, tamanho in self._conexao.execute("SELECT chave, tamanho FROM itens ORDER BY acesso"):
+            if total <= self.max_bytes:
+                break
+            apagar.append((chave,))
+            total -= tamanho
+        self._conexao.executemany("DELETE FROM itens WHERE chave = ?", apagar)
+
+    def obter_ou_calcular(self, chave, calcular):
+        """Devolve o valor em cache ou calcula, guarda e devolve."""
+        valor = self.obter(chave, _AUSENTE)
+        if valor is _AUSENTE:
+            valor = calcular()
+            self.guardar(chave, valor)
+        return valor
+
+    def limpar(self):
+        with self._trava:
+            self._conexao.execute("DELETE FROM itens")
+
+    def tamanho_total(self):
+        with self._trava:
+            return self._conexao.execute("SELECT COALESCE(SUM(tamanho), 0) FROM itens").fetchone()[0]
+
+    def __len__(self):
+        with self._trava:
+            return self._conexao.execute("SELECT COUNT(*) FROM itens").fetchone()[0]
+
+
+def cache_disco_configurado():
+    """Abre o cache indicado em ``PAINEL_CACHE_DISCO`` (limite em ``PAINEL_CACHE_DISCO_MB``), ou None."""
+    caminho = os.environ.get(VARIAVEL_AMBIENTE)
+    if not caminho:
+        return None
+    max_mb = int(os.environ.get(VARIAVEL_TAMANHO, MAX_MB_PADRAO))
+    return CacheDisco(caminho, max_bytes=max_mb << 20)
+
+
+def impressao_codigo(funcao):
+    """Hash do arquivo-fonte de ``funcao`` e dos módulos do painel que o arquivo importa (um nível).
+
+    Cada arquivo é lido uma vez por mtime/tamanho (``versao_arquivo``): as
+    páginas, reexecutadas a cada interação, não releem o código.
+    """
+    arquivos = {getattr(getattr(funcao, "__code__", None), "co_filename", "")}
+    for valor in list(getattr(funcao, "__globals__", {}).values()):
+        modulo = valor if inspect.ismodule(valor) else inspect.getmodule(valor)
+        arquivos.add(getattr(modulo, "__file__", None) or "")
+    digest = hashlib.sha256()
+    for arquivo in sorted(arquivos):
+        if arquivo and Path(arquivo).resolve().is_relative_to(RAIZ) and os.path.exists(arquivo):
+            digest.update(f"{Path(arquivo).name}:{versao_arquivo(arquivo)};".encode())
+    return digest.hexdigest()[:16]
+
+
+def persistente(funcao):
+    """Decorador: consulta o cache em disco (se configurado) antes de chamar ``funcao``.
+
+    A chave é o arquivo e o nome da função, a impressão do código
+    (``impressao_codigo``: um deploy com outro código não lê resultados
+    velhos) e os argumentos, que devem ser valores simples (textos, números,
+    tuplas) e incluir a versão dos dados de que o resultado depende. Sem
+    cache em disco, chama direto.
+    """
+    codigo = getattr(funcao, "__code__", None)
+    nome = (os.path.basename(getattr(codigo, "co_filename", "")), funcao.__qualname__, impressao_codigo(funcao))
+
+    @functools.wraps(funcao)
+    def chamar(*args, **kwargs):
+        if cache_disco is None:
+            return funcao(*args, **kwargs)
+        chave = (nome, args, tuple(sorted(kwargs.items())))
+        return cache_disco.obter_ou_calcular(chave, lambda: funcao(*args, **kwargs))
+
+    return chamar
+
+
+# Instância única usada pela API e por quem mais precisar compartilhar resultados
+cache_resultados = CacheMemoria()
+
+# Cache em disco compartilhado entre processos (None se não configurado)
+cache_disco = cache_disco_configurado()
@@ -0,0 +1,183 @@
+"""Leitura do CSV do censo (ou do seu instantâneo Parquet) com o esquema padrão.
+
+As leituras aceitam ``colunas``: o conjunto de colunas que a página usa.
+Só essas colunas são lidas e convertidas (``usecols`` no CSV, ``columns`` no
+instantâneo Parquet), mais numerador e denominador das derivadas pedidas e,
+quando houver medidas e a validação estiver ligada, as chaves do censo.
+
+As medidas saem nos tipos de ``TIPOS_MEDIDAS`` (inteiros anuláveis de 32 ou
+64 bits): o ausente fica na máscara, distinto de zero, e as somas são exatas.
+"""
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .derivadas import DERIVADAS, acrescentar_derivadas
+from .esquema import (
+    CAMINHO_CSV,
+    CHAVES,
+    COLUNAS,
+    DIMENSOES,
+    MEDIDAS,
+    OPCOES_LEITURA,
+    TIPOS_MEDIDAS,
+    ZERO_ABSOLUTO,
+)
+from .validacao import verificar_hierarquia
+from .versao import versao_arquivo
+
+# Linhas por bloco na importação para o banco embarcado (dados.sql), o caminho das
+# tabelas municipais: o valor só limita o pico de memória da importação
+TAMANHO_BLOCO = 50_000
+
+# Chave, nos metadados do instantâneo Parquet, da versão do CSV de origem
+METADADO_VERSAO = b"versao_origem"
+
+
+def _zero_absoluto(serie):
+    """Medida lida como texto por causa do sinal "-" (zero absoluto): "-" vira 0, o resto é convertido."""
+    texto = serie.str.strip()
+    texto = texto.mask(texto == ZERO_ABSOLUTO, "0")
+    texto = texto.str.replace(".", "", regex=False).str.replace(",", ".", regex=False)
+    return pd.to_numeric(texto)
+
+
+def preparar_dimensoes(df):
+    """Padroniza as colunas descritivas de um quadro recém-lido (e o zero absoluto das medidas)."""
+    for col in MEDIDAS:
+        # O parser só devolve texto numa medida se ela tiver o sinal "-"
+        if col in df.columns and not pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = _zero_absoluto(df[col])
+    for col in ("SIST_CRIA", "NIV_TERR", "NOM_TERR", "NOM_CL_GAL"):
+        if col in df.columns:
+            df[col] = df[col].str.strip()
+    # Brasil não tem código territorial; 0 mantém a chave inteira e ordenável
+    if "COD_TERR" in df.columns:
+        df["COD_TERR"] = df["COD_TERR"].fillna(0).astype("int64")
+    if "CL_GAL" in df.columns:
+        df["CL_GAL"] = df["CL_GAL"].astype("int64")
+    return df
+
+
+def _tipo_seguro(valores, tipo):
+    """``tipo`` se todos os valores couberem nele; senão Int64, ou float64 se houver frações."""
+    valores = valores[~np.isnan(valores)]
+    if len(valores) == 0:
+        return tipo
+    if (valores != np.round(valores)).any():
+        return "float64"
+    for candidato in (tipo, "Int64"):
+        limites = np.iinfo(pd.api.types.pandas_dtype(candidato).numpy_dtype)
+        if valores.min() >= limites.min and valores.max() <= limites.max:
+            return candidato
+    return "float64"
+
+
+def compactar_medidas(df):
+    """Converte as medidas do quadro para o plano de tipos (``TIPOS_MEDIDAS``).
+
+    Uma coluna que não caiba no tipo do plano (outra tabela do censo, com
+    totais maiores ou frações) fica no menor tipo seguro, nunca truncada.
+    """
+    medidas = [col for col in MEDIDAS if col in df.columns and str(df[col].dtype) != TIPOS_MEDIDAS[col]]
+    if not medidas:
+        return df
+    # Uma única matriz para checar os limites e separar as máscaras de todas as colunas
+    valores = df[medidas].to_numpy(dtype="float64", na_value=np.nan)
+    ausentes = np.isnan(valores)
+    for i, col in enumerate(medidas):
+        tipo = _tipo_seguro(valores[:, i], TIPOS_MEDIDAS[col])
+        if tipo == "float64":
+            df[col] = valores[:, i].copy()
+        else:
+            inteiros = np.where(ausentes[:, i], 0, valores[:, i]).astype(pd.api.types.pandas_dtype(tipo).numpy_dtype)
+            df[col] = pd.arrays.IntegerArray(inteiros, ausentes[:, i].copy())
+    return df
+
+
+def mapear_distintos(serie, funcao):
+    """Aplica ``funcao`` uma vez por valor distinto e devolve uma única série nova."""
+    return serie.map({valor: funcao(valor) for valor in serie.dropna().unique()})
+
+
+def colunas_leitura(colunas, validar=True):
+    """Colunas do arquivo, na ordem dele, necessárias para entregar ``colunas``."""
+    lidas = set()
+    for col in colunas:
+        if col in DERIVADAS:
+            lidas.update(DERIVADAS[col][:2])
+        elif col in COLUNAS:
+            lidas.add(col)
+        else:
+            raise ValueError(f"Coluna desconhecida no censo: {col!r}")
+    # A validação hierárquica soma as medidas pelas chaves
+    if validar and lidas & set(MEDIDAS):
+        lidas.update(CHAVES)
+    return [col for col in COLUNAS if col in lidas]
+
+
+def _instantaneo(origem):
+    return str(origem).endswith(".parquet")
+
+
+def ler_censo(origem=CAMINHO_CSV, encoding="utf-8", validar=True, colunas=None):
+    """Lê o arquivo (caminho ou URL do CSV, ou instantâneo ``.parquet``) com o esquema padrão.
+
+    Sem ``colunas`` lê tudo e acrescenta todas as derivadas; com ``colunas``
+    lê só o necessário para elas (ver ``colunas_leitura``). Com ``validar``,
+    levanta ``ErroConsistencia`` se os totais de BR, GR e UF não baterem
+    (ver ``validacao``), antes que alguma página use os dados.
+    """
+    usecols = None if colunas is None else colunas_leitura(colunas, validar)
+    if _instantaneo(origem):
+        df = pd.read_parquet(origem, columns=usecols)
+    else:
+        df = pd.read_csv(origem, encoding=encoding, usecols=usecols, **OPCOES_LEITURA)
+    df = compactar_medidas(preparar_dimensoes(df))
+    if validar:
+        verificar_hierarquia(df)
+    derivadas = None if colunas is None else [col for col in colunas if col in DERIVADAS]
+    return acrescentar_derivadas(df, derivadas)
+
+
+def gravar_instantaneo(origem=CAMINHO_CSV, destino=None, encoding="utf-8"):
+    """Converte o CSV num instantâneo Parquet (colunar: a leitura de poucas colunas só toca nelas).
+
+    Um arquivo local deixa a sua versão nos metadados do instantâneo, que
+    ``instantaneo_atual`` confere antes de trocar o CSV por ele.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    destino = destino or CAMINHO_CSV.with_suffix(".parquet")
+    df = ler_censo(origem, encoding=encoding)
+    tabela = pa.Table.from_pandas(df[DIMENSOES + MEDIDAS], preserve_index=False)
+    if os.path.exists(origem):
+        metadados = dict(tabela.schema.metadata or {})
+        metadados[METADADO_VERSAO] = versao_arquivo(origem).encode()
+        tabela = tabela.replace_schema_metadata(metadados)
+    pq.write_table(tabela, destino)
+    return destino
+
+
+def instantaneo_atual(origem=CAMINHO_CSV):
+    """O instantâneo ``.parquet`` ao lado do CSV, se gravado desta versão do CSV; senão o próprio CSV."""
+    import pyarrow.parquet as pq
+
+    instantaneo = Path(origem).with_suffix(".parquet")
+    try:
+        metadados = pq.read_schema(instantaneo).metadata or {}
+    except (OSError, ValueError):
+        return origem
+    if metadados.get(METADADO_VERSAO) != versao_arquivo(origem).encode():
+        return origem
+    return instantaneo
+
+
+if __name__ == "__main__":
+    import sys
+
+    destino = gravar_instantaneo(*sys.argv[1:3])
+    print(f"Instantâneo gravado em {destino}")
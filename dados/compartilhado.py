@@ -0,0 +1,163 @@
+"""Quadro do censo compartilhado entre sessões, sem cópia por chamada.
+
+``st.cache_data`` devolve a cada chamada uma cópia desserializada do quadro;
+com ``st.cache_resource`` todas as sessões recebem o mesmo objeto. Para que
+isso seja seguro o quadro é congelado: o que não pode mudar são os arrays
+das colunas, que as sessões compartilham. As numéricas ficam em arrays
+NumPy somente leitura, as de inteiros anuláveis com valores e máscara
+também somente leitura, e as de texto já são Arrow, imutáveis; nenhuma
+escrita, por nenhum caminho, altera os valores que outra sessão enxerga.
+
+O objeto ``DataFrame`` em si não é imutável: com o copy-on-write do
+pandas, ``.loc``/``.iloc`` sobre um quadro que tem vistas vivas copiam a
+coluna e trocam o array, sem erro (o erro só vem quando não há outra
+referência). Por isso ninguém escreve no quadro do cache: cada sessão
+trabalha sobre uma ``vista``, cópia rasa que só aloca as colunas que a
+própria sessão criar ou substituir. ``_conferir_congelado`` verifica isso.
+"""
+import numpy as np
+import pandas as pd
+
+
+_MASCARADOS = (pd.arrays.IntegerArray, pd.arrays.FloatingArray, pd.arrays.BooleanArray)
+
+
+def _somente_leitura(valores):
+    valores.flags.writeable = False
+    return valores
+
+
+def congelar(df):
+    """Cópia do quadro com as colunas NumPy (e mascaradas) marcadas como somente leitura."""
+    colunas = {}
+    for col in df.columns:
+        serie = df[col]
+        if isinstance(serie.dtype, np.dtype):
+            colunas[col] = _somente_leitura(serie.to_numpy(copy=True))
+        elif isinstance(serie.array, _MASCARADOS):
+            tipo = serie.dtype.numpy_dtype
+            valores = _somente_leitura(serie.to_numpy(dtype=tipo, na_value=tipo.type(0)))
+            mascara = _somente_leitura(serie.isna().to_numpy())
+            colunas[col] = type(serie.array)(valores, mascara)
+        else:
+            colunas[col] = serie.array
+    # copy=False mantém um bloco por coluna, apontando para os arrays acima
+    return pd.DataFrame(colunas, index=df.index, copy=False)
+
+
+def vista(df):
+    """Quadro próprio da sessão sobre os mesmos dados (sem copiar valores)."""
+    return df.copy(deep=False)
+
+
+def _conferir_congelado(congelado):
+    """Confere que nenhuma escrita altera os arrays de ``congelado`` (que é modificado: use um descartável).
+
+    Sem outras referências, ``.loc``/``.iloc``/``.at`` nas colunas NumPy e
+    mascaradas levantam erro; com uma vista viva, escritas no quadro e numa
+    vista nova são feitas em cópias, e a vista antiga continua igual.
+    """
+    referencia = congelado.copy(deep=True)
+    escritas = []
+    for j, col in enumerate(congelado.columns):
+        serie = congelado[col]
+        informados = serie.dropna()
+        if informados.empty:
+            continue
+        valor = informados.iloc[0]
+        diferentes = np.flatnonzero(serie.ne(valor).fillna(True).to_numpy())
+        posicao = int(diferentes[0]) if len(diferentes) else 0
+        rotulo = congelado.index[posicao]
+        escritas.append((j, col, posicao, rotulo, valor))
+        mascarada = isinstance(serie.array, _MASCARADOS)
+        somente_leitura = mascarada or isinstance(serie.dtype, np.dtype)
+        # A própria série é uma referência à coluna: viva, o copy-on-write copiaria em vez de falhar
+        del serie, informados
+        if somente_leitura:
+            escritas_diretas = [lambda: congelado.loc.__setitem__((rotulo, col), valor),
+                                lambda: congelado.iloc.__setitem__((posicao, j), valor),
+                                lambda: congelado.at.__setitem__((rotulo, col), valor)]
+            if mascarada:
+                # Um ausente só escreve na máscara
+                escritas_diretas.append(lambda: congelado.iloc.__setitem__((posicao, j), pd.NA))
+            for escrever in escritas_diretas:
+                try:
+                    escrever()
+                except (ValueError, TypeError):
+                    continue
+                raise AssertionError(f"escrita na coluna {col!r} do quadro congelado não levantou erro")
+    pd.testing.assert_frame_equal(congelado, referencia)
+
+    anterior = vista(congelado)
+    for j, col, posicao, rotulo, valor in escritas:
+        sessao = vista(congelado)
+        sessao.loc[rotulo, col] = valor
+        congelado.iloc[posicao, j] = valor
+        assert sessao.loc[rotulo, col] == valor == congelado.loc[rotulo, col], col
+    pd.testing.assert_frame_equal(anterior, referencia)
+
+
+def _memoria_alocada():
+    import tracemalloc
+
+    try:
+        import pyarrow as pa
+        arrow = pa.total_allocated_bytes()
+    except ImportError:
+        arrow = 0
+    return tracemalloc.get_traced_memory()[0] + arrow
+
+
+def _medir_sessoes(df, sessoes, compartilhado, pagina):
+    """Memória do recurso e retida por sessão: só a carga, ou o caminho da página 5.
+
+    Como na página 5, as linhas de UF (com o nome normalizado) são preparadas
+    uma vez e são elas o recurso; cada sessão só soma a métrica por UF sobre
+    a sua vista (ou sobre a sua cópia, com ``cache_data``).
+    """
+    import pickle
+
+    base = _memoria_alocada()
+    if pagina:
+        df = vista(df)
+        df["NOM_TERR_NORMALIZED"] = df["NOM_TERR"].str.lower()
+        df = df[df["NIV_TERR"] == "UF"]
+    recurso = congelar(df) if compartilhado else pickle.dumps(df)
+    inicio = _memoria_alocada()
+    retidos = []
+    for _ in range(sessoes):
+        df_sessao = vista(recurso) if compartilhado else pickle.loads(recurso)
+        retidos.append(df_sessao)
+        if pagina:
+            retidos.append(df_sessao.groupby("NOM_TERR", sort=False)["GAL_TOTAL"].sum())
+    fim = _memoria_alocada()
+    return inicio - base, (fim - inicio) / sessoes
+
+
+if __name__ == "__main__":
+    import argparse
+    import tracemalloc
+
+    from .carregamento import ler_censo
+    from .esquema import CAMINHO_CSV
+
+    parser = argparse.ArgumentParser(description="Memória por sessão: cópia por chamada × quadro compartilhado.")
+    parser.add_argument("--csv", default=str(CAMINHO_CSV))
+    parser.add_argument("--sessoes", type=int, default=50)
+    parser.add_argument("--repetir", type=int, default=1, help="empilha o arquivo N vezes (quadros maiores)")
+    args = parser.parse_args()
+
+    df = ler_censo(args.csv)
+    if args.repetir > 1:
+        df = pd.concat([df] * args.repetir, ignore_index=True)
+
+    _conferir_congelado(congelar(df))
+    print("quadro congelado conferido: arrays somente leitura; escritas com vistas vivas vão para cópias")
+
+    tracemalloc.start()
+    print(f"{len(df)} linhas, {args.sessoes} sessões concorrentes")
+    for rotulo, compartilhado in [("cópia por chamada (cache_data)", False), ("compartilhado (cache_resource)", True)]:
+        for nome, pagina in [("quadro do censo", False), ("página 5 (UFs + soma)", True)]:
+            recurso, por_sessao = _medir_sessoes(df, args.sessoes, compartilhado, pagina)
+            print(f"  {rotulo:32s} {nome:22s} recurso {recurso / 2**20:7.2f} MiB   "
+                  f"por sessão {por_sessao / 2**20:7.3f} MiB")
@@ -0,0 +1,77 @@
+"""Cubo denso do censo: território × sistema de criação × classe × medida."""
+import numpy as np
+import pandas as pd
+
+from .derivadas import DERIVADAS, calcular_derivadas, derivadas_disponiveis
+from .esquema import MEDIDAS
+
+
+class CuboCenso:
+    """Valores do censo em um único array, indexado por posição em cada eixo.
+
+    ``valores[t, s, c, m]`` é a medida ``m`` do território ``t`` no sistema
+    ``s`` e na classe de cabeças ``c``; NaN marca célula ausente no arquivo
+    ou valor não informado (sigilo). As derivadas (razões) ficam no fim do
+    eixo de medidas e não devem ser somadas entre células.
+    """
+
+    def __init__(self, territorios, sistemas, classes, medidas, valores):
+        self.territorios = territorios  # NIV_TERR, COD_TERR, NOM_TERR na ordem do eixo 0
+        self.sistemas = sistemas  # códigos SIST_CRIA na ordem do eixo 1
+        self.classes = classes  # CL_GAL, NOM_CL_GAL na ordem do eixo 2
+        self.medidas = medidas
+        self.valores = valores
+        self._pos_medida = {m: i for i, m in enumerate(medidas)}
+
+    @property
+    def forma(self):
+        return self.valores.shape
+
+    def indice_medida(self, medida):
+        return self._pos_medida[medida]
+
+    def mascara_nivel(self, nivel):
+        """Máscara booleana do eixo de territórios para um NIV_TERR."""
+        return (self.territorios["NIV_TERR"] == nivel).to_numpy()
+
+    def fatia(self, medida, nivel=None):
+        """Matriz território × sistema × classe de uma medida (visão, sem cópia)."""
+        bloco = self.valores[..., self._pos_medida[medida]]
+        if nivel is None:
+            return bloco
+        return bloco[self.mascara_nivel(nivel)]
+
+
+def montar_cubo(df, medidas=None, derivadas=True):
+    """Monta o cubo a partir do quadro do censo (uma linha por célula)."""
+    medidas = [m for m in (medidas or MEDIDAS) if m in df.columns and m not in DERIVADAS]
+
+    terr_codigos, terr_unicos = pd.MultiIndex.from_frame(df[["NIV_TERR", "COD_TERR"]]).factorize(sort=True)
+    sist_codigos, sistemas = pd.factorize(df["SIST_CRIA"], sort=True)
+    classe_codigos, classes = pd.factorize(df["CL_GAL"], sort=True)
+
+    terr_unicos.names = ["NIV_TERR", "COD_TERR"]
+    territorios = terr_unicos.to_frame(index=False)
+    if "NOM_TERR" in df.columns:
+        nomes = df.drop_duplicates(["NIV_TERR", "COD_TERR"]).set_index(["NIV_TERR", "COD_TERR"])["NOM_TERR"]
+        territorios["NOM_TERR"] = nomes.reindex(terr_unicos).to_numpy()
+    else:
+        territorios["NOM_TERR"] = None
+
+    tabela_classes = pd.DataFrame({"CL_GAL": np.asarray(classes)})
+    if "NOM_CL_GAL" in df.columns:
+        nomes_cl = df.drop_duplicates("CL_GAL").set_index("CL_GAL")["NOM_CL_GAL"]
+        tabela_classes["NOM_CL_GAL"] = nomes_cl.reindex(tabela_classes["CL_GAL"]).to_numpy()
+
+    valores = np.full(
+        (len(territorios), len(sistemas), len(classes), len(medidas)), np.nan, dtype="float64"
+    )
+    # Cada linha do quadro ocupa exatamente uma célula do cubo
+    valores[terr_codigos, sist_codigos, classe_codigos] = df[medidas].to_numpy(dtype="float64", na_value=np.nan)
+
+    nomes = derivadas_disponiveis(medidas) if derivadas else []
+    if nomes:
+        valores = np.concatenate([valores, calcular_derivadas(valores, medidas, nomes)], axis=-1)
+        medidas = medidas + nomes
+
+    return CuboCenso(territorios, list(sistemas), tabela_classes, medidas, valores)
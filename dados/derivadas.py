@@ -0,0 +1,63 @@
+"""Métricas derivadas de produtividade (razões entre medidas do censo).
+
+Calculadas uma única vez, na carga, para todas as linhas de uma vez. A
+divisão é segura: denominador zero ou ausente, ou numerador ausente, dá
+NaN (não há razão a mostrar), nunca infinito.
+
+Razões não se somam: o valor agregado de um grupo de linhas é a soma dos
+numeradores dividida pela soma dos denominadores (ver ``agregacoes.agregar``).
+"""
+import numpy as np
+
+# nome: (numerador, denominador, descrição)
+DERIVADAS = {
+    "GAL_POR_TRAB": ("GAL_TOTAL", "N_TRAB_TOTAL", "Galináceos por trabalhador"),
+    "GAL_POR_ESTAB": ("GAL_TOTAL", "E_TEM_GAL", "Galináceos por estabelecimento"),
+    "DZ_POR_POED": ("Q_DZ_PROD", "GAL_POED", "Dúzias de ovos produzidas por poedeira"),
+    "V_POR_GAL_VEND": ("V_GAL_VEND", "GAL_VEND", "Valor por galináceo vendido"),
+    "GAL_POR_HA": ("GAL_TOTAL", "A_TOTAL", "Galináceos por hectare"),
+}
+
+DESCRICAO_DERIVADAS = {nome: descricao for nome, (_, _, descricao) in DERIVADAS.items()}
+
+
+def dividir(numerador, denominador):
+    """Divisão elemento a elemento com NaN onde o denominador é 0 ou ausente."""
+    numerador = np.asarray(numerador, dtype="float64")
+    denominador = np.asarray(denominador, dtype="float64")
+    resultado = np.full(np.broadcast(numerador, denominador).shape, np.nan)
+    np.divide(numerador, denominador, out=resultado, where=denominador != 0)
+    return resultado
+
+
+def derivadas_disponiveis(colunas):
+    """Derivadas cujos numerador e denominador existem em ``colunas``."""
+    colunas = set(colunas)
+    return [nome for nome, (num, den, _) in DERIVADAS.items() if num in colunas and den in colunas]
+
+
+def calcular_derivadas(valores, medidas, nomes=None):
+    """Razões a partir de uma matriz ``(..., medida)``; devolve ``(..., derivada)``.
+
+    Serve tanto para o quadro (linhas × medidas) quanto para o cubo
+    (território × sistema × classe × medida): numeradores e denominadores
+    são selecionados de uma vez e divididos numa única operação.
+    """
+    nomes = derivadas_disponiveis(medidas) if nomes is None else list(nomes)
+    posicao = {m: i for i, m in enumerate(medidas)}
+    num = valores[..., [posicao[DERIVADAS[n][0]] for n in nomes]]
+    den = valores[..., [posicao[DERIVADAS[n][1]] for n in nomes]]
+    return dividir(num, den)
+
+
+def acrescentar_derivadas(df, nomes=None):
+    """Acrescenta ao quadro do censo as derivadas pedidas (padrão: as que suas colunas permitem)."""
+    disponiveis = derivadas_disponiveis(df.columns)
+    nomes = disponiveis if nomes is None else [n for n in nomes if n in disponiveis]
+    if not nomes:
+        return df
+    entradas = list(dict.fromkeys(c for n in nomes for c in DERIVADAS[n][:2]))
+    razoes = calcular_derivadas(df[entradas].to_numpy(dtype="float64", na_value=np.nan), entradas, nomes)
+    for i, nome in enumerate(nomes):
+        df[nome] = razoes[:, i]
+    return df
@@ -0,0 +1,189 @@
+"""Distribuição dos estabelecimentos por classe de cabeças (página 8).
+
+Soma ``E_TEM_GAL`` ou ``E_CRIA_GAL`` por classe (``CL_GAL``) dentro de um
+nível territorial, de um sistema de criação (ou de todos) e, nos níveis GR
+e UF, de uma região. Os níveis nunca se misturam: o CSV empilha Brasil,
+regiões e estados, e contar as linhas do arquivo (um território × sistema
+× classe por linha) não diz quantos estabelecimentos há em cada classe.
+
+Tudo sai do cubo (``CuboCenso``), somado uma vez na montagem: cada grupo de
+territórios (o Brasil; todas as regiões ou todos os estados; as regiões ou
+os estados de uma região) vira uma linha de uma matriz de somas, com um
+sistema a mais para "todos". Uma seleção só lê uma linha dessa matriz, sem
+percorrer o censo. Células sob sigilo (X) ficam fora das somas de GR e UF,
+que podem então ficar abaixo do valor do Brasil; uma classe sem nenhum
+valor informado no grupo fica ausente (NaN), e não zero.
+
+Com o banco embarcado (``dados.sql``), ``DistribuicaoBanco`` tem a mesma
+interface e consulta cada seleção no banco com
+``agregacoes.estabelecimentos_por_classe``, sem montar o cubo.
+"""
+import numpy as np
+import pandas as pd
+
+from .agregacoes import agregar, estabelecimentos_por_classe
+from .esquema import CLASSE_TOTAL
+
+MEDIDAS_DISTRIBUICAO = {
+    "E_TEM_GAL": "Estabelecimentos com galináceos",
+    "E_CRIA_GAL": "Estabelecimentos que criam galináceos",
+}
+NIVEIS_DISTRIBUICAO = ["BR", "GR", "UF"]
+
+
+def _soma_informados(valores, eixo):
+    """Soma ignorando ausentes; NaN onde não há nenhum valor (como ``sum(min_count=1)``)."""
+    informados = ~np.isnan(valores)
+    soma = np.where(informados, valores, 0.0).sum(axis=eixo)
+    soma[~informados.any(axis=eixo)] = np.nan
+    return soma
+
+
+class DistribuicaoPorte:
+    """Somas por classe de cabeças de cada (nível, região) × sistema, montadas de um cubo."""
+
+    def __init__(self, cubo, medidas=tuple(MEDIDAS_DISTRIBUICAO)):
+        self.medidas = list(medidas)
+        self.sistemas = list(cubo.sistemas)
+        codigos_classe = cubo.classes["CL_GAL"].to_numpy()
+        faixas = np.flatnonzero(codigos_classe != CLASSE_TOTAL)
+        self.classes = cubo.classes.iloc[faixas].reset_index(drop=True)
+
+        # Região de cada território: o próprio código em GR, código // 10 em UF
+        territorios = cubo.territorios
+        niveis = territorios["NIV_TERR"].to_numpy()
+        codigos = territorios["COD_TERR"].to_numpy()
+        regiao_de = np.where(niveis == "UF", codigos // 10, np.where(niveis == "GR", codigos, -1))
+        grandes_regioes = territorios[niveis == "GR"]
+        self.regioes = dict(zip(grandes_regioes["NOM_TERR"], grandes_regioes["COD_TERR"]))
+
+        # Incidência grupo × território: uma linha por (nível, região), None = todas
+        self._grupo = {}
+        incidencia = []
+        for nivel in NIVEIS_DISTRIBUICAO:
+            do_nivel = niveis == nivel
+            if not do_nivel.any():
+                continue
+            self._grupo[(nivel, None)] = len(incidencia)
+            incidencia.append(do_nivel)
+            if nivel == "BR":
+                continue
+            for nome, codigo in self.regioes.items():
+                self._grupo[(nivel, nome)] = len(incidencia)
+                incidencia.append(do_nivel & (regiao_de == codigo))
+
+        # território × sistema × faixa × medida, e as somas por grupo (com "todos os sistemas" no fim)
+        posicoes = [cubo.indice_medida(m) for m in self.medidas]
+        valores = cubo.valores[:, :, faixas][..., posicoes]
+        somas = np.stack([_soma_informados(valores[linhas], eixo=0) for linhas in incidencia])
+        self._somas = np.concatenate([somas, _soma_informados(somas, eixo=1)[:, None]], axis=1)
+        self._somas.flags.writeable = False
+
+    def _linha(self, nivel, sistema, regiao):
+        if nivel == "BR" and regiao is not None:
+            raise ValueError("a região só se aplica aos níveis GR e UF")
+        try:
+            g = self._grupo[(nivel, regiao)]
+        except KeyError:
+            raise ValueError(f"Nível ou região desconhecidos: {nivel!r}, {regiao!r}") from None
+        if sistema is None:
+            return self._somas[g, -1]
+        try:
+            return self._somas[g, self.sistemas.index(sistema)]
+        except ValueError:
+            raise ValueError(f"Sistema de criação desconhecido: {sistema!r}") from None
+
+    def tabela(self, nivel="BR", sistema=None, regiao=None):
+        """Estabelecimentos por classe (CL_GAL, NOM_CL_GAL e as medidas), na ordem das classes."""
+        linha = self._linha(nivel, sistema, regiao)
+        colunas = {col: self.classes[col].array for col in self.classes.columns}
+        colunas.update({medida: linha[:, i] for i, medida in enumerate(self.medidas)})
+        return pd.DataFrame(colunas)
+
+    def por_regiao(self, nivel="UF", sistema=None):
+        """A tabela de cada região do nível, empilhada com a coluna REGIAO (para detalhar o gráfico)."""
+        if nivel == "BR":
+            raise ValueError("a região só se aplica aos níveis GR e UF")
+        partes = [self.tabela(nivel, sistema, regiao).assign(REGIAO=regiao) for regiao in self.regioes]
+        return pd.concat(partes, ignore_index=True)
+
+
+class DistribuicaoBanco:
+    """A interface de ``DistribuicaoPorte`` sobre um ``BancoCenso``: cada seleção é uma consulta."""
+
+    def __init__(self, banco, medidas=tuple(MEDIDAS_DISTRIBUICAO)):
+        self.banco = banco
+        self.medidas = list(medidas)
+        medida = self.medidas[0]
+        self.sistemas = agregar(banco, medida, "SIST_CRIA", "BR")["SIST_CRIA"].tolist()
+        self.classes = estabelecimentos_por_classe(banco, medida)[["CL_GAL", "NOM_CL_GAL"]]
+        grandes_regioes = agregar(banco, medida, ["COD_TERR", "NOM_TERR"], "GR")
+        self.regioes = dict(zip(grandes_regioes["NOM_TERR"], grandes_regioes["COD_TERR"].astype(int)))
+
+    def tabela(self, nivel="BR", sistema=None, regiao=None):
+        """Estabelecimentos por classe (CL_GAL, NOM_CL_GAL e as medidas), na ordem das classes."""
+        if nivel == "BR" and regiao is not None:
+            raise ValueError("a região só se aplica aos níveis GR e UF")
+        if nivel not in NIVEIS_DISTRIBUICAO or (regiao is not None and regiao not in self.regioes):
+            raise ValueError(f"Nível ou região desconhecidos: {nivel!r}, {regiao!r}")
+        if sistema is not None and sistema not in self.sistemas:
+            raise ValueError(f"Sistema de criação desconhecido: {sistema!r}")
+        codigo = None if regiao is None else self.regioes[regiao]
+        resultado = self.classes.copy()
+        for medida in self.medidas:
+            somas = estabelecimentos_por_classe(self.banco, medida, nivel, sistema, regiao=codigo)
+            # Classe sem nenhuma linha na seleção: ausente (NaN), como no cubo
+            resultado[medida] = somas.set_index("CL_GAL")[medida].reindex(resultado["CL_GAL"]).to_numpy("float64")
+        return resultado
+
+    por_regiao = DistribuicaoPorte.por_regiao
+
+
+if __name__ == "__main__":
+    import time
+
+    from .carregamento import ler_censo
+    from .cubo import montar_cubo
+
+    censo = ler_censo()
+    inicio = time.perf_counter()
+    distribuicao = DistribuicaoPorte(montar_cubo(censo, medidas=list(MEDIDAS_DISTRIBUICAO), derivadas=False))
+    print(f"montagem: {1000 * (time.perf_counter() - inicio):.1f} ms")
+
+    # Conferência com o quadro: cada seleção contra um groupby sobre as linhas do nível
+    selecoes = [(nivel, sistema, regiao)
+                for nivel in NIVEIS_DISTRIBUICAO
+                for sistema in [None] + distribuicao.sistemas
+                for regiao in [None] + ([] if nivel == "BR" else list(distribuicao.regioes))]
+    faixas = censo[censo["CL_GAL"] != CLASSE_TOTAL]
+    regiao_uf = faixas["COD_TERR"] // 10
+    for nivel, sistema, regiao in selecoes:
+        mascara = faixas["NIV_TERR"] == nivel
+        if sistema is not None:
+            mascara &= faixas["SIST_CRIA"] == sistema
+        if regiao is not None:
+            codigo = distribuicao.regioes[regiao]
+            mascara &= (faixas["COD_TERR"] if nivel == "GR" else regiao_uf) == codigo
+        esperado = (faixas[mascara].groupby("CL_GAL")[list(MEDIDAS_DISTRIBUICAO)].sum(min_count=1)
+                    .reindex(distribuicao.classes["CL_GAL"]).astype("float64"))
+        obtido = distribuicao.tabela(nivel, sistema, regiao).set_index("CL_GAL")[list(MEDIDAS_DISTRIBUICAO)]
+        pd.testing.assert_frame_equal(obtido, esperado, check_names=False)
+    print(f"{len(selecoes)} seleções conferidas com o groupby do quadro")
+
+    inicio = time.perf_counter()
+    for nivel, sistema, regiao in selecoes:
+        distribuicao.tabela(nivel, sistema, regiao)
+    print(f"por seleção: {1e6 * (time.perf_counter() - inicio) / len(selecoes):.0f} µs")
+
+    # O mesmo resultado consultando o banco embarcado (SQLite em memória)
+    from .sql import BancoCenso
+
+    with BancoCenso(motor="sqlite") as banco:
+        banco.importar_csv()
+        pelo_banco = DistribuicaoBanco(banco)
+        assert pelo_banco.sistemas == distribuicao.sistemas and pelo_banco.regioes == distribuicao.regioes
+        for nivel, sistema, regiao in selecoes:
+            pd.testing.assert_frame_equal(pelo_banco.tabela(nivel, sistema, regiao),
+                                          distribuicao.tabela(nivel, sistema, regiao), check_dtype=False)
+        pd.testing.assert_frame_equal(pelo_banco.por_regiao("UF"), distribuicao.por_regiao("UF"), check_dtype=False)
+    print(f"{len(selecoes)} seleções conferidas com o banco embarcado")
@@ -0,0 +1,76 @@
+"""Esquema da tabela de galináceos do Censo Agro 2017 (IBGE)."""
+from pathlib import Path
+
+# Arquivo padrão, na raiz do repositório (mesmo arquivo lido pelas páginas)
+CAMINHO_CSV = Path(__file__).resolve().parent.parent / "GALINACEOS.csv"
+
+# Planilha com a descrição das variáveis do arquivo, também na raiz
+CAMINHO_DESCRICOES = CAMINHO_CSV.parent / "descricao das variaveis.xlsx"
+
+SEPARADOR = ";"
+
+# Colunas descritivas, na ordem do arquivo
+DIMENSOES = ["SIST_CRIA", "NIV_TERR", "COD_TERR", "NOM_TERR", "CL_GAL", "NOM_CL_GAL"]
+
+# Chave de uma célula do censo: território × sistema de criação × classe de cabeças
+CHAVES = ["NIV_TERR", "COD_TERR", "SIST_CRIA", "CL_GAL"]
+
+# Colunas numéricas (contagens, cabeças, valores, áreas e pessoal ocupado)
+MEDIDAS = [
+    "E_CRIA_GAL", "E_TEM_GAL", "E_GAL_VEND", "E_OVOS_PROD", "E_OVOS_VEND", "E_SUBS",
+    "E_COMERC", "E_RECEBE_ORI", "E_ORI_GOV", "E_ORI_PROPRIA", "E_ORI_COOP",
+    "E_ORI_EMP_INT", "E_ORI_EMP_PRIV", "E_ORI_ONG", "E_ORI_SIST_S", "E_ORI_OUTRA",
+    "E_GAL_ENG", "E_GAL_GALOS", "E_GAL_POED", "E_GAL_MATR", "E_ASSOC_COOP", "E_FINANC",
+    "E_FINANC_COOP", "E_FINANC_INTEG", "E_DAP", "E_AGRIFAM", "E_N_AGRIFAM",
+    "E_PRODUTOR", "E_COOPERATIVA", "E_SA_LDTA", "E_CNPJ",
+    "GAL_TOTAL", "GAL_ENG", "GAL_GALOS", "GAL_POED", "GAL_MATR", "GAL_VEND",
+    "V_GAL_VEND", "Q_DZ_PROD", "Q_DZ_VEND", "V_Q_DZ_PROD", "V_Q_DZ_VEND",
+    "A_TOTAL", "A_PAST_PLANT", "A_LAV_PERM", "A_LAV_TEMP", "A_APPRL",
+    "VTP_AGRO", "RECT_AGRO", "N_TRAB_TOTAL", "N_TRAB_LACOS",
+]
+
+COLUNAS = DIMENSOES + MEDIDAS
+
+# Plano de tipos das medidas: inteiros anuláveis, em que o ausente (sigilo ou
+# célula vazia) fica numa máscara em vez de virar NaN num float64. Contagens
+# de estabelecimentos, cabeças, áreas (ha) e pessoas cabem em 32 bits sem
+# sinal; quantidades vendidas e valores (mil R$) do Brasil passam de 4,29 bi.
+TIPOS_MEDIDAS = {col: "UInt32" for col in MEDIDAS}
+TIPOS_MEDIDAS.update({
+    col: "Int64"
+    for col in ["GAL_VEND", "V_GAL_VEND", "Q_DZ_PROD", "Q_DZ_VEND", "V_Q_DZ_PROD", "V_Q_DZ_VEND",
+                "VTP_AGRO", "RECT_AGRO"]
+})
+
+# Níveis territoriais: Brasil, Grande Região, Unidade da Federação e Município
+NIVEIS = ["BR", "GR", "UF", "MU"]
+
+# Classe 10 é a linha "Total" de cada território × sistema
+CLASSE_TOTAL = 10
+
+# Sinais convencionais do IBGE: X = sigilo, .. e ... = não disponível (ausentes);
+# - = zero absoluto (lido como 0, ver carregamento.preparar_dimensoes)
+SINAIS_AUSENTES = ["X", "..", "..."]
+ZERO_ABSOLUTO = "-"
+
+# Leitura numérica: ponto como separador de milhares e vírgula como decimal,
+# convertidos direto pelo parser do pandas, sem passar por strings
+OPCOES_LEITURA = {
+    "sep": SEPARADOR,
+    "thousands": ".",
+    "decimal": ",",
+    "na_values": SINAIS_AUSENTES,
+    "dtype": {"SIST_CRIA": str, "NIV_TERR": str, "NOM_TERR": str, "NOM_CL_GAL": str},
+}
+
+# Descrições completas dos sistemas de criação
+MAPEAMENTO_SISTEMAS = {
+    '1-SIST_POC': 'Produtores de ovos para consumo',
+    '2-SIST_POI': 'Produtores de ovos para incubação',
+    '3-SIST_PFC': 'Produtores de frangos de corte',
+    '4-Outro': 'Outros produtores'
+}
+
+SISTEMAS = list(MAPEAMENTO_SISTEMAS)
+
+REGIOES = ['Norte', 'Nordeste', 'Sudeste', 'Sul', 'Centro-Oeste']
@@ -0,0 +1,129 @@
+"""Índices bitmap das dimensões do censo, para filtros cruzados entre gráficos.
+
+Para cada valor de ``NIV_TERR``, ``NOM_TERR``, ``SIST_CRIA`` e ``CL_GAL`` o
+índice guarda as linhas em que ele aparece como um bitmap empacotado (um bit
+por linha, ``np.packbits``). O índice é montado uma vez, na carga; uma seleção
+de gráfico vira OU entre os valores escolhidos de uma dimensão e E entre
+dimensões, operações sobre ``linhas / 8`` bytes, sem comparar textos de novo.
+
+Memória: ``linhas / 8`` bytes por valor distinto. Dimensões com milhares de
+valores (``NOM_TERR`` das tabelas municipais) custam proporcionalmente.
+"""
+import numpy as np
+import pandas as pd
+
+DIMENSOES_INDICE = ["NIV_TERR", "NOM_TERR", "SIST_CRIA", "CL_GAL"]
+
+
+def _bitmaps_da_coluna(serie):
+    """{valor: bitmap empacotado} de uma coluna, numa passada pelas linhas."""
+    codigos, valores = pd.factorize(serie)
+    ordem = np.argsort(codigos, kind="stable")
+    limites = np.searchsorted(codigos[ordem], np.arange(len(valores) + 1))
+    bitmaps = {}
+    for i, valor in enumerate(valores.tolist()):
+        linhas = ordem[limites[i]:limites[i + 1]]
+        bits = np.zeros((len(serie) + 7) // 8, dtype=np.uint8)
+        np.bitwise_or.at(bits, linhas >> 3, (0x80 >> (linhas & 7)).astype(np.uint8))
+        bitmaps[valor] = bits
+    return bitmaps
+
+
+class IndiceBitmap:
+    """Bitmaps por valor de cada dimensão de um quadro (imutável depois de montado)."""
+
+    def __init__(self, df, dimensoes=DIMENSOES_INDICE):
+        self.linhas = len(df)
+        self.bitmaps = {dim: _bitmaps_da_coluna(df[dim]) for dim in dimensoes if dim in df.columns}
+
+    def valores(self, dimensao):
+        return list(self.bitmaps[dimensao])
+
+    def selecionar(self, **selecao):
+        """Bitmap das linhas da seleção ``dimensao=valor`` ou ``dimensao=[valores]``.
+
+        Valores da mesma dimensão se somam (OU); dimensões se combinam (E).
+        ``None`` ou lista vazia não filtra a dimensão. Devolve None se nada
+        foi filtrado (todas as linhas).
+        """
+        resultado = None
+        for dimensao, valores in selecao.items():
+            if valores is None:
+                continue
+            if isinstance(valores, (str, int, np.integer)):
+                valores = [valores]
+            if len(valores) == 0:
+                continue
+            bitmaps = self.bitmaps[dimensao]
+            uniao = np.zeros((self.linhas + 7) // 8, dtype=np.uint8)
+            for valor in valores:
+                if valor in bitmaps:
+                    np.bitwise_or(uniao, bitmaps[valor], out=uniao)
+            resultado = uniao if resultado is None else np.bitwise_and(resultado, uniao, out=resultado)
+        return resultado
+
+    def mascara(self, bits):
+        """Máscara booleana (uma posição por linha) de um bitmap."""
+        return np.unpackbits(bits, count=self.linhas).view(bool)
+
+    def contar(self, bits):
+        return self.linhas if bits is None else int(np.bitwise_count(bits).sum())
+
+    def filtrar(self, df, **selecao):
+        """Linhas de ``df`` (o quadro indexado) que atendem à seleção; ``df`` intacto se não houver filtro."""
+        bits = self.selecionar(**selecao)
+        return df if bits is None else df[self.mascara(bits)]
+
+
+def _mascara_pandas(df, **selecao):
+    """O filtro equivalente com comparações do pandas, como as páginas faziam."""
+    mascara = pd.Series(True, index=df.index)
+    for dimensao, valores in selecao.items():
+        mascara &= df[dimensao].isin(valores if isinstance(valores, list) else [valores])
+    return mascara.to_numpy()
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    from .carregamento import ler_censo
+
+    parser = argparse.ArgumentParser(description="Seleções cruzadas: bitmaps × máscaras do pandas.")
+    parser.add_argument("--linhas", type=int, default=1_000_000)
+    parser.add_argument("--repetir", type=int, default=20, help="medições por seleção")
+    args = parser.parse_args()
+
+    base = ler_censo(colunas=DIMENSOES_INDICE + ["GAL_TOTAL"], validar=False)
+    df = pd.concat([base] * (args.linhas // len(base) + 1), ignore_index=True).head(args.linhas)
+
+    inicio = time.perf_counter()
+    indice = IndiceBitmap(df)
+    montagem = time.perf_counter() - inicio
+    memoria = sum(b.nbytes for bitmaps in indice.bitmaps.values() for b in bitmaps.values())
+    print(f"{len(df):,} linhas; índice montado em {montagem:.2f}s, {memoria / 2**20:.1f} MiB")
+
+    regioes = base.loc[base["NIV_TERR"] == "UF", "NOM_TERR"].unique().tolist()
+    selecoes = {
+        "nível": {"NIV_TERR": "UF"},
+        "nível × sistema": {"NIV_TERR": "UF", "SIST_CRIA": "3-SIST_PFC"},
+        "nível × 9 UFs × 2 sistemas × classe": {
+            "NIV_TERR": "UF", "NOM_TERR": regioes[:9], "SIST_CRIA": ["1-SIST_POC", "3-SIST_PFC"], "CL_GAL": 10,
+        },
+    }
+    for rotulo, selecao in selecoes.items():
+        esperado = _mascara_pandas(df, **selecao)
+        assert np.array_equal(indice.mascara(indice.selecionar(**selecao)), esperado), rotulo
+
+        inicio = time.perf_counter()
+        for _ in range(args.repetir):
+            _mascara_pandas(df, **selecao)
+        pandas_ms = 1000 * (time.perf_counter() - inicio) / args.repetir
+
+        inicio = time.perf_counter()
+        for _ in range(args.repetir):
+            indice.mascara(indice.selecionar(**selecao))
+        bitmap_ms = 1000 * (time.perf_counter() - inicio) / args.repetir
+
+        print(f"  {rotulo:38s} pandas {pandas_ms:7.2f} ms   bitmap {bitmap_ms:6.2f} ms   "
+              f"({pandas_ms / bitmap_ms:5.1f}×, {int(esperado.sum()):,} linhas)")
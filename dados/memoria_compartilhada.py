@@ -0,0 +1,236 @@
+"""Quadro do censo em memória compartilhada para pools de processos.
+
+Quem abre o pool lê o censo uma vez e o publica com ``Publicacao``: as
+colunas vão, lado a lado, para um bloco de ``multiprocessing.shared_memory``
+(as medidas anuláveis como valores e máscara, as de texto como códigos mais
+o dicionário de valores distintos). O descritor devolvido é um dict pequeno
+(nome do bloco, posição, tipo e forma de cada array) que vai para os
+processos no ``initializer`` ou em cada tarefa; ``anexar_quadro`` monta
+nele um quadro cujas colunas numéricas apontam para o bloco, sem cópia, em
+arrays somente leitura. As garantias são as de ``compartilhado.congelar``:
+nenhuma escrita altera o bloco, mas o quadro em si aceita atribuições em
+cópias quando há vistas vivas, e o processo deve trabalhar sobre ``vista``.
+Só as colunas de texto são refeitas em cada processo, a partir dos códigos.
+
+Os blocos pertencem a quem publicou: ``Publicacao`` é um gerenciador de
+contexto e os remove ao sair, depois de fechado o pool. Os processos que
+anexam devem ser filhos dele (``ProcessPoolExecutor``), que herdam o seu
+rastreador de recursos.
+"""
+import threading
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+# Alinhamento de cada array dentro do bloco (linha de cache)
+ALINHAMENTO = 64
+
+_anexados = {}  # nome do bloco -> SharedMemory aberto neste processo
+_trava = threading.Lock()
+
+_MASCARADOS = (pd.arrays.IntegerArray, pd.arrays.FloatingArray, pd.arrays.BooleanArray)
+
+
+class Publicacao:
+    """Blocos de memória compartilhada criados por este processo, removidos em ``fechar``."""
+
+    def __init__(self):
+        self._blocos = []
+
+    def _publicar(self, arrays):
+        """Copia ``arrays`` (uma vez) para um bloco novo; devolve o descritor de cada um."""
+        arrays = [np.ascontiguousarray(valores) for valores in arrays]
+        inicios, tamanho = [], 0
+        for valores in arrays:
+            inicios.append(tamanho)
+            tamanho += -(-valores.nbytes // ALINHAMENTO) * ALINHAMENTO
+        bloco = shared_memory.SharedMemory(create=True, size=max(tamanho, 1))
+        self._blocos.append(bloco)
+        descritores = []
+        for valores, inicio in zip(arrays, inicios):
+            np.ndarray(valores.shape, dtype=valores.dtype, buffer=bloco.buf, offset=inicio)[...] = valores
+            descritores.append({"nome": bloco.name, "inicio": inicio, "tipo": valores.dtype.str, "forma": valores.shape})
+        return descritores
+
+    def array(self, valores):
+        """Publica ``valores`` num bloco próprio; devolve o descritor para ``anexar_array``."""
+        return self._publicar([valores])[0]
+
+    def quadro(self, df):
+        """Publica as colunas de ``df`` num só bloco; devolve o descritor para ``anexar_quadro``."""
+        arrays, colunas = [], []
+
+        def guardar(valores):
+            arrays.append(valores)
+            return len(arrays) - 1
+
+        for col in df.columns:
+            serie = df[col]
+            if isinstance(serie.dtype, np.dtype) and serie.dtype.kind in "biuf":
+                colunas.append({"nome": col, "tipo": "numpy", "valores": guardar(serie.to_numpy())})
+            elif isinstance(serie.array, _MASCARADOS):
+                tipo = serie.dtype.numpy_dtype
+                colunas.append({
+                    "nome": col,
+                    "tipo": "mascarado",
+                    "dtype": str(serie.dtype),
+                    "valores": guardar(serie.to_numpy(dtype=tipo, na_value=tipo.type(0))),
+                    "mascara": guardar(serie.isna().to_numpy()),
+                })
+            else:
+                codigos, distintos = pd.factorize(serie, use_na_sentinel=True)
+                colunas.append({
+                    "nome": col,
+                    "tipo": "texto",
+                    "dtype": str(serie.dtype),
+                    "codigos": guardar(codigos.astype(np.int32)),
+                    "distintos": list(distintos),
+                })
+        indice = df.index
+        if isinstance(indice, pd.RangeIndex):
+            indice = {"inicio": indice.start, "fim": indice.stop, "passo": indice.step}
+        else:
+            indice = {"valores": guardar(indice.to_numpy())}
+
+        # Troca as posições pelos descritores, agora que o bloco existe
+        descritores = self._publicar(arrays)
+        for coluna in colunas + [indice]:
+            for chave in ("valores", "mascara", "codigos"):
+                if chave in coluna:
+                    coluna[chave] = descritores[coluna[chave]]
+        return {"colunas": colunas, "indice": indice, "linhas": len(df)}
+
+    def fechar(self):
+        for bloco in self._blocos:
+            bloco.close()
+            bloco.unlink()
+        self._blocos = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+
+def _abrir(nome):
+    """Bloco ``nome`` neste processo (aberto uma vez e mantido enquanto o processo viver)."""
+    with _trava:
+        bloco = _anexados.get(nome)
+        if bloco is None:
+            try:
+                bloco = shared_memory.SharedMemory(name=nome, track=False)  # Python 3.13+
+            except TypeError:
+                # Antes do 3.13 quem anexa também registra o bloco no rastreador de
+                # recursos; nos processos de um pool esse rastreador é o herdado de quem
+                # publicou, e o registro repetido não tem efeito
+                bloco = shared_memory.SharedMemory(name=nome)
+            _anexados[nome] = bloco
+        return bloco
+
+
+def anexar_array(descritor):
+    """Array somente leitura sobre o bloco do descritor (sem cópia)."""
+    bloco = _abrir(descritor["nome"])
+    valores = np.ndarray(tuple(descritor["forma"]), dtype=np.dtype(descritor["tipo"]),
+                         buffer=bloco.buf, offset=descritor["inicio"])
+    valores.flags.writeable = False
+    return valores
+
+
+def anexar_quadro(descritor):
+    """Quadro sobre os blocos publicados por ``Publicacao.quadro``."""
+    colunas = {}
+    for coluna in descritor["colunas"]:
+        if coluna["tipo"] == "numpy":
+            colunas[coluna["nome"]] = anexar_array(coluna["valores"])
+        elif coluna["tipo"] == "mascarado":
+            tipo = pd.api.types.pandas_dtype(coluna["dtype"])
+            colunas[coluna["nome"]] = tipo.construct_array_type()(
+                anexar_array(coluna["valores"]), anexar_array(coluna["mascara"])
+            )
+        else:
+            distintos = pd.array(coluna["distintos"], dtype=coluna["dtype"])
+            colunas[coluna["nome"]] = distintos.take(anexar_array(coluna["codigos"]), allow_fill=True)
+    indice = descritor["indice"]
+    if "valores" in indice:
+        indice = pd.Index(anexar_array(indice["valores"]))
+    else:
+        indice = pd.RangeIndex(indice["inicio"], indice["fim"], indice["passo"])
+    # copy=False mantém um bloco por coluna, apontando para a memória compartilhada
+    return pd.DataFrame(colunas, index=indice, copy=False)
+
+
+# Benchmark (no nível do módulo: o pool as importa nos processos)
+_quadro_medicao = None
+_tempo_carga = None
+
+
+def _iniciar_medicao(caminho, descritor):
+    global _quadro_medicao, _tempo_carga
+    import time
+
+    from .carregamento import ler_censo
+
+    inicio = time.perf_counter()
+    _quadro_medicao = ler_censo(caminho, validar=False) if descritor is None else anexar_quadro(descritor)
+    _tempo_carga = time.perf_counter() - inicio
+
+
+def _medir_trabalhador(_):
+    import time
+
+    time.sleep(0.2)  # todos os processos do pool ficam vivos ao mesmo tempo
+    _quadro_medicao.sum(numeric_only=True)  # toca todas as colunas
+    # KiB privados do processo (páginas que só ele usa)
+    with open("/proc/self/smaps_rollup") as arquivo:
+        privada = sum(int(linha.split()[1]) for linha in arquivo if linha.startswith("Private_"))
+    return privada, _tempo_carga
+
+
+if __name__ == "__main__":
+    import argparse
+    import os
+    import time
+    from concurrent.futures import ProcessPoolExecutor
+
+    from .carregamento import ler_censo
+    from .compartilhado import _conferir_congelado
+    from .esquema import CAMINHO_CSV
+
+    parser = argparse.ArgumentParser(
+        description="Início do pool e memória por processo: cada trabalhador lê o CSV × anexa o quadro publicado."
+    )
+    parser.add_argument("--processos", type=int, default=4)
+    parser.add_argument("--repetir", type=int, default=100, help="cópias do censo empilhadas (escala municipal)")
+    args = parser.parse_args()
+
+    censo = ler_censo(CAMINHO_CSV)
+    with Publicacao() as publicacao:
+        anexado = anexar_quadro(publicacao.quadro(censo))
+        pd.testing.assert_frame_equal(anexado, censo)
+        _conferir_congelado(anexado)
+        del anexado
+    print("quadro anexado conferido: igual ao publicado, arrays somente leitura")
+    grande = pd.concat([censo] * args.repetir, ignore_index=True)
+    caminho = f"/tmp/censo_{os.getpid()}.parquet"
+    grande.to_parquet(caminho, index=False)
+    print(f"quadro: {len(grande):,} linhas × {grande.shape[1]} colunas, "
+          f"{grande.memory_usage(deep=True).sum() / 2**20:.1f} MiB; {args.processos} processos")
+
+    # Cada medição abre um pool novo, com o próprio inicializador, e devolve a memória de cada processo
+    for nome in ("lendo o arquivo", "anexando"):
+        inicio = time.perf_counter()
+        with Publicacao() as publicacao:
+            descritor = publicacao.quadro(grande) if nome == "anexando" else None
+            publicado = time.perf_counter() - inicio
+            with ProcessPoolExecutor(args.processos, initializer=_iniciar_medicao,
+                                     initargs=(caminho, descritor)) as pool:
+                resultados = list(pool.map(_medir_trabalhador, range(args.processos)))
+        total = time.perf_counter() - inicio
+        privadas = [memoria for memoria, _ in resultados]
+        print(f"{nome:16s} pool pronto em {total:.2f}s (publicação {publicado:.2f}s); "
+              f"privada por processo: {np.mean(privadas) / 1024:.1f} MiB; "
+              f"carga no trabalhador: {np.mean([t for _, t in resultados]) * 1000:.0f} ms")
+    os.remove(caminho)
@@ -0,0 +1,125 @@
+"""Download dos arquivos remotos das páginas (CSV e GeoJSON no GitHub).
+
+Todas as requisições passam por uma única ``requests.Session`` do processo,
+cujo pool mantém as conexões abertas entre downloads e entre sessões do
+Streamlit. Cada arquivo tem o seu tempo limite (conexão, leitura), e
+``em_paralelo`` dispara os downloads de uma página ao mesmo tempo: a carga a
+frio passa a custar o arquivo mais lento, e não a soma de todos.
+"""
+import io
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# (conexão, leitura) em segundos
+TEMPO_LIMITE = (5, 30)
+
+# Conexões mantidas por host (raw.githubusercontent.com atende CSV e GeoJSON)
+CONEXOES_POR_HOST = 8
+
+_sessao = None
+_trava = threading.Lock()
+
+
+def sessao():
+    """Sessão HTTP compartilhada pelo processo, criada no primeiro uso."""
+    global _sessao
+    with _trava:
+        if _sessao is None:
+            _sessao = requests.Session()
+            adaptador = HTTPAdapter(pool_connections=4, pool_maxsize=CONEXOES_POR_HOST)
+            _sessao.mount("http://", adaptador)
+            _sessao.mount("https://", adaptador)
+        return _sessao
+
+
+def baixar(url, tempo_limite=TEMPO_LIMITE):
+    """Conteúdo da URL em bytes; levanta ``requests.HTTPError`` em status 4xx/5xx."""
+    resposta = sessao().get(url, timeout=tempo_limite)
+    resposta.raise_for_status()
+    return resposta.content
+
+
+def abrir(origem, tempo_limite=TEMPO_LIMITE):
+    """Arquivo pronto para ``ler_censo``: URLs baixadas pela sessão, caminhos locais intactos."""
+    if str(origem).startswith(("http://", "https://")):
+        return io.BytesIO(baixar(origem, tempo_limite))
+    return origem
+
+
+def baixar_json(url, tempo_limite=TEMPO_LIMITE):
+    resposta = sessao().get(url, timeout=tempo_limite)
+    resposta.raise_for_status()
+    return resposta.json()
+
+
+def em_paralelo(*tarefas, inicializar=None):
+    """Executa as funções (sem argumentos) ao mesmo tempo e devolve os resultados na ordem.
+
+    ``inicializar`` roda em cada thread antes das tarefas; as páginas o usam
+    para levar o contexto do Streamlit e da instrumentação às threads. A
+    exceção de uma tarefa é relançada na volta.
+    """
+    with ThreadPoolExecutor(max_workers=len(tarefas), initializer=inicializar) as executor:
+        futuros = [executor.submit(tarefa) for tarefa in tarefas]
+        return [futuro.result() for futuro in futuros]
+
+
+def _servidor_local(atrasos):
+    """Servidor HTTP local que responde cada caminho de ``atrasos`` após o atraso dado."""
+    import time
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Atrasado(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            time.sleep(atrasos.get(self.path, 0))
+            corpo = b'{"ok": true}'
+            self.send_response(200 if self.path in atrasos else 404)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(corpo)))
+            self.end_headers()
+            self.wfile.write(corpo)
+
+        def log_message(self, *args):
+            pass
+
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), Atrasado)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor
+
+
+if __name__ == "__main__":
+    import time
+
+    # Dois arquivos com latências diferentes, como o CSV e o GeoJSON da página 5
+    atrasos = {"/censo.csv": 0.6, "/estados.geojson": 0.4, "/lento": 2.0}
+    servidor = _servidor_local(atrasos)
+    base = f"http://127.0.0.1:{servidor.server_address[1]}"
+    csv, geojson = f"{base}/censo.csv", f"{base}/estados.geojson"
+
+    inicio = time.perf_counter()
+    baixar(csv)
+    baixar_json(geojson)
+    sequencial = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    em_paralelo(lambda: baixar(csv), lambda: baixar_json(geojson))
+    paralelo = time.perf_counter() - inicio
+
+    print(f"sequencial {sequencial:.2f}s (soma dos atrasos {atrasos['/censo.csv'] + atrasos['/estados.geojson']:.1f}s)")
+    print(f"paralelo   {paralelo:.2f}s (maior atraso {max(atrasos['/censo.csv'], atrasos['/estados.geojson']):.1f}s)")
+    assert paralelo < 0.8 * sequencial, "os downloads não se sobrepuseram"
+
+    # Tempo limite por arquivo: o lento estoura o seu sem atrasar o outro
+    inicio = time.perf_counter()
+    try:
+        em_paralelo(lambda: baixar(f"{base}/lento", tempo_limite=(1, 0.5)), lambda: baixar(csv))
+    except requests.Timeout:
+        print(f"tempo limite respeitado: falha em {time.perf_counter() - inicio:.2f}s (atraso do servidor 2.0s)")
+    else:
+        raise AssertionError("o tempo limite de leitura não foi aplicado")
+    servidor.shutdown()
@@ -0,0 +1,212 @@
+"""Backend opcional em banco analítico embarcado (DuckDB, ou SQLite da biblioteca padrão).
+
+O censo fica em um arquivo local com índices nas colunas de filtro, e as
+agregações das páginas viram consultas SQL: cada processo lê só o resultado,
+não a tabela inteira. Útil para extrações municipais e de vários anos.
+
+Com ``CENSO_BANCO`` definido, as páginas 1, 2 e 8 e a API (``api.py``) leem
+do banco em vez do CSV: as somas por estado, região, sistema e classe passam
+por ``dados.agregacoes``, e só as linhas que um gráfico mostra uma a uma (os
+pontos do 3D da página 1, a densidade da página 2) saem da tabela, filtradas
+pelo nível territorial.
+"""
+import argparse
+import functools
+import os
+import sqlite3
+import threading
+
+import pandas as pd
+
+from .carregamento import TAMANHO_BLOCO, preparar_dimensoes
+from .esquema import CAMINHO_CSV, CLASSE_TOTAL, DIMENSOES, MEDIDAS, OPCOES_LEITURA
+from .versao import versao_arquivo
+
+try:
+    import duckdb
+except ImportError:  # DuckDB é opcional; sem ele usamos o SQLite
+    duckdb = None
+
+# Caminho do banco usado pelas páginas quando definido no ambiente
+VARIAVEL_AMBIENTE = "CENSO_BANCO"
+
+ANO_PADRAO = 2017
+
+COLUNAS_INDEXADAS = ["NIV_TERR", "COD_TERR", "SIST_CRIA", "CL_GAL"]
+
+_TIPOS_DIMENSOES = {
+    "SIST_CRIA": "TEXT",
+    "NIV_TERR": "TEXT",
+    "COD_TERR": "BIGINT",
+    "NOM_TERR": "TEXT",
+    "CL_GAL": "INTEGER",
+    "NOM_CL_GAL": "TEXT",
+}
+
+COLUNAS_TABELA = ["ANO"] + DIMENSOES + MEDIDAS
+
+
+class BancoCenso:
+    """Tabela ``censo`` em um arquivo DuckDB/SQLite (ou em memória)."""
+
+    def __init__(self, caminho=":memory:", motor=None):
+        if motor is None:
+            motor = "duckdb" if duckdb is not None else "sqlite"
+        if motor == "duckdb":
+            if duckdb is None:
+                raise ImportError("O motor 'duckdb' requer o pacote duckdb instalado.")
+            self.conexao = duckdb.connect(str(caminho))
+        elif motor == "sqlite":
+            self.conexao = sqlite3.connect(str(caminho), check_same_thread=False)
+        else:
+            raise ValueError(f"Motor desconhecido: {motor!r}")
+        self.motor = motor
+        self.caminho = caminho
+        # Conexões DuckDB/SQLite não aceitam consultas simultâneas de várias threads
+        self._trava = threading.Lock()
+        self._criar_tabela()
+
+    def _criar_tabela(self):
+        colunas = ["ANO INTEGER"]
+        colunas += [f"{col} {_TIPOS_DIMENSOES[col]}" for col in DIMENSOES]
+        colunas += [f"{col} DOUBLE" for col in MEDIDAS]
+        self.conexao.execute(f"CREATE TABLE IF NOT EXISTS censo ({', '.join(colunas)})")
+        for col in COLUNAS_INDEXADAS:
+            self.conexao.execute(f"CREATE INDEX IF NOT EXISTS idx_censo_{col.lower()} ON censo ({col})")
+
+    def fechar(self):
+        self.conexao.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+    def importar_csv(self, origem=CAMINHO_CSV, ano=ANO_PADRAO, tamanho_bloco=TAMANHO_BLOCO, encoding="utf-8"):
+        """Carrega o CSV em blocos, substituindo os dados já gravados para o ano.
+
+        Cada bloco é gravado e descartado antes do próximo: o pico de memória
+        é o de um bloco, qualquer que seja o tamanho do arquivo (tabelas
+        municipais).
+        """
+        self.conexao.execute("DELETE FROM censo WHERE ANO = ?", [ano])
+        total = 0
+        leitor = pd.read_csv(origem, encoding=encoding, chunksize=tamanho_bloco, **OPCOES_LEITURA)
+        with leitor:
+            for bloco in leitor:
+                bloco = preparar_dimensoes(bloco)
+                bloco.insert(0, "ANO", ano)
+                self._inserir(bloco[COLUNAS_TABELA])
+                total += len(bloco)
+        if self.motor == "sqlite":
+            self.conexao.commit()
+        return total
+
+    def _inserir(self, bloco):
+        if self.motor == "duckdb":
+            # O DuckDB lê o quadro direto da memória do pandas
+            self.conexao.register("_bloco", bloco)
+            self.conexao.execute(f"INSERT INTO censo SELECT {', '.join(COLUNAS_TABELA)} FROM _bloco")
+            self.conexao.unregister("_bloco")
+        else:
+            linhas = bloco.astype(object).where(bloco.notna(), None).itertuples(index=False, name=None)
+            marcadores = ", ".join("?" * len(COLUNAS_TABELA))
+            self.conexao.executemany(f"INSERT INTO censo VALUES ({marcadores})", linhas)
+
+    def consultar(self, sql, parametros=()):
+        """Executa uma consulta e devolve o resultado como DataFrame."""
+        with self._trava:
+            cursor = self.conexao.execute(sql, list(parametros))
+            colunas = [d[0] for d in cursor.description]
+            linhas = cursor.fetchall()
+        return pd.DataFrame(linhas, columns=colunas)
+
+    def anos(self):
+        return self.consultar("SELECT DISTINCT ANO FROM censo ORDER BY ANO")["ANO"].tolist()
+
+    def _ano(self, ano):
+        if ano is None:
+            ano = self.consultar("SELECT MAX(ANO) AS ANO FROM censo")["ANO"].iloc[0]
+        return int(ano) if ano is not None and not pd.isna(ano) else ANO_PADRAO
+
+    def ler(self, colunas, nivel=None, ano=None):
+        """Linhas de um nível territorial (todos com None), só com ``colunas``, como ``ler_censo``."""
+        desconhecidas = [col for col in colunas if col not in COLUNAS_TABELA]
+        if desconhecidas:
+            raise ValueError(f"Colunas desconhecidas no banco: {desconhecidas}")
+        condicoes, parametros = ["ANO = ?"], [self._ano(ano)]
+        if nivel is not None:
+            condicoes.append("NIV_TERR = ?")
+            parametros.append(nivel)
+        resultado = self.consultar(
+            f"SELECT {', '.join(colunas)} FROM censo WHERE {' AND '.join(condicoes)} "
+            f"ORDER BY NIV_TERR, COD_TERR, SIST_CRIA, CL_GAL",
+            parametros,
+        )
+        for col in colunas:
+            if col in MEDIDAS:
+                resultado[col] = resultado[col].astype("float64")
+        return resultado
+
+    def agregar(self, medida, por, nivel, sistema=None, classes="total", regiao=None, ano=None):
+        """Versão SQL de ``agregacoes.agregar`` (colunas já validadas lá)."""
+        grupo = ", ".join(por)
+        condicoes = ["NIV_TERR = ?", "CL_GAL = ?" if classes == "total" else "CL_GAL <> ?"]
+        parametros = [nivel, CLASSE_TOTAL]
+        if sistema is not None:
+            condicoes.append("SIST_CRIA = ?")
+            parametros.append(sistema)
+        if regiao is not None:
+            # Estados da região: códigos de 10 * região a 10 * região + 9 (usa o índice de COD_TERR)
+            if nivel == "GR":
+                condicoes.append("COD_TERR = ?")
+                parametros.append(int(regiao))
+            else:
+                condicoes.append("COD_TERR BETWEEN ? AND ?")
+                parametros += [10 * int(regiao), 10 * int(regiao) + 9]
+        condicoes.append("ANO = ?")
+        parametros.append(self._ano(ano))
+
+        sql = (
+            f"SELECT {grupo}, SUM({medida}) AS {medida} FROM censo "
+            f"WHERE {' AND '.join(condicoes)} GROUP BY {grupo} ORDER BY {grupo}"
+        )
+        resultado = self.consultar(sql, parametros)
+        resultado[medida] = resultado[medida].astype("float64")
+        return resultado
+
+
+# Extensões abertas com o SQLite; as demais, com o motor padrão
+EXTENSOES_SQLITE = (".sqlite", ".sqlite3", ".db")
+
+
+def banco_configurado():
+    """Abre o banco indicado em ``CENSO_BANCO``, ou devolve None se não houver."""
+    caminho = os.environ.get(VARIAVEL_AMBIENTE)
+    if not caminho:
+        return None
+    return BancoCenso(caminho, motor="sqlite" if caminho.lower().endswith(EXTENSOES_SQLITE) else None)
+
+
+@functools.lru_cache(maxsize=None)
+def banco_das_paginas():
+    """O banco de ``CENSO_BANCO`` aberto uma vez por processo e usado por todas as páginas (None sem banco)."""
+    return banco_configurado()
+
+
+def versao_banco(banco):
+    """Versão (hash curto) do arquivo do banco, que entra na chave dos caches das páginas."""
+    return versao_arquivo(banco.caminho)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Importa o CSV do censo para o banco embarcado.")
+    parser.add_argument("banco", help="arquivo do banco (ex.: censo.duckdb)")
+    parser.add_argument("csv", nargs="?", default=str(CAMINHO_CSV))
+    parser.add_argument("--ano", type=int, default=ANO_PADRAO)
+    parser.add_argument("--motor", choices=["duckdb", "sqlite"])
+    args = parser.parse_args()
+    with BancoCenso(args.banco, motor=args.motor) as banco:
+        linhas = banco.importar_csv(args.csv, ano=args.ano)
+    print(f"{linhas} linhas importadas em {args.banco} ({banco.motor}).")
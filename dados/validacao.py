@@ -0,0 +1,144 @@
+"""Consistência hierárquica do censo: UF → Grande Região → Brasil (e MU → UF).
+
+O CSV empilha os níveis territoriais; cada célula sistema × classe de um
+território pai deve ser a soma da mesma célula nos seus filhos. A checagem
+roda sobre o cubo, todas as medidas de uma vez: para cada par de níveis, a
+soma dos filhos é um único produto de matrizes (pais × filhos) · (filhos ×
+células), comparado com os valores dos pais.
+
+Células sob sigilo (NaN) nos filhos tornam a soma incompleta: nesse caso só
+é divergência a soma dos filhos informados passar do valor do pai.
+"""
+import numpy as np
+import pandas as pd
+
+from .cubo import CuboCenso, montar_cubo
+from .derivadas import DERIVADAS
+from .esquema import MEDIDAS
+
+# (nível filho, nível pai, código do pai a partir do código do filho)
+HIERARQUIA = [
+    ("MU", "UF", lambda cod: cod // 100_000),
+    ("UF", "GR", lambda cod: cod // 10),
+    ("GR", "BR", lambda cod: cod * 0),
+]
+
+# O IBGE arredonda cada célula (áreas em ha, valores em mil R$): a soma de n
+# filhos pode se afastar do pai em até meia unidade por parcela, pai incluído
+TOLERANCIA_ABSOLUTA = 0.5
+TOLERANCIA_RELATIVA = 1e-6
+
+COLUNAS_RELATORIO = [
+    "NIV_FILHO", "NIV_PAI", "COD_TERR", "NOM_TERR", "SIST_CRIA", "CL_GAL", "MEDIDA",
+    "VALOR_PAI", "SOMA_FILHOS", "DIFERENCA", "FILHOS_SEM_VALOR",
+]
+
+
+class ErroConsistencia(ValueError):
+    """Totais de um nível territorial não batem com a soma do nível abaixo."""
+
+    def __init__(self, relatorio):
+        self.relatorio = relatorio
+        resumo = relatorio.groupby(["NIV_FILHO", "NIV_PAI"]).size()
+        detalhes = ", ".join(f"{filho}→{pai}: {n}" for (filho, pai), n in resumo.items())
+        super().__init__(f"{len(relatorio)} células divergentes ({detalhes})")
+
+
+def _comparar(cubo, nivel_filho, nivel_pai, codigo_pai, tol_abs, tol_rel):
+    territorios = cubo.territorios
+    filhos = np.flatnonzero(cubo.mascara_nivel(nivel_filho))
+    pais = np.flatnonzero(cubo.mascara_nivel(nivel_pai))
+    if len(filhos) == 0 or len(pais) == 0:
+        return None
+
+    # Posição do pai de cada filho entre os pais (-1 = pai ausente do arquivo)
+    codigos_pais = pd.Index(territorios["COD_TERR"].to_numpy()[pais])
+    pai_de = codigos_pais.get_indexer(codigo_pai(territorios["COD_TERR"].to_numpy()[filhos]))
+    com_pai = pai_de >= 0
+    filhos, pai_de = filhos[com_pai], pai_de[com_pai]
+
+    incidencia = np.zeros((len(pais), len(filhos)))
+    incidencia[pai_de, np.arange(len(filhos))] = 1.0
+
+    valores_filhos = cubo.valores[filhos].reshape(len(filhos), -1)
+    ausentes = np.isnan(valores_filhos)
+    soma = (incidencia @ np.where(ausentes, 0.0, valores_filhos)).reshape((len(pais),) + cubo.forma[1:])
+    sem_valor = (incidencia @ ausentes).reshape(soma.shape)
+    parcelas = incidencia.sum(axis=1)[:, None, None, None] - sem_valor + 1
+    valor_pai = cubo.valores[pais]
+
+    limite = tol_abs * parcelas + tol_rel * np.abs(valor_pai)
+    # Filhos sob sigilo: a soma informada só não pode passar do total do pai
+    divergente = np.where(sem_valor > 0, soma - valor_pai > limite, np.abs(soma - valor_pai) > limite)
+    # Pai sem valor não tem o que comparar
+    divergente &= ~np.isnan(valor_pai)
+
+    p, s, c, m = np.nonzero(divergente)
+    return pd.DataFrame({
+        "NIV_FILHO": nivel_filho,
+        "NIV_PAI": nivel_pai,
+        "COD_TERR": territorios["COD_TERR"].to_numpy()[pais[p]],
+        "NOM_TERR": territorios["NOM_TERR"].to_numpy()[pais[p]],
+        "SIST_CRIA": np.asarray(cubo.sistemas, dtype=object)[s],
+        "CL_GAL": cubo.classes["CL_GAL"].to_numpy()[c],
+        "MEDIDA": np.asarray(cubo.medidas, dtype=object)[m],
+        "VALOR_PAI": valor_pai[p, s, c, m],
+        "SOMA_FILHOS": soma[p, s, c, m],
+        "DIFERENCA": soma[p, s, c, m] - valor_pai[p, s, c, m],
+        "FILHOS_SEM_VALOR": sem_valor[p, s, c, m].astype("int64"),
+    })
+
+
+def validar_hierarquia(fonte, medidas=None, tolerancia_absoluta=TOLERANCIA_ABSOLUTA,
+                       tolerancia_relativa=TOLERANCIA_RELATIVA):
+    """Relatório das células em que o pai difere da soma dos filhos (vazio = consistente).
+
+    ``fonte`` é o quadro do censo ou um ``CuboCenso``. Derivadas (razões)
+    ficam de fora: não se somam entre territórios. Um quadro sem nenhuma
+    medida (só descritivas) não tem o que verificar.
+    """
+    if not isinstance(fonte, CuboCenso) and not any(col in MEDIDAS for col in fonte.columns):
+        return pd.DataFrame(columns=COLUNAS_RELATORIO)
+    if isinstance(fonte, CuboCenso):
+        cubo = fonte
+    else:
+        cubo = montar_cubo(fonte, medidas, derivadas=False)
+    if medidas is not None or any(m in DERIVADAS for m in cubo.medidas):
+        manter = [m for m in (medidas or cubo.medidas) if m in cubo.medidas and m not in DERIVADAS]
+        posicoes = [cubo.indice_medida(m) for m in manter]
+        cubo = CuboCenso(cubo.territorios, cubo.sistemas, cubo.classes, manter, cubo.valores[..., posicoes])
+
+    partes = [
+        _comparar(cubo, filho, pai, codigo_pai, tolerancia_absoluta, tolerancia_relativa)
+        for filho, pai, codigo_pai in HIERARQUIA
+    ]
+    partes = [p for p in partes if p is not None and not p.empty]
+    if not partes:
+        return pd.DataFrame(columns=COLUNAS_RELATORIO)
+    return pd.concat(partes, ignore_index=True)
+
+
+def verificar_hierarquia(fonte, **opcoes):
+    """Levanta ``ErroConsistencia`` se houver divergência; devolve ``fonte`` intacta."""
+    relatorio = validar_hierarquia(fonte, **opcoes)
+    if not relatorio.empty:
+        raise ErroConsistencia(relatorio)
+    return fonte
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    from .carregamento import ler_censo
+    from .esquema import CAMINHO_CSV
+
+    df = ler_censo(sys.argv[1] if len(sys.argv) > 1 else CAMINHO_CSV, validar=False)
+    inicio = time.perf_counter()
+    relatorio = validar_hierarquia(df)
+    print(f"{len(df)} linhas verificadas em {time.perf_counter() - inicio:.3f}s")
+    if relatorio.empty:
+        print("Totais consistentes entre os níveis territoriais.")
+    else:
+        print(relatorio.to_string(index=False))
+        sys.exit(1)
@@ -0,0 +1,237 @@
+"""Versão dos dados: hash do conteúdo dos arquivos de origem.
+
+``registro_versoes`` acompanha os arquivos locais do painel (o CSV do censo
+e a planilha de descrição das variáveis). Cada cache que depende de um
+deles se declara com ``dependente`` e recebe a versão do arquivo como
+argumento; o vigia (``vigiar``) confere os arquivos em segundo plano e, quando
+um muda, regrava o instantâneo Parquet (se houver), avança a geração e limpa
+só os caches daquele arquivo. Os demais (GeoJSON, dados remotos) continuam
+aquecidos, e a nova versão entra no ar sem reiniciar o servidor.
+"""
+import hashlib
+import inspect
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from .esquema import CAMINHO_CSV, CAMINHO_DESCRICOES
+from .validacao import ErroConsistencia
+
+logger = logging.getLogger("painel.versoes")
+
+# Erros de um arquivo lido enquanto é gravado (sumiu, truncado, cortado no meio de um caractere):
+# o vigia tenta de novo em silêncio; os demais vão para o log
+GRAVACAO_PARCIAL = (OSError, EOFError, UnicodeDecodeError, pd.errors.EmptyDataError, pd.errors.ParserError)
+
+_TAMANHO_LEITURA = 1 << 20
+
+# Segundos entre duas conferências do vigia (só ``os.stat``; o hash é refeito quando muda)
+INTERVALO_VIGIA = 2.0
+_hashes = {}
+_trava = threading.Lock()
+
+
+def hash_arquivo(caminho):
+    """SHA-256 do conteúdo do arquivo, lido em blocos de 1 MiB."""
+    digest = hashlib.sha256()
+    with open(caminho, "rb") as arquivo:
+        for bloco in iter(lambda: arquivo.read(_TAMANHO_LEITURA), b""):
+            digest.update(bloco)
+    return digest.hexdigest()
+
+
+def versao_arquivo(caminho):
+    """Hash curto do arquivo, recalculado só quando tamanho ou mtime mudam."""
+    caminho = os.fspath(caminho)
+    info = os.stat(caminho)
+    assinatura = (info.st_mtime_ns, info.st_size)
+    with _trava:
+        guardado = _hashes.get(caminho)
+    if guardado is not None and guardado[0] == assinatura:
+        return guardado[1]
+    versao = hash_arquivo(caminho)[:16]
+    with _trava:
+        _hashes[caminho] = (assinatura, versao)
+    return versao
+
+
+class RegistroVersoes:
+    """Versão de cada arquivo acompanhado e os caches que dependem dele."""
+
+    def __init__(self, arquivos):
+        self.arquivos = dict(arquivos)  # nome → caminho
+        self.geracao = 0  # avança a cada mudança detectada
+        self._versoes = {}
+        self._recusadas = {}  # nome → versão recusada por um preparo (não é tentada de novo)
+        self._preparos = {nome: [] for nome in self.arquivos}
+        self._dependentes = {nome: {} for nome in self.arquivos}
+        self._trava = threading.Lock()
+        self._vigia = None
+
+    def _ler(self, nome):
+        try:
+            return versao_arquivo(self.arquivos[nome])
+        except FileNotFoundError:
+            return None
+
+    def versao(self, nome):
+        """Versão atual do arquivo ``nome`` (hash curto; None se o arquivo não existe)."""
+        with self._trava:
+            if nome not in self._versoes:
+                self._versoes[nome] = self._ler(nome)
+            return self._versoes[nome]
+
+    def ao_mudar(self, nome, preparar):
+        """``preparar(caminho)`` roda quando o arquivo muda, antes de os caches serem limpos."""
+        with self._trava:
+            if preparar not in self._preparos[nome]:
+                self._preparos[nome].append(preparar)
+
+    def dependente(self, *nomes):
+        """Decorador: a função cacheada (com ``.clear``) é limpa quando algum dos arquivos muda.
+
+        As páginas são reexecutadas a cada interação; a chave (arquivo-fonte e
+        nome da função) evita registrar a mesma função mais de uma vez.
+        """
+        def registrar(funcao):
+            original = inspect.unwrap(funcao)
+            chave = (getattr(getattr(original, "__code__", None), "co_filename", ""), original.__qualname__)
+            with self._trava:
+                for nome in nomes:
+                    self._dependentes[nome][chave] = funcao.clear
+            return funcao
+        return registrar
+
+    def verificar(self):
+        """Confere os arquivos; para cada um que mudou, prepara, avança a geração e limpa os dependentes.
+
+        Devolve os nomes dos arquivos que mudaram. Uma versão que um preparo
+        recusa (``ErroConsistencia`` da validação, ou outro erro que não seja
+        de arquivo pela metade) é registrada no log uma vez e ignorada até o
+        arquivo mudar de novo; a anterior segue no ar. O arquivo pela metade
+        (``GRAVACAO_PARCIAL``) sobe para quem chamou, e a próxima conferência
+        tenta de novo.
+        """
+        mudaram = []
+        for nome, caminho in self.arquivos.items():
+            atual = self._ler(nome)
+            with self._trava:
+                if nome not in self._versoes:
+                    self._versoes[nome] = atual
+                    continue
+                if atual == self._versoes[nome] or atual == self._recusadas.get(nome):
+                    continue
+                anterior = self._versoes[nome]
+                preparos = list(self._preparos[nome])
+                limpezas = list(self._dependentes[nome].values())
+            # Validação e instantâneo antes de a nova versão ficar visível
+            if atual is not None:
+                try:
+                    for preparar in preparos:
+                        preparar(caminho)
+                except GRAVACAO_PARCIAL:
+                    raise
+                except Exception as erro:
+                    with self._trava:
+                        self._recusadas[nome] = atual
+                    logger.warning("versão %s de %s recusada (%s: %s); mantida a versão %s",
+                                   atual, caminho, type(erro).__name__, erro, anterior,
+                                   exc_info=not isinstance(erro, ErroConsistencia))
+                    continue
+            with self._trava:
+                self._versoes[nome] = atual
+                self.geracao += 1
+            for limpar in limpezas:
+                limpar()
+            mudaram.append(nome)
+        return mudaram
+
+    def vigiar(self, intervalo=INTERVALO_VIGIA):
+        """Inicia (uma vez por processo) a thread que chama ``verificar`` a cada ``intervalo`` segundos."""
+        with self._trava:
+            if self._vigia is None:
+                self._vigia = threading.Thread(target=self._vigiar, args=(intervalo,), name="vigia-versoes",
+                                               daemon=True)
+                self._vigia.start()
+        return self._vigia
+
+    def _vigiar(self, intervalo):
+        while True:
+            time.sleep(intervalo)
+            try:
+                self.verificar()
+            except GRAVACAO_PARCIAL:
+                # Arquivo no meio de uma gravação: a próxima conferência tenta de novo
+                continue
+            except Exception:
+                logger.exception("falha ao conferir as versões de %s", ", ".join(self.arquivos))
+
+
+def validar_censo(caminho):
+    """Lê o CSV novo com a validação da hierarquia (``ErroConsistencia`` se os totais não baterem)."""
+    from .carregamento import ler_censo
+
+    ler_censo(caminho, validar=True)
+
+
+def atualizar_instantaneo(caminho):
+    """Regrava o instantâneo Parquet do CSV, se ele já existir ao lado do arquivo."""
+    from .carregamento import gravar_instantaneo
+
+    destino = Path(caminho).with_suffix(".parquet")
+    if destino.exists():
+        # Grava ao lado e troca de uma vez: nenhum leitor vê o arquivo pela metade
+        temporario = destino.with_name(f".{destino.name}.{os.getpid()}")
+        gravar_instantaneo(caminho, temporario)
+        os.replace(temporario, destino)
+
+
+# Arquivos locais do painel
+registro_versoes = RegistroVersoes({"censo": CAMINHO_CSV, "descricoes": CAMINHO_DESCRICOES})
+registro_versoes.ao_mudar("censo", validar_censo)
+registro_versoes.ao_mudar("censo", atualizar_instantaneo)
+
+
+if __name__ == "__main__":
+    import shutil
+    import tempfile
+
+    logging.basicConfig(level=logging.WARNING, format="%(name)s %(levelname)s %(message)s")
+
+    # Sem instantâneo ao lado (o padrão: o .parquet não é versionado), um CSV inconsistente
+    # não pode entrar no ar nem limpar os caches
+    with tempfile.TemporaryDirectory() as pasta:
+        csv = Path(pasta) / CAMINHO_CSV.name
+        shutil.copyfile(CAMINHO_CSV, csv)
+        registro = RegistroVersoes({"censo": csv})
+        registro.ao_mudar("censo", validar_censo)
+        registro.ao_mudar("censo", atualizar_instantaneo)
+        limpezas = []
+        registro.dependente("censo")(type("Cache", (), {"clear": lambda: limpezas.append(1)}))
+        original = registro.versao("censo")
+
+        # Um total de UF multiplicado por 10: a soma das UFs deixa de bater com a região
+        linhas = csv.read_text(encoding="utf-8").split("\n")
+        cabecalho = linhas[0].split(";")
+        nivel, total = cabecalho.index("NIV_TERR"), cabecalho.index("GAL_TOTAL")
+        for i, linha in enumerate(linhas[1:], 1):
+            campos = linha.split(";")
+            if len(campos) > total and campos[nivel] == "UF" and campos[total][:1].isdigit():
+                campos[total] += "0"
+                linhas[i] = ";".join(campos)
+                break
+        csv.write_text("\n".join(linhas), encoding="utf-8")
+        assert registro.verificar() == [] and registro.verificar() == []
+        assert registro.versao("censo") == original and registro.geracao == 0 and not limpezas
+        assert not csv.with_suffix(".parquet").exists()
+
+        # Corrigido o arquivo, a versão nova entra e os dependentes são limpos
+        shutil.copyfile(CAMINHO_CSV, csv)
+        with open(csv, "a", encoding="utf-8") as arquivo:
+            arquivo.write("\n")
+        assert registro.verificar() == ["censo"] and registro.geracao == 1 and limpezas == [1]
+    print("CSV inconsistente recusado sem instantâneo; a versão corrigida entra no ar")
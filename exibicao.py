@@ -0,0 +1,15 @@
+"""Exibição das figuras Plotly nas páginas.
+
+``plotly_chart`` substitui ``st.plotly_chart`` em todas as páginas: antes de
+enviar a figura, converte os arrays numéricos das traces para o menor tipo
+exato (``graficos.serializacao.compactar``), que o Plotly codifica em
+base64, e o JSON sai pelo orjson quando instalado. As opções são as mesmas
+do ``st.plotly_chart`` (``key``, ``on_select``...).
+"""
+import streamlit as st
+
+from graficos.serializacao import compactar
+
+
+def plotly_chart(fig, **opcoes):
+    return st.plotly_chart(compactar(fig), **opcoes)
@@ -0,0 +1,322 @@
+"""Exporta as figuras das páginas 1–8 para um relatório estático (HTML e PNG).
+
+Gera uma figura para cada combinação de região, sistema e métrica oferecida
+pelos widgets das páginas, em paralelo num pool de processos. Um manifesto
+com o hash do conteúdo de cada figura (dados, parâmetros e código que a
+constrói) permite pular, na execução seguinte, as figuras que não mudaram.
+
+Uso: python exportar_relatorio.py [--saida relatorio] [--processos N] [--sem-mapas] [--js-compartilhado]
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+import unicodedata
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import plotly.io as pio
+import requests
+
+from dados import CAMINHO_CSV, MEDIDAS_DISTRIBUICAO, DistribuicaoPorte, ler_censo, montar_cubo, vista
+from dados.memoria_compartilhada import Publicacao, anexar_quadro
+from dados.versao import hash_arquivo
+from graficos import (
+    colaboradores,
+    correlacao,
+    galinaceos,
+    lucratividade,
+    matrizes,
+    porte,
+    producao,
+    sistemas,
+)
+
+try:
+    import kaleido  # noqa: F401  (necessário só para as imagens estáticas)
+except ImportError:
+    kaleido = None
+
+GEOJSON_BR_STATES_URL = 'https://raw.githubusercontent.com/codeforamerica/click_that_hood/master/public/data/brazil-states.geojson'
+
+RAIZ = Path(__file__).resolve().parent
+MANIFESTO = "manifesto.json"
+
+Tarefa = namedtuple("Tarefa", "pagina nome construir parametros")
+
+# Estado de cada processo do pool, preenchido por _iniciar_trabalhador
+_censo = None
+_mapa_base = None
+
+
+def _iniciar_trabalhador(descritor_censo, geojson_data):
+    global _censo, _mapa_base
+    # O censo lido pelo processo principal, em memória compartilhada: sem ler nem copiar o CSV
+    _censo = anexar_quadro(descritor_censo)
+    # Geometrias embutidas (o HTML exportado abre sem rede), montadas uma vez por processo
+    _mapa_base = galinaceos.figura_mapa_base(geojson_data) if geojson_data is not None else None
+
+
+# ---------------------------------------------------------------------------
+# Construção das figuras de cada página (executadas nos processos do pool)
+# ---------------------------------------------------------------------------
+
+def _pagina1(figura):
+    if figura == "dispersao_3d":
+        df = matrizes.preparar(vista(_censo))
+        return matrizes.figura_dispersao_3d(matrizes.dados_3d(df[df['NIV_TERR'] == 'UF']))
+    df_estados, df_regioes = matrizes.agregados(_censo)
+    construtores = {
+        "matrizes_por_estado": (matrizes.figura_matrizes_por_estado, df_estados),
+        "matrizes_por_regiao": (matrizes.figura_matrizes_por_regiao, df_regioes),
+        "sistemas_por_regiao": (matrizes.figura_sistemas_por_regiao, df_regioes),
+    }
+    construtor, dados = construtores[figura]
+    return construtor(dados)
+
+
+def _pagina2(figura, tipo_producao=None):
+    df = sistemas.preparar(vista(_censo))
+    if figura == "producao_por_sistema":
+        return sistemas.figura_producao_por_sistema(df, tipo_producao)
+    df_plot = df[['SIST_CRIA', 'GAL_TOTAL']].dropna()
+    if figura == "densidade_aves":
+        return sistemas.figura_densidade_aves(df_plot)
+    return sistemas.figura_histograma_aves(df_plot)
+
+
+def _pagina3():
+    return lucratividade.figura_coeficientes_3d(lucratividade.tabela_coeficientes())
+
+
+def _pagina4(figura, features):
+    df = producao.dados_simulados()
+    if figura == "dispersao_3d":
+        return producao.figura_dispersao_3d(df)
+    if figura == "correlacao":
+        return producao.figura_correlacao(df)
+    ajuste = producao.ajustar_modelo(df, list(features))
+    if figura == "previsoes_3d":
+        return producao.figura_previsoes_3d(ajuste['y_test'], ajuste['y_pred'])
+    if figura == "residuos":
+        return producao.figura_residuos(ajuste['y_test'], ajuste['y_pred'])
+    return producao.figura_coeficientes(ajuste['colunas'], ajuste['modelo'].coef_)
+
+
+def _pagina5(figura, metrica, regiao):
+    df_uf = galinaceos.preparar(galinaceos.converter_metricas(vista(_censo)))
+    info = galinaceos.DATA_VARS[metrica]
+    sufixo = galinaceos.sufixo_regiao(regiao)
+    df_plot = galinaceos.dados_por_uf(df_uf, info['column_name'], info['y_axis_label'], regiao)
+    if figura == "mapa":
+        return galinaceos.figura_mapa(df_plot, _mapa_base, info['display_title'], info['y_axis_label'], sufixo)
+    return galinaceos.figura_barras_por_uf(df_plot, info['display_title'], info['y_axis_label'], sufixo,
+                                           formato=info.get('formato', ',.0f'))
+
+
+def _pagina6(col_x, col_y, nivel):
+    df_filtrado = _censo[_censo["NIV_TERR"] == nivel]
+    return correlacao.figura_dispersao(df_filtrado, col_x, col_y, nivel)
+
+
+def _pagina7():
+    return colaboradores.figura_tamanho_trabalhadores(colaboradores.preparar(vista(_censo)))
+
+
+def _pagina8():
+    cubo = montar_cubo(_censo, medidas=list(MEDIDAS_DISTRIBUICAO), derivadas=False)
+    return porte.figura_distribuicao_porte(DistribuicaoPorte(cubo).tabela())
+
+
+# Código de que as figuras dependem (o conteúdo entra no hash do manifesto): a leitura do
+# censo, comum a todas as páginas, e os arquivos de cada página, como nos passos de precomputar.py
+CODIGO_CENSO = [
+    "dados/carregamento.py", "dados/derivadas.py", "dados/esquema.py", "dados/validacao.py",
+    "dados/compartilhado.py", "dados/memoria_compartilhada.py",
+]
+DEPENDENCIAS = {
+    1: ["graficos/matrizes.py", "dados/agregacoes.py"],
+    2: ["graficos/sistemas.py", "dados/agregacoes.py"],
+    3: ["graficos/lucratividade.py"],
+    4: ["graficos/producao.py"],
+    5: ["graficos/galinaceos.py"],
+    6: ["graficos/correlacao.py"],
+    7: ["graficos/colaboradores.py"],
+    8: ["graficos/porte.py", "dados/distribuicao.py", "dados/cubo.py"],
+}
+
+
+def listar_tarefas(niveis, com_mapas=True):
+    """Todas as figuras do relatório, uma por combinação dos widgets das páginas."""
+    tarefas = [
+        Tarefa(1, "matrizes_por_estado", _pagina1, {"figura": "matrizes_por_estado"}),
+        Tarefa(1, "matrizes_por_regiao", _pagina1, {"figura": "matrizes_por_regiao"}),
+        Tarefa(1, "sistemas_por_regiao", _pagina1, {"figura": "sistemas_por_regiao"}),
+        Tarefa(1, "dispersao_3d", _pagina1, {"figura": "dispersao_3d"}),
+        Tarefa(2, "densidade_aves", _pagina2, {"figura": "densidade_aves"}),
+        Tarefa(2, "histograma_aves", _pagina2, {"figura": "histograma_aves"}),
+        Tarefa(3, "coeficientes_3d", _pagina3, {}),
+        Tarefa(7, "tamanho_trabalhadores", _pagina7, {}),
+        Tarefa(8, "distribuicao_porte", _pagina8, {}),
+    ]
+    for tipo in sistemas.TIPOS_PRODUCAO:
+        tarefas.append(Tarefa(2, f"producao_por_sistema_{tipo}", _pagina2,
+                              {"figura": "producao_por_sistema", "tipo_producao": tipo}))
+    # Página 4: o multiselect admite qualquer subconjunto; exportamos a seleção padrão
+    for figura in ["dispersao_3d", "correlacao", "previsoes_3d", "residuos", "coeficientes"]:
+        tarefas.append(Tarefa(4, figura, _pagina4, {"figura": figura, "features": producao.PREDITORAS_PADRAO}))
+    regioes = [galinaceos.TODAS_AS_REGIOES] + list(galinaceos.REGIOES_ESTADOS)
+    figuras_p5 = ["barras", "mapa"] if com_mapas else ["barras"]
+    for metrica in galinaceos.DATA_VARS:
+        for regiao in regioes:
+            for figura in figuras_p5:
+                tarefas.append(Tarefa(5, f"{figura}_{metrica}_{regiao}", _pagina5,
+                                      {"figura": figura, "metrica": metrica, "regiao": regiao}))
+    # Página 6: X × Y livres seriam milhares de figuras; exportamos os pares sugeridos por nível
+    for col_x, col_y in correlacao.PARES_SUGERIDOS:
+        for nivel in niveis:
+            tarefas.append(Tarefa(6, f"{col_x}_x_{col_y}_{nivel}", _pagina6,
+                                  {"col_x": col_x, "col_y": col_y, "nivel": nivel}))
+    return tarefas
+
+
+def _nome_arquivo(nome):
+    ascii_ = unicodedata.normalize('NFKD', nome).encode('ascii', 'ignore').decode()
+    return re.sub(r'[^A-Za-z0-9_.-]+', '-', ascii_).strip('-').lower()
+
+
+def _hash_codigo(arquivos):
+    digest = hashlib.sha256(Path(__file__).read_bytes())
+    for arquivo in arquivos:
+        digest.update((RAIZ / arquivo).read_bytes())
+    return digest.hexdigest()
+
+
+def hash_tarefa(tarefa, versoes, formatos, js):
+    conteudo = json.dumps(
+        [versoes, _hash_codigo(CODIGO_CENSO + DEPENDENCIAS[tarefa.pagina]), tarefa.pagina, tarefa.nome,
+         tarefa.parametros, formatos, js],
+        sort_keys=True, default=str,
+    )
+    return hashlib.sha256(conteudo.encode()).hexdigest()
+
+
+def _gravar_figura(tarefa, destino, formatos, js):
+    """Executada no pool: constrói a figura e grava os arquivos pedidos."""
+    inicio = time.perf_counter()
+    fig = tarefa.construir(**tarefa.parametros)
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    arquivos = []
+    if "html" in formatos:
+        caminho = destino.with_suffix(".html")
+        fig.write_html(caminho, include_plotlyjs=js, full_html=True)
+        arquivos.append(caminho.name)
+    if "png" in formatos:
+        caminho = destino.with_suffix(".png")
+        fig.write_image(caminho, width=1400, height=800)
+        arquivos.append(caminho.name)
+    return arquivos, time.perf_counter() - inicio
+
+
+def _carregar_geojson():
+    try:
+        resposta = requests.get(GEOJSON_BR_STATES_URL, timeout=30)
+        resposta.raise_for_status()
+        return galinaceos.normalizar_geojson(resposta.json())
+    except Exception as e:
+        print(f"Aviso: GeoJSON indisponível ({e}); mapas da página 5 não serão exportados.", file=sys.stderr)
+        return None
+
+
+def _ler_manifesto(saida):
+    try:
+        return json.loads((saida / MANIFESTO).read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _gravar_manifesto(saida, manifesto):
+    temporario = saida / (MANIFESTO + ".tmp")
+    temporario.write_text(json.dumps(manifesto, indent=2, ensure_ascii=False), encoding="utf-8")
+    os.replace(temporario, saida / MANIFESTO)
+
+
+def exportar(saida, caminho_csv=CAMINHO_CSV, processos=None, com_mapas=True, js_compartilhado=False, forcar=False):
+    saida = Path(saida)
+    saida.mkdir(parents=True, exist_ok=True)
+
+    formatos = ["html"] + (["png"] if kaleido is not None else [])
+    if kaleido is None:
+        print("Aviso: pacote 'kaleido' não instalado; exportando apenas HTML.", file=sys.stderr)
+    # True embute a biblioteca em cada HTML (o arquivo abre sozinho, copiado para qualquer lugar);
+    # "directory" grava um único plotly.min.js ao lado dos HTML, que só abrem junto com ele
+    js = "directory" if js_compartilhado else True
+
+    geojson_data = _carregar_geojson() if com_mapas else None
+    versoes = {"csv": hash_arquivo(caminho_csv)}
+    if geojson_data is not None:
+        versoes["geojson"] = hashlib.sha256(json.dumps(geojson_data, sort_keys=True).encode()).hexdigest()
+
+    censo = ler_censo(caminho_csv)
+    niveis = censo["NIV_TERR"].unique().tolist()
+    tarefas = listar_tarefas(niveis, com_mapas=geojson_data is not None)
+    manifesto = _ler_manifesto(saida)
+
+    pendentes = []
+    for tarefa in tarefas:
+        chave = f"pagina{tarefa.pagina}/{_nome_arquivo(tarefa.nome)}"
+        hash_atual = hash_tarefa(tarefa, versoes, formatos, js)
+        registro = manifesto.get(chave, {})
+        intactos = all((saida / "pagina{}".format(tarefa.pagina) / a).exists() for a in registro.get("arquivos", []))
+        if not forcar and registro.get("hash") == hash_atual and intactos:
+            continue
+        pendentes.append((chave, hash_atual, tarefa))
+
+    print(f"{len(tarefas)} figuras no relatório; {len(tarefas) - len(pendentes)} inalteradas, {len(pendentes)} a gerar.")
+    if pendentes and js == "directory":
+        # Grava plotly.min.js uma vez em cada pasta antes de abrir o pool
+        for pagina in {t.pagina for _, _, t in pendentes}:
+            pasta = saida / f"pagina{pagina}"
+            pasta.mkdir(exist_ok=True)
+            pio.write_html({"data": [], "layout": {}}, pasta / ".js.html", include_plotlyjs="directory")
+            (pasta / ".js.html").unlink()
+
+    falhas = 0
+    with Publicacao() as publicacao, ProcessPoolExecutor(
+        max_workers=processos, initializer=_iniciar_trabalhador,
+        initargs=(publicacao.quadro(censo), geojson_data),
+    ) as pool:
+        futuros = {
+            pool.submit(_gravar_figura, tarefa, saida / chave, formatos, js): (chave, hash_atual)
+            for chave, hash_atual, tarefa in pendentes
+        }
+        for futuro in as_completed(futuros):
+            chave, hash_atual = futuros[futuro]
+            try:
+                arquivos, duracao = futuro.result()
+            except Exception as e:
+                falhas += 1
+                print(f"  ERRO {chave}: {e}", file=sys.stderr)
+                continue
+            manifesto[chave] = {"hash": hash_atual, "arquivos": arquivos}
+            print(f"  {chave} ({duracao:.2f}s)")
+
+    _gravar_manifesto(saida, manifesto)
+    return falhas
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exporta as figuras das páginas para um relatório estático.")
+    parser.add_argument("--saida", default=str(RAIZ / "relatorio"))
+    parser.add_argument("--csv", default=str(CAMINHO_CSV))
+    parser.add_argument("--processos", type=int, default=None, help="processos no pool (padrão: núcleos da máquina)")
+    parser.add_argument("--sem-mapas", action="store_true", help="não baixa o GeoJSON nem exporta os mapas")
+    parser.add_argument("--js-compartilhado", action="store_true",
+                        help="grava um plotly.min.js por pasta em vez de embuti-lo em cada HTML")
+    parser.add_argument("--forcar", action="store_true", help="ignora o manifesto e gera tudo de novo")
+    args = parser.parse_args()
+    sys.exit(1 if exportar(args.saida, args.csv, args.processos, not args.sem_mapas, args.js_compartilhado, args.forcar) else 0)
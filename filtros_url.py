@@ -0,0 +1,49 @@
+"""Filtros das páginas na URL e resultados compartilhados entre sessões.
+
+Os seletores de filtro (métrica, região, eixos, nível, tipo de produção)
+leem o valor inicial de um parâmetro da URL (``?metrica=GAL_TOTAL&regiao=Sul``)
+e o escrevem de volta a cada escolha: o endereço da página reproduz a vista e
+pode ser colado em relatórios. Valores fora das opções são ignorados, então
+o estado que chega às funções em cache é sempre um conjunto normalizado de
+opções válidas.
+
+As funções que montam a vista de um estado usam ``cache_compartilhado``:
+o resultado fica no processo, para todas as sessões, e quem abre um link já
+visto por outra pessoa recebe a tabela e as figuras prontas. Os objetos
+devolvidos são compartilhados e não devem ser alterados por quem os recebe.
+
+``pontos_selecionados`` lê a seleção de um gráfico (``st.plotly_chart`` com
+``on_select``), usada como filtro cruzado dos demais gráficos da página.
+"""
+import streamlit as st
+
+from instrumentacao import cache_instrumentado
+
+# Combinações de filtros mantidas por função
+MAX_VISTAS = 64
+
+
+def selecionar(widget, rotulo, opcoes, parametro, **opcoes_widget):
+    """Seletor (``st.selectbox``, ``st.radio``) espelhado no parâmetro ``parametro`` da URL."""
+    opcoes = list(opcoes)
+    textos = [str(opcao) for opcao in opcoes]
+    na_url = st.query_params.get(parametro)
+    if na_url in textos:
+        opcoes_widget["index"] = textos.index(na_url)
+    opcoes_widget.setdefault("key", f"url_{parametro}")
+    valor = widget(rotulo, opcoes, **opcoes_widget)
+    if na_url != str(valor):
+        st.query_params[parametro] = str(valor)
+    return valor
+
+
+def pontos_selecionados(chave, campo):
+    """Valores de ``campo`` (``x``, ``legendgroup``...) dos pontos selecionados no gráfico ``chave``."""
+    evento = st.session_state.get(chave)
+    pontos = evento["selection"]["points"] if evento else []
+    return sorted({ponto[campo] for ponto in pontos if campo in ponto})
+
+
+def cache_compartilhado(etapa, max_vistas=MAX_VISTAS):
+    """Cache de processo (``st.cache_resource``) para funções do estado normalizado dos filtros."""
+    return cache_instrumentado(etapa, st.cache_resource(max_entries=max_vistas))
@@ -0,0 +1,5 @@
+"""Construção das figuras de cada página, sem dependência do Streamlit.
+
+Cada módulo corresponde a uma página e devolve objetos ``plotly`` prontos,
+usados tanto pelas páginas quanto pela exportação de relatórios.
+"""
@@ -0,0 +1,62 @@
+"""Gráficos da página 10 — Agrupamento de Estados pelo perfil avícola."""
+import plotly.express as px
+
+from dados.agrupamento import NOMES_METODOS
+from graficos.galinaceos import figura_mapa, normalize_state_name
+
+DESCRICAO_ATRIBUTOS = {
+    "GAL_POR_TRAB": "Galináceos por trabalhador (log)",
+    "TRAB_POR_ESTAB": "Trabalhadores por estabelecimento",
+    "ESTAB_COMERC": "Parcela dos estabelecimentos que comercializam",
+    "GAL_VENDIDAS": "Galináceos vendidos / efetivo",
+    "OVOS_VENDIDOS": "Dúzias vendidas / produzidas",
+}
+
+
+def descrever_atributo(atributo, sistemas, classes):
+    """Rótulo legível: sistemas e classes pelos nomes do censo, os demais pela tabela acima."""
+    if atributo.startswith("SIST_"):
+        return f"Plantel — {sistemas.get(atributo[5:], atributo[5:])}"
+    if atributo.startswith("CLASSE_"):
+        return f"Estab. {classes.get(int(atributo[7:]), atributo[7:])}"
+    return DESCRICAO_ATRIBUTOS.get(atributo, atributo)
+
+
+def figura_silhueta(resumo):
+    fig = px.line(
+        resumo.assign(METODO=resumo["METODO"].map(NOMES_METODOS)),
+        x="K",
+        y="SILHUETA",
+        color="METODO",
+        markers=True,
+        labels={"K": "Número de grupos (k)", "SILHUETA": "Silhueta média", "METODO": "Método"},
+        title="Qualidade do agrupamento por número de grupos",
+    )
+    fig.update_layout(xaxis_dtick=1, plot_bgcolor="white")
+    return fig
+
+
+def figura_perfis(centroides, rotulos):
+    """Mapa de calor grupo × atributo (média padronizada: 0 = média dos territórios)."""
+    fig = px.imshow(
+        centroides.rename(columns=rotulos).T,
+        color_continuous_scale="RdBu_r",
+        color_continuous_midpoint=0,
+        aspect="auto",
+        labels={"x": "Grupo", "y": "Atributo", "color": "Escore z"},
+        title="Perfil médio de cada grupo",
+    )
+    fig.update_xaxes(type="category")
+    return fig
+
+
+def tabela_mapa(grupos):
+    """Grupos no formato do mapa da página 5 (nome normalizado para o GeoJSON)."""
+    tabela = grupos.rename_axis("Unidade Federativa").reset_index(name="Grupo")
+    tabela["Unidade Federativa_Normalized_for_map"] = tabela["Unidade Federativa"].map(normalize_state_name)
+    return tabela
+
+
+def figura_mapa_grupos(grupos, mapa_base, titulo):
+    """O mapa coroplético da página 5 (``galinaceos.figura_mapa_base``), colorido pelo grupo de cada estado."""
+    return figura_mapa(tabela_mapa(grupos), mapa_base, titulo, "Grupo")
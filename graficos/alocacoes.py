@@ -0,0 +1,80 @@
+"""Medição das alocações de uma interação em cada página (tracemalloc).
+
+Para cada caminho de dados das páginas, mede o pico de memória alocada pela
+interação com o quadro em dois tamanhos (N e 2N linhas). O acréscimo do pico
+entre os dois é comparado com o orçamento de um único resultado: 8 bytes por
+linha para cada coluna que a interação precisa ler ou produzir. Os custos
+fixos (objetos do pandas, tabelas pequenas) se cancelam na diferença; cada
+pico é o menor de algumas repetições, para que sobras do alocador não
+contem. A razão pico/orçamento acima de 1 é uma falha.
+
+Uso: python -m graficos.alocacoes [--repetir 20]
+"""
+import argparse
+import tracemalloc
+
+import pandas as pd
+
+from dados import ler_censo, vista
+from graficos import colaboradores, galinaceos, matrizes, producao
+
+REPETICOES = 3
+
+
+def _pico(funcao, *args):
+    tracemalloc.reset_peak()
+    antes = tracemalloc.get_traced_memory()[0]
+    resultado = funcao(*args)
+    return tracemalloc.get_traced_memory()[1] - antes, resultado
+
+
+def casos(df, repetir):
+    """(página, interação, função, argumentos, linhas, colunas do orçamento) de cada caminho."""
+    df_p1 = matrizes.preparar(vista(df))
+    df_uf = galinaceos.preparar(galinaceos.converter_metricas(vista(df)))
+    df_p4 = pd.concat([producao.dados_simulados()] * 10 * repetir, ignore_index=True)
+    # Matriz de preditoras (dummies incluídas), o alvo e a ordem do sorteio treino/teste
+    colunas_p4 = len(producao.separar_amostras(df_p4.head(100), producao.PREDITORAS_PADRAO)[0].columns) + 2
+    regiao = list(galinaceos.REGIOES_ESTADOS)[1]
+    return [
+        (1, "seleção do gráfico 3D", matrizes.dados_3d, (df_p1,), len(df_p1), len(matrizes.COLUNAS_3D)),
+        # Máscara do nível e da linha Total, e as três colunas das somas nas linhas escolhidas
+        (1, "estados e regiões", matrizes.agregados, (vista(df),), len(df), 3),
+        (4, "amostras do modelo", producao.separar_amostras, (df_p4, producao.PREDITORAS_PADRAO),
+         len(df_p4), colunas_p4),
+        # Agrupamento sem cópia das colunas: chave (códigos dos grupos) e métrica
+        (5, f"métrica por UF ({regiao})", galinaceos.dados_por_uf, (df_uf, 'GAL_TOTAL', 'y', regiao), len(df_uf), 2),
+        (5, "métrica por UF (todas)", galinaceos.dados_por_uf, (df_uf, 'GAL_TOTAL', 'y'), len(df_uf), 2),
+        (7, "limpeza", colaboradores.preparar, (vista(df),), len(df), len(colaboradores.COLUNAS_ESSENCIAIS)),
+    ]
+
+
+def medir(df, repetir):
+    tracemalloc.start()
+    try:
+        return [
+            (pagina, rotulo, min(_pico(funcao, *argumentos)[0] for _ in range(REPETICOES)), 8 * linhas * colunas)
+            for pagina, rotulo, funcao, argumentos, linhas, colunas in casos(df, repetir)
+        ]
+    finally:
+        tracemalloc.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repetir", type=int, default=20, help="empilha o arquivo N vezes")
+    args = parser.parse_args()
+
+    df = ler_censo()
+    menor = medir(pd.concat([df] * args.repetir, ignore_index=True), args.repetir)
+    maior = medir(pd.concat([df] * 2 * args.repetir, ignore_index=True), 2 * args.repetir)
+
+    falhas = 0
+    print(f"de {args.repetir}× para {2 * args.repetir}× o arquivo")
+    for (pagina, rotulo, pico_n, lido_n), (_, _, pico_2n, lido_2n) in zip(menor, maior):
+        pico, limite = pico_2n - pico_n, lido_2n - lido_n
+        razao = pico / limite
+        falhas += razao > 1
+        print(f"  página {pagina} — {rotulo:28s} pico +{pico / 1024:8.1f} KiB   "
+              f"orçamento +{limite / 1024:8.1f} KiB   {razao:5.3f}  {'ok' if razao <= 1 else 'ACIMA'}")
+    raise SystemExit(1 if falhas else 0)
@@ -0,0 +1,47 @@
+"""Gráficos da página 9 — Anomalias entre Estados (detalhe de uma medida)."""
+import plotly.express as px
+
+from dados.anomalias import LIMIAR_Z
+
+
+def tabela_detalhe(tabela, medida, sistema):
+    """Valores de todas as UFs para uma medida e um sistema, em ordem decrescente."""
+    detalhe = tabela[(tabela["MEDIDA"] == medida) & (tabela["SIST_CRIA"] == sistema)]
+    return detalhe.dropna(subset=["VALOR"]).sort_values("VALOR", ascending=False)
+
+
+def figura_detalhe(detalhe, titulo, uf=None, limiar=LIMIAR_Z):
+    """Barras por UF coloridas pela região, com a mediana e a faixa de ±limiar·MAD."""
+    fig = px.bar(
+        detalhe,
+        x="NOM_TERR",
+        y="VALOR",
+        color="REGIAO",
+        hover_data={"Z_ROBUSTO": ":.1f", "RAZAO_REGIAO": ":.2f"},
+        labels={
+            "NOM_TERR": "Estado",
+            "VALOR": titulo,
+            "REGIAO": "Região",
+            "Z_ROBUSTO": "Escore z robusto",
+            "RAZAO_REGIAO": "Razão à média da região",
+        },
+        title=f"{titulo} por Unidade Federativa",
+        color_discrete_sequence=px.colors.qualitative.Set2,
+    )
+    if not detalhe.empty:
+        mediana, mad = detalhe["MEDIANA"].iloc[0], detalhe["MAD"].iloc[0]
+        fig.add_hline(y=mediana, line_dash="dash", line_color="gray", annotation_text="Mediana")
+        if mad > 0:
+            fig.add_hrect(y0=max(mediana - limiar * mad, 0), y1=mediana + limiar * mad,
+                          fillcolor="gray", opacity=0.12, line_width=0)
+    if uf is not None:
+        # Destaca a UF escolhida na tabela de anomalias
+        fig.for_each_trace(lambda trace: trace.update(
+            marker_line_width=[3 if x == uf else 0 for x in trace.x], marker_line_color="black"))
+    fig.update_layout(
+        xaxis_tickangle=-35,
+        xaxis={"categoryorder": "total descending"},
+        bargap=0.15,
+        plot_bgcolor="white",
+    )
+    return fig
@@ -0,0 +1,41 @@
+"""Gráfico da página 7 — Estabelecimentos X Colaboradores."""
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+COLUNAS_ESSENCIAIS = ['GAL_TOTAL', 'N_TRAB_TOTAL', 'SIST_CRIA']
+
+# Colunas que a página lê do arquivo (dados.ler_censo(colunas=...))
+COLUNAS_LIDAS = COLUNAS_ESSENCIAIS
+
+
+def preparar(df):
+    """Só as colunas essenciais, nas linhas em que todas têm valor.
+
+    Cada coluna é copiada uma única vez, já só nas linhas escolhidas; no
+    índice padrão (0..n-1) as posições dessas linhas servem de índice.
+    """
+    ausente = df['GAL_TOTAL'].array.isna()
+    ausente |= df['N_TRAB_TOTAL'].array.isna()
+    ausente |= df['SIST_CRIA'].array.isna()
+    posicoes = np.flatnonzero(~ausente)
+    del ausente
+
+    padrao = isinstance(df.index, pd.RangeIndex) and df.index.start == 0 and df.index.step == 1
+    indice = pd.Index(posicoes, copy=False) if padrao else df.index[posicoes]
+    return pd.DataFrame({col: df[col].array.take(posicoes) for col in COLUNAS_ESSENCIAIS}, index=indice, copy=False)
+
+
+def figura_tamanho_trabalhadores(df_clean):
+    # Gráfico de dispersão com linha de tendência OLS e cor por sistema de criação
+    fig = px.scatter(
+        df_clean,
+        x='GAL_TOTAL',
+        y='N_TRAB_TOTAL',
+        title='Relação entre Tamanho do Estabelecimento e Número de Trabalhadores',
+        labels={'GAL_TOTAL': 'Total de Galináceos', 'N_TRAB_TOTAL': 'Número de Trabalhadores'},
+        trendline="ols",
+        color='SIST_CRIA',
+        hover_name="SIST_CRIA" # Adiciona o nome do sistema de criação ao passar o mouse
+    )
+    return fig
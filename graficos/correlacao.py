@@ -0,0 +1,59 @@
+"""Gráfico da página 6 — Correlação entre Métricas da Avicultura."""
+import plotly.express as px
+
+from dados.derivadas import DESCRICAO_DERIVADAS
+
+# Dicionário de descrições das variáveis
+DESCRICAO_VARIAVEIS = {
+    "SIST_CRIA": "Sistema de criação",
+    "NIV_TERR": "Nível das unidades territoriais",
+    "COD_TERR": "Código das unidades territoriais",
+    "NOM_TERR": "Nome das unidades territoriais",
+    "GAL_TOTAL": "Total efetivo de galináceos",
+    "V_GAL_VEND": "Valor dos galináceos vendidos",
+    "E_RECEBE_ORI": "Estabelecimentos com orientação técnica",
+    "VTP_AGRO": "Valor total da produção agropecuária",
+    "E_ORI_GOV": "Orientação do governo",
+    "A_PAST_PLANT": "Área de pastagem plantada",
+    "GAL_ENG": "Galináceos para engorda",
+    "E_ASSOC_COOP": "Associação a cooperativas",
+    "CL_GAL": "Classe de cabeças de galináceos",
+    "GAL_POED": "Total de poedeiras",
+    "Q_DZ_VEND": "Ovos vendidos em dúzias",
+    "E_COMERC": "Estabelecimentos comerciais",
+    "E_AGRIFAM": "Agricultura familiar",
+    "E_FINANC": "Estabelecimentos com investimento",
+    "RECT_AGRO": "Receita total agropecuária",
+    "E_FINANC_COOP": "Investimento de cooperativas",
+    "E_CNPJ": "Estabelecimentos com CNPJ",
+    "E_SUBS": "Produção para consumo próprio",
+    "E_DAP": "Possui DAP/PRONAF",
+    "N_TRAB_TOTAL": "Total de trabalhadores",
+    "E_PRODUTOR": "Produtor individual",
+    "GAL_MATR": "Total de matrizes",
+    "GAL_VEND": "Galináceos vendidos",
+    "E_ORI_INTEG": "Orientação de integradoras",
+    "E_GAL_MATR": "Estabelecimentos com matrizes",
+    **DESCRICAO_DERIVADAS
+}
+
+# Pares (eixo X, eixo Y) das "Sugestões de Análises" da página
+PARES_SUGERIDOS = [
+    ("GAL_TOTAL", "V_GAL_VEND"),
+    ("E_RECEBE_ORI", "VTP_AGRO"),
+    ("A_PAST_PLANT", "GAL_ENG"),
+    ("GAL_POED", "Q_DZ_VEND"),
+    ("E_FINANC", "RECT_AGRO"),
+]
+
+
+def figura_dispersao(df_filtrado, col_x, col_y, regiao):
+    fig = px.scatter(
+        df_filtrado,
+        x=col_x,
+        y=col_y,
+        color="NOM_TERR" if "NOM_TERR" in df_filtrado.columns else None,
+        title=f"Correlação entre {col_x} e {col_y} para {regiao}",
+        labels={col_x: col_x, col_y: col_y}
+    )
+    return fig
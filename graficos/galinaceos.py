@@ -0,0 +1,204 @@
+"""Gráficos da página 5 — Análise de Galináceos no Brasil (barras e mapa por UF)."""
+import unicodedata
+
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+from dados import mapear_distintos
+from dados.derivadas import DERIVADAS, dividir
+
+# --- Definição das variáveis e seus nomes de exibição ---
+DATA_VARS = {
+    'E_CRIA_GAL': {
+        'column_name': 'E_CRIA_GAL',
+        'display_title': 'Estabelecimentos de Criação de Galináceos',
+        'y_axis_label': 'Número de Estabelecimentos'
+    },
+    'E_OVOS_PROD': {
+        'column_name': 'E_OVOS_PROD',
+        'display_title': 'Estabelecimentos de Produção de Ovos',
+        'y_axis_label': 'Número de Estabelecimentos'
+    },
+    'GAL_TOTAL': {
+        'column_name': 'GAL_TOTAL',
+        'display_title': 'Total de Galináceos (Cabeças)',
+        'y_axis_label': 'Total de Cabeças'
+    }
+}
+
+# Métricas derivadas (razões): já calculadas na carga, com duas casas decimais
+DATA_VARS.update({
+    nome: {
+        'column_name': nome,
+        'display_title': descricao,
+        'y_axis_label': descricao,
+        'formato': ',.2f'
+    }
+    for nome, (_, _, descricao) in DERIVADAS.items()
+})
+
+# Colunas que a página lê do arquivo; as derivadas trazem numerador e denominador
+COLUNAS_LIDAS = ['NOM_TERR'] + [info['column_name'] for info in DATA_VARS.values()]
+
+# Lista oficial dos 26 estados + DF
+ESTADOS_BRASIL = [
+    'Acre', 'Alagoas', 'Amapá', 'Amazonas', 'Bahia', 'Ceará', 'Distrito Federal', 'Espírito Santo', 'Goiás',
+    'Maranhão', 'Mato Grosso', 'Mato Grosso do Sul', 'Minas Gerais', 'Pará', 'Paraíba', 'Paraná', 'Pernambuco',
+    'Piauí', 'Rio de Janeiro', 'Rio Grande do Norte', 'Rio Grande do Sul', 'Rondônia', 'Roraima', 'Santa Catarina',
+    'São Paulo', 'Sergipe', 'Tocantins'
+]
+
+# Mapeamento de estados para regiões
+REGIOES_ESTADOS = {
+    'Norte': ['Acre', 'Amapá', 'Amazonas', 'Pará', 'Rondônia', 'Roraima', 'Tocantins'],
+    'Nordeste': ['Alagoas', 'Bahia', 'Ceará', 'Maranhão', 'Paraíba', 'Pernambuco', 'Piauí', 'Rio Grande do Norte', 'Sergipe'],
+    'Centro-Oeste': ['Distrito Federal', 'Goiás', 'Mato Grosso', 'Mato Grosso do Sul'],
+    'Sudeste': ['Espírito Santo', 'Minas Gerais', 'Rio de Janeiro', 'São Paulo'],
+    'Sul': ['Paraná', 'Rio Grande do Sul', 'Santa Catarina']
+}
+
+TODAS_AS_REGIOES = 'Todas as Regiões'
+
+
+# Função auxiliar para normalizar nomes (remover acentos e converter para minúsculas)
+def normalize_state_name(name):
+    if isinstance(name, str):
+        normalized = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode('utf-8')
+        return normalized.strip().lower()
+    return name
+
+
+# Normaliza a lista de estados para a filtragem consistente
+NORMALIZED_ESTADOS_BRASIL = [normalize_state_name(estado) for estado in ESTADOS_BRASIL]
+
+# Inverter o dicionário para mapear estado normalizado -> região
+ESTADO_PARA_REGIAO_NORMALIZED = {
+    normalize_state_name(estado): regiao for regiao, estados in REGIOES_ESTADOS.items() for estado in estados
+}
+
+
+def converter_metricas(df):
+    """Métricas da página são contagens/totais: ausentes viram 0 e o tipo, inteiro.
+
+    Colunas já inteiras (anuláveis, do plano de tipos de ``dados``) ficam como
+    estão: as somas por UF ignoram os ausentes.
+    """
+    for info in DATA_VARS.values():
+        col_name = info['column_name']
+        if col_name in df.columns and col_name not in DERIVADAS and not pd.api.types.is_integer_dtype(df[col_name]):
+            df[col_name] = df[col_name].fillna(0).astype(int)
+    return df
+
+
+def normalizar_geojson(geojson_data):
+    """Guarda nome original e normalizado de cada estado para facilitar o matching."""
+    for feature in geojson_data['features']:
+        if 'name' in feature['properties']:
+            feature['properties']['name_original'] = feature['properties']['name']
+            feature['properties']['name_normalized'] = normalize_state_name(feature['properties']['name'])
+    return geojson_data
+
+
+def preparar(df):
+    """Acrescenta nome normalizado e região, e devolve apenas as linhas de UF."""
+    df['NOM_TERR_NORMALIZED'] = mapear_distintos(df['NOM_TERR'], normalize_state_name)
+    df['Regiao'] = df['NOM_TERR_NORMALIZED'].map(ESTADO_PARA_REGIAO_NORMALIZED)
+    return df[df['NOM_TERR_NORMALIZED'].isin(NORMALIZED_ESTADOS_BRASIL)]
+
+
+def dados_por_uf(df_uf, selected_column, selected_y_label, selected_region=TODAS_AS_REGIOES):
+    """Soma da métrica por UF, opcionalmente restrita a uma região.
+
+    Agrupa as linhas de UF direto sobre as colunas do quadro, sem filtrar nem
+    copiar; a região é aplicada no resultado, que tem uma linha por UF.
+    """
+    grupos = df_uf.groupby('NOM_TERR', sort=False)
+    if selected_column in DERIVADAS:
+        # Razão da UF = soma dos numeradores / soma dos denominadores
+        num, den, _ = DERIVADAS[selected_column]
+        somas = grupos[[num, den]].sum()
+        freq_data_por_uf = pd.Series(dividir(somas[num], somas[den]), index=somas.index)
+    else:
+        freq_data_por_uf = grupos[selected_column].sum()
+    df_plot_filtered = freq_data_por_uf.rename_axis('Unidade Federativa').reset_index(name=selected_y_label)
+    # Adiciona a coluna normalizada para o matching no mapa
+    df_plot_filtered['Unidade Federativa_Normalized_for_map'] = df_plot_filtered['Unidade Federativa'].map(normalize_state_name)
+
+    if selected_region != TODAS_AS_REGIOES:
+        regiao_da_uf = df_plot_filtered['Unidade Federativa_Normalized_for_map'].map(ESTADO_PARA_REGIAO_NORMALIZED)
+        df_plot_filtered = df_plot_filtered[regiao_da_uf == selected_region]
+    return df_plot_filtered.sort_values(selected_y_label, ascending=False, ignore_index=True)
+
+
+def sufixo_regiao(selected_region):
+    return '' if selected_region == TODAS_AS_REGIOES else f' na Região {selected_region}'
+
+
+def figura_barras_por_uf(df_plot_filtered, selected_display_title, selected_y_label, title_sufix='', formato=',.0f'):
+    fig = px.bar(
+        df_plot_filtered,
+        x='Unidade Federativa',
+        y=selected_y_label,
+        title=f'{selected_display_title} por Unidade Federativa{title_sufix}',
+        labels={'Unidade Federativa': 'Estado', selected_y_label: selected_y_label},
+        color='Unidade Federativa',
+        color_discrete_sequence=px.colors.qualitative.Set2
+    )
+    fig.update_layout(
+        xaxis_tickangle=-35,
+        showlegend=False,
+        bargap=0.15,
+        plot_bgcolor='white',
+        font=dict(size=14)
+    )
+    # Formatação com separadores de milhares (inteiros, ou duas casas nas razões)
+    fig.update_traces(texttemplate=f'%{{y:{formato}}}', textposition='outside')
+    return fig
+
+
+def figura_mapa_base(geojson_data, geojson_url=None):
+    """Mapa dos estados sem valores, montado uma vez por conjunto de geometrias.
+
+    Com ``geojson_url`` a figura leva só o endereço do GeoJSON: o navegador
+    baixa as geometrias uma vez e as guarda, e cada troca de métrica ou
+    região trafega apenas nomes e valores. Sem ele as geometrias vão
+    embutidas (HTML exportado, que precisa abrir sem rede).
+    """
+    nomes = [f['properties']['name'] for f in geojson_data['features'] if 'name' in f['properties']]
+    fig = go.Figure(go.Choroplethmap(
+        geojson=geojson_url or geojson_data,
+        featureidkey="properties.name",
+        locations=nomes,
+        z=[None] * len(nomes),
+        colorscale="Viridis",
+        marker_opacity=0.7,
+    ))
+    fig.update_layout(
+        map_style="carto-positron",
+        map_zoom=3.5,
+        map_center={"lat": -15.78, "lon": -47.93},
+        margin={"r":0,"t":0,"l":0,"b":0},
+    )
+    return fig
+
+
+def figura_mapa(df_plot_filtered, mapa_base, selected_display_title, selected_y_label, title_sufix=''):
+    """O mapa base com os valores da métrica: troca só locais, valores e escala de cores."""
+    nomes = mapa_base.data[0].locations
+    valores = (
+        df_plot_filtered.set_index('Unidade Federativa_Normalized_for_map')[selected_y_label]
+        .reindex([normalize_state_name(nome) for nome in nomes])
+    )
+    presentes = valores.notna().to_numpy()
+    fig = go.Figure(mapa_base)
+    fig.update_traces(
+        locations=[nome for nome, presente in zip(nomes, presentes) if presente],
+        z=valores[presentes].to_numpy(),
+        zmin=df_plot_filtered[selected_y_label].min(),
+        zmax=df_plot_filtered[selected_y_label].max(),
+        colorbar_title_text=selected_y_label,
+        hovertemplate=f'%{{location}}<br>{selected_y_label}: %{{z:,}}<extra></extra>',
+    )
+    fig.update_layout(title=f'{selected_display_title} por Estado{title_sufix}')
+    return fig
@@ -0,0 +1,56 @@
+"""Gráficos da página 3 — Fatores que Mais Impactam a Lucratividade."""
+import pandas as pd
+import plotly.express as px
+
+# Dados dos coeficientes
+COEFICIENTES = {
+    "Tecnologia": 0.9,
+    "Terra": -0.8,
+    "Mão de Obra": 0.5,
+    "Marketing": -0.3,
+    "Capital": 0.2,
+    "Insumos": -0.1,
+}
+
+
+def tabela_coeficientes(coefs=COEFICIENTES):
+    coef_df = pd.DataFrame(list(coefs.items()), columns=["Fator", "Coeficiente"])
+    coef_df["Categoria"] = coef_df["Coeficiente"].apply(lambda x: "Positivo" if x > 0 else "Negativo")
+    # Adicionar uma "terceira dimensão" para o 3D: pode ser a Magnitude
+    coef_df["Magnitude_Absoluta"] = coef_df["Coeficiente"].abs()
+    return coef_df.sort_values("Coeficiente", key=abs, ascending=True)
+
+
+def figura_coeficientes_3d(coef_df):
+    fig = px.scatter_3d(
+        coef_df,
+        x="Fator",
+        y="Coeficiente",
+        z="Magnitude_Absoluta", # Usar a magnitude como o terceiro eixo (profundidade)
+        color="Categoria", # Colorir pela categoria (Positivo/Negativo)
+        color_discrete_map={"Positivo": "#4CAF50", "Negativo": "#F44336"},
+        size="Magnitude_Absoluta", # Fazer o tamanho do ponto proporcional à magnitude
+        hover_name="Fator",
+        hover_data={"Coeficiente": ":.2f", "Magnitude_Absoluta": False}, # Mostrar coeficiente no hover, ocultar magnitude
+        title='Impacto dos Fatores na Lucratividade (3D)',
+        labels={
+            "Fator": "Fator",
+            "Coeficiente": "Coeficiente de Impacto",
+            "Magnitude_Absoluta": "Magnitude do Impacto"
+        },
+        height=600,
+        template="plotly_dark" # Tema escuro para um visual mais "tecnológico" em 3D
+    )
+
+    fig.update_layout(
+        scene = dict(
+            xaxis_title='Fator',
+            yaxis_title='Coeficiente de Impacto',
+            zaxis_title='Magnitude Absoluta',
+            # Ajustar a câmera para uma melhor visão inicial
+            camera = dict(
+                eye=dict(x=1.8, y=1.8, z=0.8) # Mais de cima e de lado
+            )
+        )
+    )
+    return fig
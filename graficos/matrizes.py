@@ -0,0 +1,191 @@
+"""Gráficos da página 1 — Matrizes Avícolas por Unidade Territorial."""
+import plotly.express as px
+
+from dados import agregar, mapear_distintos
+
+# Dicionário de mapeamento das abreviações para descrições completas
+MAPEAMENTO_SISTEMAS = {
+    '1-SIST_POC': 'Produtores de ovos para consumo',
+    '2-SIST_POI': 'Produtores de ovos para incubação',
+    '3-SIST_PFC': 'Produtores de frangos de corte',
+    '4-Outro': 'Outros produtores'
+}
+
+COLUNAS_3D = ['GAL_MATR', 'GAL_TOTAL', 'N_TRAB_TOTAL', 'SIST_CRIA']
+
+# Colunas que a página lê do arquivo (dados.ler_censo(colunas=...))
+COLUNAS_LIDAS = ['NIV_TERR', 'COD_TERR', 'NOM_TERR', 'CL_GAL'] + COLUNAS_3D
+
+
+def preparar(df):
+    """Limpeza usada pela página: nomes em título, medidas sem NaN e sistemas por extenso.
+
+    Cada coluna é substituída no máximo uma vez. Textos já chegam sem espaços
+    e medidas já numéricas (dados.ler_censo).
+    """
+    df['NOM_TERR'] = mapear_distintos(df['NOM_TERR'], str.title)
+    for col in ['GAL_MATR', 'GAL_TOTAL', 'N_TRAB_TOTAL']:
+        if col not in df.columns:
+            df[col] = 0 # Define como 0 para evitar erros se a coluna não existir
+        elif df[col].hasnans:
+            df[col] = df[col].fillna(0)
+    if 'SIST_CRIA' in df.columns:
+        df['SIST_CRIA'] = df['SIST_CRIA'].replace(MAPEAMENTO_SISTEMAS)
+    return df
+
+
+def agregados(fonte):
+    """Matrizes de cada estado e de cada região por sistema de criação, na linha Total.
+
+    ``fonte`` é o quadro do censo, antes de ``preparar``, ou o banco embarcado
+    (``dados.BancoCenso``); a soma é ``dados.agregar``, executada no banco
+    quando ele é a fonte.
+    Devolve (estados, regiões) com COD_TERR, NOM_TERR, SIST_CRIA e GAL_MATR,
+    nomes em título e sistemas por extenso, como em ``preparar``.
+    """
+    tabelas = []
+    for nivel in ('UF', 'GR'):
+        tabela = agregar(fonte, 'GAL_MATR', ['COD_TERR', 'NOM_TERR', 'SIST_CRIA'], nivel)
+        tabela['NOM_TERR'] = mapear_distintos(tabela['NOM_TERR'], str.title)
+        tabela['SIST_CRIA'] = tabela['SIST_CRIA'].replace(MAPEAMENTO_SISTEMAS)
+        tabela['GAL_MATR'] = tabela['GAL_MATR'].fillna(0)
+        tabelas.append(tabela)
+    return tuple(tabelas)
+
+
+def filtrar_estados(estados, **selecao):
+    """Estados de ``agregados`` restritos à seleção (``NOM_TERR=[...]``, ``SIST_CRIA=[...]``)."""
+    mascara = None
+    for coluna, valores in selecao.items():
+        atende = estados[coluna].isin(valores)
+        mascara = atende if mascara is None else mascara & atende
+    return estados if mascara is None else estados[mascara]
+
+
+def estados_por_regiao(estados, regioes):
+    """{região: [estados]} das tabelas de ``agregados`` (código da UF // 10 = código da região)."""
+    regioes = regioes.drop_duplicates('COD_TERR')
+    estados = estados.drop_duplicates('COD_TERR')
+    nome_regiao = dict(zip(regioes['COD_TERR'], regioes['NOM_TERR']))
+    resultado = {}
+    for cod, nome in zip(estados['COD_TERR'] // 10, estados['NOM_TERR']):
+        resultado.setdefault(nome_regiao.get(cod), []).append(nome)
+    return resultado
+
+
+def dados_3d(df):
+    """Linhas com as quatro colunas do gráfico 3D preenchidas (sem cópia se já estiverem todas)."""
+    mascara = df[COLUNAS_3D[0]].notna()
+    for col in COLUNAS_3D[1:]:
+        mascara &= df[col].notna()
+    return df[COLUNAS_3D] if mascara.all() else df.loc[mascara, COLUNAS_3D]
+
+
+def figura_matrizes_por_estado(df_estados):
+    matrizes_por_estado = df_estados.groupby('NOM_TERR', as_index=False)['GAL_MATR'].sum()
+    matrizes_por_estado = matrizes_por_estado.sort_values('GAL_MATR', ascending=False)
+
+    # Gráfico interativo com cores mais vivas e tema elegante
+    fig = px.bar(
+        matrizes_por_estado,
+        x='NOM_TERR',
+        y='GAL_MATR',
+        title='Total de Matrizes por Estado',
+        labels={'NOM_TERR': 'Estado', 'GAL_MATR': 'Número de Matrizes'},
+        color='GAL_MATR', # Colorir por valor para gradiente
+        color_continuous_scale=px.colors.sequential.Tealgrn, # Escala de cor elegante
+        template="plotly_white" # Tema limpo
+    )
+    fig.update_layout(
+        xaxis_tickangle=-45,
+        title_x=0.5, # Centralizar título
+        plot_bgcolor='rgba(0,0,0,0)', # Fundo transparente
+        paper_bgcolor='rgba(0,0,0,0)', # Fundo do papel transparente
+        xaxis=dict(showgrid=True, gridcolor='lightgray'), # Mostrar grid no eixo X
+        yaxis=dict(showgrid=True, gridcolor='lightgray') # Mostrar grid no eixo Y
+    )
+    fig.update_traces(marker_line_color='black', marker_line_width=0.5) # Borda nas barras
+    return fig
+
+
+def figura_matrizes_por_regiao(df_regioes):
+    matrizes_por_regiao = df_regioes.groupby('NOM_TERR', as_index=False)['GAL_MATR'].sum()
+    matrizes_por_regiao['Porcentagem'] = (matrizes_por_regiao['GAL_MATR'] / matrizes_por_regiao['GAL_MATR'].sum()) * 100
+
+    fig = px.pie(
+        matrizes_por_regiao,
+        values='GAL_MATR',
+        names='NOM_TERR',
+        title='Proporção de Matrizes por Região',
+        color_discrete_sequence=px.colors.qualitative.Pastel, # Uma paleta de cores suaves e agradáveis
+        hover_data=['Porcentagem'],
+        labels={'NOM_TERR': 'Região', 'GAL_MATR': 'Matrizes'},
+        hole=0.4, # Adiciona um "buraco" para transformar em gráfico de rosca (donut chart)
+        template="plotly_white"
+    )
+    fig.update_traces(
+        textposition='inside',
+        textinfo='percent+label',
+        marker=dict(line=dict(color='#000000', width=1)) # Adiciona bordas nas fatias
+    )
+    fig.update_layout(title_x=0.5) # Centralizar título
+    return fig
+
+
+def figura_sistemas_por_regiao(df_regioes):
+    sistemas_por_regiao = df_regioes.groupby(['NOM_TERR', 'SIST_CRIA'])['GAL_MATR'].sum().reset_index()
+
+    fig = px.bar(
+        sistemas_por_regiao,
+        x='NOM_TERR',
+        y='GAL_MATR',
+        color='SIST_CRIA', # Esta coluna agora terá os nomes completos
+        title='Sistemas de Criação por Região',
+        labels={'NOM_TERR': 'Região', 'GAL_MATR': 'Matrizes', 'SIST_CRIA': 'Sistema de Criação'},
+        barmode='group', # Para barras agrupadas
+        color_discrete_sequence=px.colors.qualitative.Set2, # Outra paleta qualitativa vibrante
+        template="plotly_white"
+    )
+    fig.update_layout(
+        title_x=0.5, # Centralizar título
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        xaxis=dict(showgrid=True, gridcolor='lightgray'),
+        yaxis=dict(showgrid=True, gridcolor='lightgray'),
+        legend_title_text='Sistema de Criação' # Título para a legenda
+    )
+    return fig
+
+
+def figura_dispersao_3d(df_plot_3d):
+    fig = px.scatter_3d(
+        df_plot_3d,
+        x='GAL_MATR',
+        y='GAL_TOTAL',
+        z='N_TRAB_TOTAL',
+        color='SIST_CRIA', # Colorir por Sistema de Criação
+        title='Distribuição 3D de Matrizes, Galináceos Totais e Trabalhadores',
+        labels={
+            'GAL_MATR': 'Número de Matrizes',
+            'GAL_TOTAL': 'Total de Galináceos',
+            'N_TRAB_TOTAL': 'Número de Trabalhadores',
+            'SIST_CRIA': 'Sistema de Criação'
+        },
+        color_discrete_sequence=px.colors.qualitative.Bold, # Paleta de cores vibrantes
+        height=700,
+        template="plotly_dark" # Tema escuro para um visual 3D impactante
+    )
+
+    fig.update_layout(
+        scene = dict(
+            xaxis_title_text='Número de Matrizes',
+            yaxis_title_text='Total de Galináceos',
+            zaxis_title_text='Número de Trabalhadores',
+            # Ajuste da câmera para uma visão inicial mais interessante
+            camera = dict(
+                eye=dict(x=1.8, y=1.8, z=0.8) # Um pouco de cima e de lado
+            )
+        ),
+        title_x=0.5 # Centralizar título
+    )
+    return fig
@@ -0,0 +1,34 @@
+"""Gráfico da página 8 — Distribuição por Porte dos Estabelecimentos."""
+import plotly.express as px
+
+from dados.distribuicao import MEDIDAS_DISTRIBUICAO
+from dados.esquema import MAPEAMENTO_SISTEMAS, REGIOES
+
+# Colunas que a página lê do arquivo (dados.ler_censo(colunas=...)) para montar o cubo
+COLUNAS_LIDAS = ['NOM_TERR', 'NOM_CL_GAL'] + list(MEDIDAS_DISTRIBUICAO)
+
+NOMES_NIVEIS = {'BR': 'Brasil', 'GR': 'Grandes Regiões', 'UF': 'Unidades da Federação'}
+
+
+def titulo_distribuicao(medida='E_TEM_GAL', nivel='BR', sistema=None, regiao=None):
+    partes = [NOMES_NIVEIS[nivel], regiao, MAPEAMENTO_SISTEMAS.get(sistema)]
+    return f"{MEDIDAS_DISTRIBUICAO[medida]} por porte — {' · '.join(p for p in partes if p)}"
+
+
+def figura_distribuicao_porte(tabela, medida='E_TEM_GAL', titulo=None, escala_log=False):
+    """Barras por classe de cabeças de ``DistribuicaoPorte.tabela`` (ou empilhadas por região, de ``por_regiao``)."""
+    por_regiao = 'REGIAO' in tabela.columns
+    fig = px.bar(
+        tabela,
+        x='NOM_CL_GAL',
+        y=medida,
+        color='REGIAO' if por_regiao else None,
+        title=titulo or titulo_distribuicao(medida),
+        labels={'NOM_CL_GAL': 'Porte do Estabelecimento (cabeças)', medida: MEDIDAS_DISTRIBUICAO[medida],
+                'REGIAO': 'Região'},
+        # Ordem das classes do IBGE (a da tabela), e não a alfabética
+        category_orders={'NOM_CL_GAL': list(dict.fromkeys(tabela['NOM_CL_GAL'])), 'REGIAO': REGIOES},
+        color_discrete_sequence=['#636EFA', '#EF553B', '#00CC96', '#AB63FA', '#FFA15A'],
+        log_y=escala_log,
+    )
+    return fig
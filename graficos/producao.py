@@ -0,0 +1,231 @@
+"""Gráficos e modelo da página 4 — Produção Avícola."""
+import numpy as np
+import pandas as pd
+import plotly.express as px
+from sklearn.linear_model import LinearRegression
+from sklearn.metrics import mean_squared_error, r2_score
+from sklearn.model_selection import ShuffleSplit
+
+ALVO = 'PRODUCAO_TOTAL'
+PREDITORAS_PADRAO = ['GALINACEOS', 'TRABALHADORES', 'OVOS_PRODUZIDOS', 'SISTEMA_CRIACAO', 'AREA_TOTAL']
+
+
+def dados_simulados():
+    """Dados fictícios da página (semente fixa para reprodutibilidade)."""
+    np.random.seed(42)
+    return pd.DataFrame({
+        'PRODUCAO_TOTAL': np.random.randint(1000, 50000, 100),
+        'GALINACEOS': np.random.randint(500, 25000, 100),
+        'AREA_TOTAL': np.random.uniform(1, 50, 100),
+        'TRABALHADORES': np.random.randint(1, 20, 100),
+        'GALINHAS_VENDIDAS': np.random.randint(300, 15000, 100),
+        'OVOS_PRODUZIDOS': np.random.randint(100, 10000, 100),
+        'COMERCIALIZACAO': np.random.randint(0, 2, 100), # Variável dummy 0 ou 1
+        'AGRICULTURA_FAMILIAR': np.random.randint(0, 2, 100), # Variável dummy 0 ou 1
+        'SISTEMA_CRIACAO': np.random.choice(['Frangos de Corte', 'Ovos Consumo', 'Ovos Incubação', 'Outros'], 100),
+        'REGIAO': np.random.choice(['Norte', 'Nordeste', 'Sudeste', 'Sul', 'Centro-Oeste'], 100),
+    })
+
+
+def figura_dispersao_3d(df):
+    fig = px.scatter_3d(
+        df,
+        x='GALINACEOS',
+        y='PRODUCAO_TOTAL',
+        z='TRABALHADORES',
+        color='SISTEMA_CRIACAO',
+        title='Distribuição da Produção Total, Galináceos e Trabalhadores por Sistema de Criação',
+        labels={
+            'GALINACEOS': 'Número de Galináceos',
+            'PRODUCAO_TOTAL': 'Produção Total',
+            'TRABALHADORES': 'Número de Trabalhadores',
+            'SISTEMA_CRIACAO': 'Sistema de Criação'
+        },
+        color_discrete_sequence=px.colors.qualitative.Bold, # Cores vibrantes
+        height=650,
+        template="plotly_dark" # Tema escuro para realçar o 3D
+    )
+    fig.update_layout(
+        scene=dict(
+            xaxis_title='Número de Galináceos',
+            yaxis_title='Produção Total',
+            zaxis_title='Número de Trabalhadores',
+            camera=dict(eye=dict(x=1.8, y=1.8, z=0.8))
+        ),
+        title_x=0.5
+    )
+    return fig
+
+
+def figura_correlacao(df):
+    numeric_cols = df.select_dtypes(include=[np.number]).columns
+    fig = px.imshow(
+        df[numeric_cols].corr(),
+        color_continuous_scale='RdBu', # Escala divergente para correlações
+        range_color=[-1,1],
+        title='Matriz de Correlação entre Variáveis Numéricas',
+        template="plotly_white", # Tema limpo
+        text_auto=True # Mostrar valores da correlação
+    )
+    fig.update_layout(title_x=0.5)
+    return fig
+
+
+def separar_amostras(df, features, target=ALVO):
+    """Preditoras (com dummies para as categóricas) e alvo, divididos em treino e teste.
+
+    Equivale a ``get_dummies`` seguido de ``train_test_split``, mas monta a
+    matriz de preditoras (e o bloco booleano das dummies) uma única vez, já
+    com as linhas na ordem treino + teste: as duas amostras são fatias
+    (visões) dessas matrizes. No índice padrão, a ordem do sorteio serve
+    também de índice, sem outra cópia.
+    """
+    # Mesmo sorteio do train_test_split(test_size=0.2, random_state=42), só com índices
+    treino, teste = next(ShuffleSplit(n_splits=1, test_size=0.2, random_state=42).split(np.empty((len(df), 0))))
+    n_treino = len(treino)
+    ordem = np.concatenate([treino, teste])
+    del treino, teste
+
+    numericas = [col for col in features if pd.api.types.is_numeric_dtype(df[col])]
+    categorical_features = [col for col in features if col not in numericas]
+    categorias = {col: pd.Categorical(df[col]) for col in categorical_features}
+    # Mesmos nomes e ordem de colunas do get_dummies(drop_first=True)
+    colunas = numericas + [f'{col}_{cat}' for col in categorical_features for cat in categorias[col].categories[1:]]
+
+    # Colunas contíguas (ordem 'F'): cada preditora é copiada direto para o seu lugar.
+    # As dummies ficam num bloco booleano à parte, como no get_dummies.
+    matriz = np.empty((len(df), len(numericas)), order='F')
+    dummies = np.empty((len(df), len(colunas) - len(numericas)), dtype=bool, order='F')
+    j = 0
+    for col in categorical_features:
+        # Códigos de cada categórica liberados logo depois de usados
+        categoria = categorias.pop(col)
+        codigos = categoria.codes[ordem]
+        for codigo in range(1, len(categoria.categories)):
+            np.equal(codigos, codigo, out=dummies[:, j])
+            j += 1
+        del categoria, codigos
+    for j, col in enumerate(numericas):
+        # mode='clip' evita a cópia intermediária do take (a ordem é sempre válida)
+        np.take(df[col].to_numpy(dtype=float), ordem, out=matriz[:, j], mode='clip')
+
+    # No índice padrão (0..n-1) os rótulos são as próprias posições sorteadas
+    padrao = isinstance(df.index, pd.RangeIndex) and df.index.start == 0 and df.index.step == 1
+    indice = pd.Index(ordem, copy=False) if padrao else df.index[ordem]
+    y = df[target].to_numpy()[ordem]
+
+    def amostra(linhas):
+        return pd.concat([
+            pd.DataFrame(matriz[linhas], index=indice[linhas], columns=numericas, copy=False),
+            pd.DataFrame(dummies[linhas], index=indice[linhas], columns=colunas[len(numericas):], copy=False),
+        ], axis=1)
+
+    treino, teste = slice(None, n_treino), slice(n_treino, None)
+    X_train, X_test = amostra(treino), amostra(teste)
+    y_train = pd.Series(y[treino], index=indice[treino], name=target, copy=False)
+    y_test = pd.Series(y[teste], index=indice[teste], name=target, copy=False)
+    return X_train, X_test, y_train, y_test
+
+
+def ajustar_modelo(df, features, target=ALVO):
+    """Regressão linear com dummies para as preditoras categóricas."""
+    X_train, X_test, y_train, y_test = separar_amostras(df, features, target)
+
+    model = LinearRegression()
+    model.fit(X_train, y_train)
+    y_pred = model.predict(X_test)
+    return {
+        'modelo': model,
+        'colunas': list(X_train.columns),
+        'y_test': y_test,
+        'y_pred': y_pred,
+        'r2': r2_score(y_test, y_pred),
+        'rmse': np.sqrt(mean_squared_error(y_test, y_pred)),
+    }
+
+
+def figura_previsoes_3d(y_test, y_pred):
+    residuals = y_test - y_pred
+    # Criar um DataFrame para o gráfico 3D
+    df_pred_res = pd.DataFrame({
+        'Valor Real': y_test,
+        'Valor Predito': y_pred,
+        'Resíduo': residuals
+    })
+
+    fig = px.scatter_3d(
+        df_pred_res,
+        x='Valor Real',
+        y='Valor Predito',
+        z='Resíduo',
+        color='Resíduo', # Colorir os pontos pelos resíduos (gradiente)
+        color_continuous_scale=px.colors.sequential.Inferno, # Gradiente vibrante para resíduos
+        title='Relação entre Valores Reais, Preditos e Resíduos do Modelo',
+        labels={
+            'Valor Real': 'Valor Real',
+            'Valor Predito': 'Valor Predito',
+            'Resíduo': 'Resíduo'
+        },
+        height=650,
+        template="plotly_dark"
+    )
+    fig.update_layout(
+        scene=dict(
+            xaxis_title='Valor Real',
+            yaxis_title='Valor Predito',
+            zaxis_title='Resíduo',
+            camera=dict(eye=dict(x=1.8, y=1.8, z=0.8))
+        ),
+        title_x=0.5
+    )
+    return fig
+
+
+def figura_residuos(y_test, y_pred):
+    residuals = y_test - y_pred
+    fig = px.scatter(
+        x=y_pred,
+        y=residuals,
+        labels={'x': 'Valor Predito', 'y': 'Resíduo'},
+        title='📉 Análise de Resíduos',
+        trendline='lowess',
+        color_discrete_sequence=px.colors.qualitative.Plotly, # Cores para a linha de tendência
+        template="plotly_white"
+    )
+    fig.add_hline(y=0, line_dash="dash", line_color="red")
+    fig.update_layout(
+        title_x=0.5,
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        xaxis=dict(showgrid=True, gridcolor='lightgray'),
+        yaxis=dict(showgrid=True, gridcolor='lightgray')
+    )
+    return fig
+
+
+def figura_coeficientes(colunas, coeficientes):
+    coef_df = pd.DataFrame({
+        'Variável': colunas,
+        'Impacto': coeficientes
+    }).sort_values('Impacto', key=abs, ascending=False)
+
+    fig = px.bar(
+        coef_df,
+        x='Variável',
+        y='Impacto',
+        color='Impacto', # Colorir pelo impacto para gradiente
+        color_continuous_scale='RdBu', # Escala divergente de vermelho para azul
+        title='📊 Impacto das Variáveis no Modelo',
+        template="plotly_white",
+        text_auto=True # Mostrar valores nas barras
+    )
+    fig.update_layout(
+        title_x=0.5,
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        xaxis_tickangle=-45, # Rotacionar labels para melhor leitura
+        xaxis=dict(showgrid=False), # Remover grid do eixo X para barras
+        yaxis=dict(showgrid=True, gridcolor='lightgray') # Manter grid no eixo Y
+    )
+    fig.update_traces(marker_line_color='black', marker_line_width=0.5) # Borda nas barras
+    return fig
@@ -0,0 +1,192 @@
+"""Serialização das figuras para o navegador: arrays binários e JSON rápido.
+
+O Plotly (6 ou mais recente) envia arrays NumPy como *typed arrays* em
+base64 (``{"dtype": "f8", "bdata": ...}``), mas listas Python seguem como
+texto número a número, e contagens guardadas em float64 (por causa dos
+ausentes) ocupam 8 bytes por valor. ``compactar`` converte os arrays
+numéricos das traces para o menor tipo que representa os valores sem
+perda (inteiros de 8 a 32 bits, float32 exato, senão float64, já que o
+Plotly não envia int64 em binário); o JSON sai pelo orjson quando instalado.
+
+A conversão não altera valores e roda uma vez por figura, sob uma trava:
+figuras compartilhadas entre sessões (``cache_compartilhado``) são
+compactadas pela primeira sessão que as exibe e enviadas prontas às demais.
+"""
+import threading
+
+import numpy as np
+import plotly.io as pio
+
+try:
+    import orjson  # noqa: F401
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    pio.json.config.default_engine = "orjson"
+
+# Arrays menores que isso ficam como estão (o ganho não paga a conversão)
+MIN_ELEMENTOS = 16
+
+_trava = threading.Lock()
+
+_INTEIROS = [np.int8, np.uint8, np.int16, np.uint16, np.int32, np.uint32]
+
+
+def _numerico(valores):
+    """Array float/inteiro de uma lista ou array de números (None vira NaN), ou None."""
+    if isinstance(valores, np.ndarray):
+        if valores.dtype.kind in "iuf":
+            return valores
+        if valores.dtype.kind != "O":
+            return None
+    elif not isinstance(valores, (list, tuple)):
+        return None
+    if not all(v is None or (isinstance(v, (int, float, np.number)) and not isinstance(v, bool)) for v in valores):
+        return None
+    return np.array([np.nan if v is None else v for v in valores], dtype="float64")
+
+
+def _menor_inteiro(menor, maior):
+    """O menor dtype de ``_INTEIROS`` que cobre [menor, maior], ou None."""
+    for tipo in _INTEIROS:
+        limites = np.iinfo(tipo)
+        if limites.min <= menor and maior <= limites.max:
+            return np.dtype(tipo)
+    return None
+
+
+def tipo_compacto(valores):
+    """O menor dtype que representa ``valores`` exatamente (e que o Plotly envia em binário)."""
+    if len(valores) == 0:
+        return valores.dtype
+    if valores.dtype.kind == "f":
+        finitos = np.isfinite(valores)
+        if finitos.all() and np.array_equal(valores, np.round(valores)):
+            tipo = _menor_inteiro(valores.min(), valores.max())
+            if tipo is not None:
+                return tipo
+        # Inteiros além de uint32 (VTP_AGRO, por exemplo) ficam em float: int64 iria como lista
+        if np.array_equal(valores.astype("float32")[finitos], valores[finitos]):
+            return np.dtype("float32")
+        return np.dtype("float64")
+    tipo = _menor_inteiro(valores.min(), valores.max())
+    if tipo is not None:
+        return tipo
+    # Idem para arrays inteiros: float64 é exato até 2**53
+    if np.abs(valores).max() <= 2 ** 53:
+        return np.dtype("float64")
+    return valores.dtype
+
+
+def _compactar_valores(valores):
+    """Versão compacta de ``valores``, ou None se já está no menor tipo (ou não é numérico)."""
+    numeros = _numerico(valores)
+    if numeros is None or numeros.ndim != 1 or len(numeros) < MIN_ELEMENTOS:
+        return None
+    tipo = tipo_compacto(numeros)
+    if isinstance(valores, np.ndarray) and valores.dtype == tipo:
+        return None
+    return numeros.astype(tipo)
+
+
+def _caminhos_numericos(props, prefixo=""):
+    """(caminho, array compacto) de cada array numérico a converter nas propriedades de uma trace."""
+    for chave, valor in props.items():
+        caminho = f"{prefixo}{chave}"
+        if isinstance(valor, dict):
+            yield from _caminhos_numericos(valor, f"{caminho}.")
+            continue
+        compacto = _compactar_valores(valor)
+        if compacto is not None:
+            yield caminho, compacto
+
+
+def compactar(fig):
+    """Converte os arrays numéricos de cada trace de ``fig`` (no lugar) e devolve a figura."""
+    if getattr(fig, "_compactada", False):
+        return fig
+    with _trava:
+        if not getattr(fig, "_compactada", False):
+            for trace in fig.data:
+                for caminho, compacto in list(_caminhos_numericos(trace.to_plotly_json())):
+                    # O Plotly ignora a atribuição de um valor igual ao atual, mesmo de outro tipo
+                    trace[caminho] = None
+                    trace[caminho] = compacto
+            fig._compactada = True
+    return fig
+
+
+def para_json(fig):
+    """O JSON que o ``st.plotly_chart`` envia ao navegador para ``fig``."""
+    return pio.to_json(fig.to_dict(), validate=False)
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    import time
+
+    from plotly.utils import PlotlyJSONEncoder
+
+    from dados import MEDIDAS, ler_censo
+    from graficos import correlacao, galinaceos, matrizes, producao
+
+    parser = argparse.ArgumentParser(description="Bytes e tempo de serialização das figuras das páginas 1, 4, 5 e 6.")
+    parser.add_argument("--repetir", type=int, default=20)
+    args = parser.parse_args()
+
+    censo = ler_censo()
+    # Toda medida do censo, como float64 (com ou sem ausentes), sai num tipo que o Plotly envia em binário
+    binarios = {np.dtype(t) for t in _INTEIROS} | {np.dtype("float32"), np.dtype("float64")}
+    for coluna in MEDIDAS:
+        valores = censo[coluna].to_numpy("float64", na_value=np.nan)
+        for amostra in (valores, valores[np.isfinite(valores)]):
+            assert tipo_compacto(amostra) in binarios, (coluna, tipo_compacto(amostra))
+    df1 = matrizes.preparar(censo.copy())
+    estados, regioes = matrizes.agregados(censo)
+    df4 = producao.dados_simulados()
+    ajuste = producao.ajustar_modelo(df4, producao.PREDITORAS_PADRAO)
+    df5 = galinaceos.preparar(galinaceos.converter_metricas(censo.copy()))
+    construtores = {
+        "p1 matrizes por estado": lambda: matrizes.figura_matrizes_por_estado(estados),
+        "p1 matrizes por região": lambda: matrizes.figura_matrizes_por_regiao(regioes),
+        "p1 sistemas por região": lambda: matrizes.figura_sistemas_por_regiao(regioes),
+        "p1 dispersão 3D": lambda: matrizes.figura_dispersao_3d(matrizes.dados_3d(df1)),
+        "p4 dispersão 3D": lambda: producao.figura_dispersao_3d(df4),
+        "p4 correlação": lambda: producao.figura_correlacao(df4),
+        "p4 previsões 3D": lambda: producao.figura_previsoes_3d(ajuste["y_test"], ajuste["y_pred"]),
+        "p4 resíduos": lambda: producao.figura_residuos(ajuste["y_test"], ajuste["y_pred"]),
+        "p5 barras por UF": lambda: galinaceos.figura_barras_por_uf(
+            galinaceos.dados_por_uf(df5, "GAL_TOTAL", "Total de Cabeças"), "Total de Galináceos", "Total de Cabeças"
+        ),
+        # VTP_AGRO passa do uint32: sai em float (binário), e não em int64 (que iria como lista)
+        "p6 dispersão BR": lambda: correlacao.figura_dispersao(
+            censo[censo["NIV_TERR"] == "BR"], "E_RECEBE_ORI", "VTP_AGRO", "BR"
+        ),
+    }
+
+    def medir(serializar, fig):
+        inicio = time.perf_counter()
+        for _ in range(args.repetir):
+            texto = serializar(fig)
+        return len(texto), 1000 * (time.perf_counter() - inicio) / args.repetir
+
+    def como_listas(fig):
+        # Plotly 5 / JSON da biblioteca padrão: cada número escrito como texto
+        return json.dumps(fig.to_plotly_json(), cls=PlotlyJSONEncoder)
+
+    print(f"motor JSON: {pio.json.config.default_engine}; {args.repetir} repetições")
+    print(f"{'figura':26s} {'listas (KiB, ms)':>18s} {'padrão (KiB, ms)':>18s} {'compacta (KiB, ms)':>20s}")
+    totais = np.zeros(6)
+    for nome, construir in construtores.items():
+        fig = construir()
+        b0, t0 = medir(como_listas, fig)
+        b1, t1 = medir(para_json, fig)
+        compactar(fig)
+        b2, t2 = medir(para_json, fig)
+        assert json.loads(para_json(fig))["data"], nome
+        totais += [b0, t0, b1, t1, b2, t2]
+        print(f"{nome:26s} {b0 / 1024:8.1f} {t0:8.2f}  {b1 / 1024:8.1f} {t1:8.2f}  {b2 / 1024:9.1f} {t2:9.2f}")
+    b0, t0, b1, t1, b2, t2 = totais
+    print(f"{'total':26s} {b0 / 1024:8.1f} {t0:8.2f}  {b1 / 1024:8.1f} {t1:8.2f}  {b2 / 1024:9.1f} {t2:9.2f}")
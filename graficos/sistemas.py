@@ -0,0 +1,123 @@
+"""Gráficos da página 2 — Sistemas de Criação Avícola."""
+import plotly.express as px
+
+from dados.agregacoes import producao_por_sistema
+
+# Mapeamento e Limpeza da coluna SIST_CRIA
+MAPEAMENTO_SISTEMAS = {
+    '1-SIST_POC': 'Produtores de Ovos para Consumo',
+    '2-SIST_POI': 'Produtores de Ovos para Incubacao',
+    '3-SIST_PFC': 'Produtores de Frangos de Corte',
+    '4-Outro': 'Outros Produtores'
+}
+
+# Configuração de cada tipo de produção: coluna, rótulo do eixo e título
+TIPOS_PRODUCAO = {
+    'aves': {
+        'coluna': 'GAL_VEND',
+        'rotulo_eixo_y': 'Quantidade de Aves Vendidas (Cabeça)',
+        'titulo': '📈 Distribuição da Venda de Aves por Sistema de Criação',
+    },
+    'ovos': {
+        'coluna': 'Q_DZ_PROD',
+        'rotulo_eixo_y': 'Quantidade de Ovos Produzidos (Dúzia)',
+        'titulo': '🥚 Distribuição da Produção de Ovos por Sistema de Criação',
+    },
+}
+
+# Colunas que a página lê do arquivo (dados.ler_censo(colunas=...))
+COLUNAS_LIDAS = ['NIV_TERR', 'CL_GAL', 'SIST_CRIA', 'GAL_TOTAL'] + [t['coluna'] for t in TIPOS_PRODUCAO.values()]
+
+
+def preparar(df):
+    """Medidas da página sem NaN e sistemas de criação por extenso."""
+    for col in ['GAL_TOTAL', 'GAL_VEND', 'Q_DZ_PROD']:
+        if col in df.columns and df[col].hasnans:
+            df[col] = df[col].fillna(0)
+    if 'SIST_CRIA' in df.columns:
+        df['SIST_CRIA'] = df['SIST_CRIA'].replace(MAPEAMENTO_SISTEMAS)
+    return df
+
+
+def figura_densidade_aves(df_plot):
+    fig = px.density_heatmap(
+        df_plot,
+        x='GAL_TOTAL',
+        y='SIST_CRIA', # Agora com os nomes completos
+        title='Distribuição da Densidade de Aves por Sistema de Criação',
+        labels={'GAL_TOTAL': 'Total de Aves (Cabeça)', 'SIST_CRIA': 'Sistema de Criação'},
+        color_continuous_scale='Plasma',
+        nbinsx=30,
+        height=500,
+        template='plotly_white'
+    )
+    fig.update_layout(
+        title_font_size=20,
+        xaxis_title_font_size=16,
+        yaxis_title_font_size=16,
+        coloraxis_colorbar=dict(title='Densidade')
+    )
+    return fig
+
+
+def figura_producao_por_sistema(fonte, tipo_producao='aves'):
+    """Produção por sistema no Brasil; ``fonte`` é o quadro da página ou o banco embarcado."""
+    config = TIPOS_PRODUCAO[tipo_producao]
+    coluna_producao = config['coluna']
+    # Só a linha Total do Brasil: BR, GR e UF repetem os mesmos estabelecimentos
+    # (ver dados.validacao), e somar todas as linhas contaria cada um várias vezes
+    producao = producao_por_sistema(fonte, coluna_producao, 'BR')
+    producao['SIST_CRIA'] = producao['SIST_CRIA'].replace(MAPEAMENTO_SISTEMAS)
+    producao[coluna_producao] = producao[coluna_producao].fillna(0)
+    producao = producao.sort_values('SIST_CRIA', ignore_index=True)
+
+    fig = px.bar(
+        producao,
+        x='SIST_CRIA',
+        y=coluna_producao,
+        title=config['titulo'],
+        labels={'SIST_CRIA': 'Sistema de Criação', coluna_producao: config['rotulo_eixo_y']},
+        color=coluna_producao,
+        color_continuous_scale='Viridis',
+        text=coluna_producao,
+        template='plotly_white',
+        hover_data=[coluna_producao]
+    )
+    fig.update_traces(
+        texttemplate='%{text:,.0f}',
+        textposition='outside',
+        marker_line_color='rgb(8,48,107)',
+        marker_line_width=1.5
+    )
+    fig.update_layout(
+        xaxis_tickangle=-45,
+        title_font_size=20,
+        xaxis_title_font_size=16,
+        yaxis_title_font_size=16,
+        uniformtext_minsize=8,
+        uniformtext_mode='hide'
+    )
+    return fig
+
+
+def figura_histograma_aves(df_plot):
+    fig = px.histogram(
+        df_plot,
+        x='GAL_TOTAL',
+        color='SIST_CRIA',
+        title='Distribuição de Aves por Sistema de Criação',
+        labels={'GAL_TOTAL': 'Total de Aves (Cabeça)', 'SIST_CRIA': 'Sistema de Criação'},
+        color_discrete_sequence=px.colors.qualitative.Pastel,
+        nbins=40,
+        barmode='overlay',
+        opacity=0.7,
+        template='plotly_white',
+        hover_data=['GAL_TOTAL']
+    )
+    fig.update_layout(
+        title_font_size=20,
+        xaxis_title_font_size=16,
+        yaxis_title_font_size=16,
+        legend_title_text='Sistema de Criação'
+    )
+    return fig
@@ -0,0 +1,271 @@
+"""Medição das etapas das páginas (carga, limpeza, agregação, modelo, figura).
+
+Cada página chama ``iniciar_pagina`` no topo e ``finalizar_pagina`` no fim, e
+envolve as etapas com ``medir``::
+
+    iniciar_pagina("5_galinaceos")
+    with medir("agregacao"):
+        ...
+    finalizar_pagina()
+
+As durações vão para histogramas por página × etapa, acumulados no processo
+(todas as sessões). Funções com ``st.cache_data`` ganham contadores de acerto
+e falta de cache com ``cache_instrumentado``; trechos que se reexecutam
+sozinhos (``st.fragment``) usam ``fragmento``. Ao fim de cada execução:
+
+- com ``PAINEL_METRICAS=<arquivo>``, as métricas são gravadas no formato
+  texto do Prometheus (para o node_exporter/textfile ou um scrape local);
+- com ``PAINEL_LOG_METRICAS=1``, cada etapa vira uma linha no log
+  ``painel.metricas``;
+- a barra lateral ganha um painel de depuração opcional com as etapas da
+  execução atual e os percentis acumulados.
+"""
+import functools
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+
+VARIAVEL_ARQUIVO = "PAINEL_METRICAS"
+VARIAVEL_LOG = "PAINEL_LOG_METRICAS"
+
+# Limites (s) dos baldes do histograma, no padrão do Prometheus
+BALDES = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+logger = logging.getLogger("painel.metricas")
+
+
+class _Histograma:
+    def __init__(self):
+        self.baldes = [0] * (len(BALDES) + 1)  # último = +Inf
+        self.soma = 0.0
+        self.contagem = 0
+        self.maximo = 0.0
+
+    def observar(self, segundos):
+        self.baldes[bisect_left(BALDES, segundos)] += 1
+        self.soma += segundos
+        self.contagem += 1
+        self.maximo = max(self.maximo, segundos)
+
+    def percentil(self, q):
+        """Limite superior do balde que contém o percentil ``q`` (0–1)."""
+        alvo = q * self.contagem
+        acumulado = 0
+        for limite, n in zip(BALDES + (float("inf"),), self.baldes):
+            acumulado += n
+            if acumulado >= alvo:
+                return min(limite, self.maximo)
+        return self.maximo
+
+
+class RegistroMetricas:
+    """Histogramas de duração e contadores de cache, seguros entre threads."""
+
+    def __init__(self):
+        self._trava = threading.Lock()
+        self.duracoes = {}  # (pagina, etapa) -> _Histograma
+        self.cache = {}  # (pagina, funcao, resultado) -> contagem
+
+    def observar(self, pagina, etapa, segundos):
+        with self._trava:
+            self.duracoes.setdefault((pagina, etapa), _Histograma()).observar(segundos)
+
+    def contar_cache(self, pagina, funcao, acerto):
+        chave = (pagina, funcao, "acerto" if acerto else "falta")
+        with self._trava:
+            self.cache[chave] = self.cache.get(chave, 0) + 1
+
+    def resumo(self):
+        """Quadro-resumo (lista de dicts) por página × etapa."""
+        with self._trava:
+            return [
+                {
+                    "pagina": pagina,
+                    "etapa": etapa,
+                    "execucoes": h.contagem,
+                    "media_ms": 1000 * h.soma / h.contagem,
+                    "p95_ms": 1000 * h.percentil(0.95),
+                    "max_ms": 1000 * h.maximo,
+                }
+                for (pagina, etapa), h in sorted(self.duracoes.items())
+            ]
+
+    def formato_prometheus(self):
+        linhas = [
+            "# HELP painel_etapa_segundos Duração das etapas das páginas do painel.",
+            "# TYPE painel_etapa_segundos histogram",
+        ]
+        with self._trava:
+            for (pagina, etapa), h in sorted(self.duracoes.items()):
+                rotulos = f'pagina="{pagina}",etapa="{etapa}"'
+                acumulado = 0
+                for limite, n in zip(BALDES, h.baldes):
+                    acumulado += n
+                    linhas.append(f'painel_etapa_segundos_bucket{{{rotulos},le="{limite}"}} {acumulado}')
+                linhas.append(f'painel_etapa_segundos_bucket{{{rotulos},le="+Inf"}} {h.contagem}')
+                linhas.append(f"painel_etapa_segundos_sum{{{rotulos}}} {h.soma:.6f}")
+                linhas.append(f"painel_etapa_segundos_count{{{rotulos}}} {h.contagem}")
+            linhas += [
+                "# HELP painel_cache_total Chamadas a funções em cache, por resultado.",
+                "# TYPE painel_cache_total counter",
+            ]
+            for (pagina, funcao, resultado), n in sorted(self.cache.items()):
+                linhas.append(f'painel_cache_total{{pagina="{pagina}",funcao="{funcao}",resultado="{resultado}"}} {n}')
+        return "\n".join(linhas) + "\n"
+
+    def gravar_prometheus(self, caminho):
+        """Grava o arquivo de uma vez (rename atômico), para o coletor nunca ler pela metade."""
+        caminho = Path(caminho)
+        temporario = caminho.with_name(f".{caminho.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        temporario.write_text(self.formato_prometheus(), encoding="utf-8")
+        os.replace(temporario, caminho)
+
+
+registro = RegistroMetricas()
+
+# Página e etapas da execução em curso (o Streamlit roda cada sessão na sua thread)
+_execucao = threading.local()
+
+
+def iniciar_pagina(pagina):
+    _execucao.pagina = pagina
+    _execucao.etapas = []
+    _execucao.inicio = time.perf_counter()
+
+
+def _pagina_atual():
+    return getattr(_execucao, "pagina", "sem_pagina")
+
+
+def contexto_da_execucao():
+    """Inicializador de threads auxiliares da execução atual (ex.: ``dados.rede.em_paralelo``).
+
+    Leva para a thread a página e a lista de etapas em curso, e o contexto
+    do Streamlit, para que caches, ``st.error`` e ``medir`` funcionem nela.
+    """
+    estado = dict(vars(_execucao))
+    try:
+        from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+        contexto_st = get_script_run_ctx()
+    except ImportError:
+        contexto_st = None
+
+    def inicializar():
+        vars(_execucao).update(estado)
+        if contexto_st is not None:
+            add_script_run_ctx(threading.current_thread(), contexto_st)
+
+    return inicializar
+
+
+@contextmanager
+def medir(etapa):
+    """Mede um trecho (bloco ``with`` ou decorador) da página em execução."""
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        segundos = time.perf_counter() - inicio
+        pagina = _pagina_atual()
+        registro.observar(pagina, etapa, segundos)
+        if hasattr(_execucao, "etapas"):
+            _execucao.etapas.append((etapa, segundos))
+        if os.environ.get(VARIAVEL_LOG):
+            logger.info("pagina=%s etapa=%s ms=%.1f", pagina, etapa, 1000 * segundos)
+
+
+def cache_instrumentado(etapa, cache):
+    """Aplica ``cache`` (ex.: ``st.cache_data``) contando acertos e faltas.
+
+    O corpo da função só roda na falta de cache; uma marca por thread,
+    ligada dentro do corpo, distingue os dois casos na volta da chamada.
+    """
+    def decorador(funcao):
+        marca = threading.local()
+
+        @functools.wraps(funcao)
+        def executar(*args, **kwargs):
+            marca.executou = True
+            return funcao(*args, **kwargs)
+
+        cacheada = cache(executar)
+
+        @functools.wraps(funcao)
+        def chamar(*args, **kwargs):
+            marca.executou = False
+            with medir(etapa):
+                resultado = cacheada(*args, **kwargs)
+            registro.contar_cache(_pagina_atual(), funcao.__name__, acerto=not marca.executou)
+            return resultado
+
+        chamar.clear = getattr(cacheada, "clear", None)
+        return chamar
+
+    return decorador
+
+
+def fragmento(etapa):
+    """``st.fragment`` medido como ``etapa``: interagir com os widgets de dentro reexecuta só a função.
+
+    Na reexecução do fragmento o topo da página não roda; a página em que
+    ele foi definido é reposta na thread para que ``medir`` e os caches
+    contem na página certa. A duração de cada interação aparece como a
+    etapa do fragmento, ao lado da etapa ``pagina`` das execuções completas.
+    """
+    import streamlit as st
+
+    def decorador(funcao):
+        pagina = _pagina_atual()
+
+        @functools.wraps(funcao)
+        def executar(*args, **kwargs):
+            _execucao.pagina = pagina
+            with medir(etapa):
+                return funcao(*args, **kwargs)
+
+        return st.fragment(executar)
+
+    return decorador
+
+
+def _painel_depuracao(total):
+    import pandas as pd
+    import streamlit as st
+
+    if not st.sidebar.checkbox("🔧 Depuração de desempenho", key="_painel_depuracao"):
+        return
+    with st.sidebar.expander("Etapas desta execução", expanded=True):
+        etapas = pd.DataFrame(getattr(_execucao, "etapas", []), columns=["etapa", "segundos"])
+        etapas["ms"] = (1000 * etapas.pop("segundos")).round(1)
+        st.dataframe(etapas, hide_index=True, use_container_width=True)
+        st.caption(f"Página inteira: {1000 * total:.0f} ms")
+    with st.sidebar.expander("Acumulado no servidor"):
+        resumo = pd.DataFrame(registro.resumo())
+        resumo = resumo[resumo["pagina"] == _pagina_atual()].drop(columns="pagina") if not resumo.empty else resumo
+        st.dataframe(resumo.round(1), hide_index=True, use_container_width=True)
+        cache = [
+            {"funcao": funcao, "resultado": resultado, "chamadas": n}
+            for (pagina, funcao, resultado), n in sorted(registro.cache.items())
+            if pagina == _pagina_atual()
+        ]
+        if cache:
+            st.dataframe(pd.DataFrame(cache), hide_index=True, use_container_width=True)
+
+
+def finalizar_pagina():
+    """Fecha a medição da página inteira, exporta as métricas e mostra o painel."""
+    total = time.perf_counter() - getattr(_execucao, "inicio", time.perf_counter())
+    registro.observar(_pagina_atual(), "pagina", total)
+
+    caminho = os.environ.get(VARIAVEL_ARQUIVO)
+    if caminho:
+        try:
+            registro.gravar_prometheus(caminho)
+        except OSError as e:
+            logger.warning("não foi possível gravar as métricas em %s: %s", caminho, e)
+    _painel_depuracao(total)
+
@@ -1,7 +1,13 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go # Importado, mas px já faz muito do trabalho
+
+from dados import banco_das_paginas, instantaneo_atual, ler_censo, versao_banco
+from dados.compartilhado import congelar, vista
+from dados.indices import IndiceBitmap
+from dados.versao import registro_versoes
+from exibicao import plotly_chart
+from filtros_url import pontos_selecionados
+from graficos import matrizes
+from instrumentacao import cache_instrumentado, finalizar_pagina, iniciar_pagina, medir
 
 # Configuração da página
 st.set_page_config(
@@ -10,91 +16,81 @@ st.set_page_config(
     layout="wide", # Manter wide para gráficos 3D
     initial_sidebar_state="expanded",
 )
+iniciar_pagina("1_matrizes")
+registro_versoes.vigiar()
 
 # Título principal
 st.title('Matrizes Avícolas por Unidade Territorial')
 st.markdown("---")
 
-# Carregar dados
-try:
-    df = pd.read_csv("GALINACEOS.csv", sep=';')
-    df['NOM_TERR'] = df['NOM_TERR'].astype(str).str.strip().str.title()
-    df['GAL_MATR'] = pd.to_numeric(df['GAL_MATR'], errors='coerce').fillna(0)
-    # Adicionar tratamento para outras colunas numéricas que podem ser usadas no 3D
-    if 'GAL_TOTAL' in df.columns:
-        df['GAL_TOTAL'] = pd.to_numeric(df['GAL_TOTAL'], errors='coerce').fillna(0)
+# Carregar dados: quadro limpo, índice bitmap das dimensões, matrizes por estado e por
+# região e estados de cada região, montados uma vez por versão do arquivo para todas as sessões.
+# Com o banco embarcado (CENSO_BANCO), as somas são consultas no banco e só as linhas dos
+# estados (os pontos do 3D) saem dele
+@registro_versoes.dependente("censo")
+@cache_instrumentado("carga", st.cache_resource)
+def load_data(versao):
+    banco = banco_das_paginas()
+    if banco is None:
+        df = ler_censo(instantaneo_atual(), colunas=matrizes.COLUNAS_LIDAS)
     else:
-        st.warning("Coluna 'GAL_TOTAL' não encontrada. O gráfico 3D pode ter dados limitados.")
-        df['GAL_TOTAL'] = 0 # Define como 0 para evitar erros se a coluna não existir
-
-    if 'N_TRAB_TOTAL' in df.columns:
-        df['N_TRAB_TOTAL'] = pd.to_numeric(df['N_TRAB_TOTAL'], errors='coerce').fillna(0)
-    else:
-        st.warning("Coluna 'N_TRAB_TOTAL' não encontrada. O gráfico 3D pode ter dados limitados.")
-        df['N_TRAB_TOTAL'] = 0 # Define como 0 para evitar erros se a coluna não existir
+        df = banco.ler(matrizes.COLUNAS_LIDAS, nivel='UF')
+    with medir("agregacao"):
+        estados, regioes = matrizes.agregados(df if banco is None else banco)
+    with medir("limpeza"):
+        df = matrizes.preparar(df)
+    with medir("indice"):
+        indice = IndiceBitmap(df)
+    return congelar(df), indice, estados, regioes, matrizes.estados_por_regiao(estados, regioes)
 
+try:
+    banco = banco_das_paginas()
+    versao = registro_versoes.versao("censo") if banco is None else versao_banco(banco)
+    dados_pagina, indice, estados, regioes, estados_da_regiao = load_data(versao)
 except FileNotFoundError:
     st.error("Erro: Arquivo 'GALINACEOS.csv' não encontrado. Por favor, certifique-se de que o arquivo está no mesmo diretório da aplicação.")
     st.stop()
-
-# =============================================
-# ✨ NOVIDADE: Mapeamento e Limpeza da coluna SIST_CRIA
-# =============================================
-if 'SIST_CRIA' in df.columns:
-    # Limpar espaços em branco e garantir que é string antes de mapear
-    df['SIST_CRIA'] = df['SIST_CRIA'].astype(str).str.strip()
-
-    # Dicionário de mapeamento das abreviações para descrições completas
-    mapeamento_sistemas = {
-        '1-SIST_POC': 'Produtores de ovos para consumo',
-        '2-SIST_POI': 'Produtores de ovos para incubação',
-        '3-SIST_PFC': 'Produtores de frangos de corte',
-        '4-Outro': 'Outros produtores'
-    }
-    
-    # Aplicar o mapeamento
-    df['SIST_CRIA'] = df['SIST_CRIA'].replace(mapeamento_sistemas)
-    
-else:
-    st.warning("A coluna 'SIST_CRIA' não foi encontrada no dataset. Verifique o nome da coluna.")
-
-# Listas de regiões
-regioes = ['Norte', 'Nordeste', 'Sudeste', 'Sul', 'Centro-Oeste']
-df_estados = df[~df['NOM_TERR'].isin(regioes + ['Brasil'])].copy()
-df_regioes = df[df['NOM_TERR'].isin(regioes)].copy()
+df = vista(dados_pagina)
+
+# Filtro cruzado: regiões e sistemas clicados em "Sistemas de Criação por Região"
+# restringem os gráficos de estados (tabela já somada) e o 3D (bitmaps, sem percorrer os textos de novo)
+regioes_selecionadas = pontos_selecionados("selecao_regioes", "x")
+sistemas_selecionados = pontos_selecionados("selecao_regioes", "legendgroup")
+selecao = {}
+if regioes_selecionadas:
+    selecao['NOM_TERR'] = [uf for regiao in regioes_selecionadas for uf in estados_da_regiao.get(regiao, [])]
+if sistemas_selecionados:
+    selecao['SIST_CRIA'] = sistemas_selecionados
+
+# Estados da seleção, regiões completas (origem do filtro cruzado) e os pontos do 3D
+cols_for_3d = matrizes.COLUNAS_3D
+tem_colunas_3d = all(col in df.columns for col in cols_for_3d)
+with medir("filtro"):
+    df_estados = matrizes.filtrar_estados(estados, **selecao)
+    df_regioes = regioes
+    if tem_colunas_3d:
+        # Só as UFs, com ou sem seleção: misturar Brasil, regiões e estados põe no mesmo
+        # espaço pontos que são somas uns dos outros
+        df_plot_3d = matrizes.dados_3d(indice.filtrar(df, NIV_TERR='UF', **selecao))
+
+
+def legenda_filtro():
+    if selecao:
+        filtros = regioes_selecionadas + sistemas_selecionados
+        st.caption(f"🔎 Filtrado pela seleção em *Sistemas de Criação por Região*: {', '.join(filtros)} "
+                   "(clique duas vezes naquele gráfico para limpar)")
 
 
 # =============================================
 # 1. GRÁFICO DE BARRAS - MATRIZES POR ESTADO (Estilizado)
 # =============================================
 st.header('📊 Distribuição de Matrizes por Estado')
+legenda_filtro()
 
 if not df_estados.empty:
-    # Processamento dos dados
-    matrizes_por_estado = df_estados.groupby('NOM_TERR', as_index=False)['GAL_MATR'].sum()
-    matrizes_por_estado = matrizes_por_estado.sort_values('GAL_MATR', ascending=False)
-    
-    # Gráfico interativo com cores mais vivas e tema elegante
-    fig1 = px.bar(
-        matrizes_por_estado,
-        x='NOM_TERR',
-        y='GAL_MATR',
-        title='Total de Matrizes por Estado',
-        labels={'NOM_TERR': 'Estado', 'GAL_MATR': 'Número de Matrizes'},
-        color='GAL_MATR', # Colorir por valor para gradiente
-        color_continuous_scale=px.colors.sequential.Tealgrn, # Escala de cor elegante
-        template="plotly_white" # Tema limpo
-    )
-    fig1.update_layout(
-        xaxis_tickangle=-45,
-        title_x=0.5, # Centralizar título
-        plot_bgcolor='rgba(0,0,0,0)', # Fundo transparente
-        paper_bgcolor='rgba(0,0,0,0)', # Fundo do papel transparente
-        xaxis=dict(showgrid=True, gridcolor='lightgray'), # Mostrar grid no eixo X
-        yaxis=dict(showgrid=True, gridcolor='lightgray') # Mostrar grid no eixo Y
-    )
-    fig1.update_traces(marker_line_color='black', marker_line_width=0.5) # Borda nas barras
-    st.plotly_chart(fig1, use_container_width=True)
+    with medir("figura_estados"):
+        fig1 = matrizes.figura_matrizes_por_estado(df_estados)
+    plotly_chart(fig1, use_container_width=True)
     
     with st.expander("💡 Interpretação do Gráfico de Barras"):
         st.markdown("""
@@ -120,29 +116,9 @@ else:
 st.header('🌎 Distribuição Regional de Matrizes')
 
 if not df_regioes.empty:
-    # Processamento dos dados
-    matrizes_por_regiao = df_regioes.groupby('NOM_TERR', as_index=False)['GAL_MATR'].sum()
-    matrizes_por_regiao['Porcentagem'] = (matrizes_por_regiao['GAL_MATR'] / matrizes_por_regiao['GAL_MATR'].sum()) * 100
-    
-    # Gráfico interativo com cores mais vivas e tema elegante
-    fig2 = px.pie(
-        matrizes_por_regiao,
-        values='GAL_MATR',
-        names='NOM_TERR',
-        title='Proporção de Matrizes por Região',
-        color_discrete_sequence=px.colors.qualitative.Pastel, # Uma paleta de cores suaves e agradáveis
-        hover_data=['Porcentagem'],
-        labels={'NOM_TERR': 'Região', 'GAL_MATR': 'Matrizes'},
-        hole=0.4, # Adiciona um "buraco" para transformar em gráfico de rosca (donut chart)
-        template="plotly_white"
-    )
-    fig2.update_traces(
-        textposition='inside',
-        textinfo='percent+label',
-        marker=dict(line=dict(color='#000000', width=1)) # Adiciona bordas nas fatias
-    )
-    fig2.update_layout(title_x=0.5) # Centralizar título
-    st.plotly_chart(fig2, use_container_width=True)
+    with medir("figura_regioes"):
+        fig2 = matrizes.figura_matrizes_por_regiao(df_regioes)
+    plotly_chart(fig2, use_container_width=True)
     
     with st.expander("💡 Interpretação do Gráfico de Pizza"):
         st.info("""
@@ -167,30 +143,11 @@ else:
 st.header('🏭 Sistemas de Criação por Região')
 
 if 'SIST_CRIA' in df.columns and not df_regioes.empty:
-    # Processamento dos dados
-    sistemas_por_regiao = df_regioes.groupby(['NOM_TERR', 'SIST_CRIA'])['GAL_MATR'].sum().reset_index()
-    
-    # Gráfico interativo com cores mais vivas e tema elegante
-    fig3 = px.bar(
-        sistemas_por_regiao,
-        x='NOM_TERR',
-        y='GAL_MATR',
-        color='SIST_CRIA', # Esta coluna agora terá os nomes completos
-        title='Sistemas de Criação por Região',
-        labels={'NOM_TERR': 'Região', 'GAL_MATR': 'Matrizes', 'SIST_CRIA': 'Sistema de Criação'},
-        barmode='group', # Para barras agrupadas
-        color_discrete_sequence=px.colors.qualitative.Set2, # Outra paleta qualitativa vibrante
-        template="plotly_white"
-    )
-    fig3.update_layout(
-        title_x=0.5, # Centralizar título
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        xaxis=dict(showgrid=True, gridcolor='lightgray'),
-        yaxis=dict(showgrid=True, gridcolor='lightgray'),
-        legend_title_text='Sistema de Criação' # Título para a legenda
-    )
-    st.plotly_chart(fig3, use_container_width=True)
+    with medir("figura_sistemas"):
+        fig3 = matrizes.figura_sistemas_por_regiao(df_regioes)
+    st.caption("Clique numa barra (ou selecione várias) para filtrar os gráficos de estados e o 3D.")
+    plotly_chart(fig3, use_container_width=True, on_select="rerun", selection_mode=("points", "box"),
+                 key="selecao_regioes")
     
     with st.expander("💡 Interpretação dos Sistemas de Criação por Região"):
         st.info("""
@@ -214,50 +171,20 @@ else:
 # 4. NOVO GRÁFICO: DISPERSÃO 3D (Elegante)
 # =============================================
 st.header('🌐 Relação 3D: Matrizes, Galináceos Totais e Trabalhadores por Sistema')
+legenda_filtro()
 
 # Verificação para o gráfico 3D
-cols_for_3d = ['GAL_MATR', 'GAL_TOTAL', 'N_TRAB_TOTAL', 'SIST_CRIA']
-if all(col in df.columns for col in cols_for_3d):
-    df_plot_3d = df.dropna(subset=cols_for_3d).copy()
-    
+if tem_colunas_3d:
     if not df_plot_3d.empty:
-        fig_3d = px.scatter_3d(
-            df_plot_3d,
-            x='GAL_MATR',
-            y='GAL_TOTAL',
-            z='N_TRAB_TOTAL',
-            color='SIST_CRIA', # Colorir por Sistema de Criação
-            title='Distribuição 3D de Matrizes, Galináceos Totais e Trabalhadores',
-            labels={
-                'GAL_MATR': 'Número de Matrizes',
-                'GAL_TOTAL': 'Total de Galináceos',
-                'N_TRAB_TOTAL': 'Número de Trabalhadores',
-                'SIST_CRIA': 'Sistema de Criação'
-            },
-            color_discrete_sequence=px.colors.qualitative.Bold, # Paleta de cores vibrantes
-            height=700,
-            template="plotly_dark" # Tema escuro para um visual 3D impactante
-        )
+        with medir("figura_3d"):
+            fig_3d = matrizes.figura_dispersao_3d(df_plot_3d)
 
-        fig_3d.update_layout(
-            scene = dict(
-                xaxis_title_text='Número de Matrizes',
-                yaxis_title_text='Total de Galináceos',
-                zaxis_title_text='Número de Trabalhadores',
-                # Ajuste da câmera para uma visão inicial mais interessante
-                camera = dict(
-                    eye=dict(x=1.8, y=1.8, z=0.8) # Um pouco de cima e de lado
-                )
-            ),
-            title_x=0.5 # Centralizar título
-        )
-        
-        st.plotly_chart(fig_3d, use_container_width=True)
+        plotly_chart(fig_3d, use_container_width=True)
 
         with st.expander("💡 Interpretação do Gráfico de Dispersão 3D"):
             st.info("""
             **🌐 Análise do Gráfico de Dispersão 3D:**
-            Este gráfico visualiza a inter-relação entre três métricas-chave: o número de matrizes, o total de galináceos e o número de trabalhadores, com cada ponto colorido pelo sistema de criação.
+            Este gráfico visualiza a inter-relação entre três métricas-chave: o número de matrizes, o total de galináceos e o número de trabalhadores, com um ponto por estado, classe de cabeças e sistema de criação, colorido pelo sistema.
 
             📌 **Principais observações:**
             - **Agrupamentos:** Observe se existem agrupamentos de pontos para sistemas de criação específicos em certas regiões do espaço 3D, o que indicaria padrões de escala de produção e uso de mão de obra.
@@ -278,3 +205,5 @@ else:
 st.markdown("---")
 st.caption("""
 🔎 *Análise desenvolvida com base nos dados do IBGE* 📅 *Atualizado em Outubro 2023* """)
+
+finalizar_pagina()
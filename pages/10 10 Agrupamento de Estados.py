@@ -0,0 +1,115 @@
+import streamlit as st
+
+from dados import (
+    CAMINHO_CSV,
+    MAPEAMENTO_SISTEMAS,
+    agrupamento,
+    artefatos,
+    instantaneo_atual,
+    ler_censo,
+    montar_cubo,
+    rede,
+)
+from dados.cache import persistente
+from dados.versao import registro_versoes
+from exibicao import plotly_chart
+from filtros_url import selecionar
+from graficos import agrupamento as graficos_agrupamento
+from graficos import galinaceos
+from instrumentacao import cache_instrumentado, finalizar_pagina, iniciar_pagina, medir
+
+# GeoJSON dos estados, o mesmo do mapa da página 5
+GEOJSON_BR_STATES_URL = 'https://raw.githubusercontent.com/codeforamerica/click_that_hood/master/public/data/brazil-states.geojson'
+TEMPO_LIMITE_GEOJSON = (5, 15)
+
+# Configuração da página
+st.set_page_config(
+    page_title="Agrupamento de Estados",
+    page_icon="🧩",
+    layout="wide",
+)
+iniciar_pagina("10_agrupamento")
+registro_versoes.vigiar()
+
+
+# Todos os ajustes (métodos × k × reinícios), refeitos só quando o arquivo muda
+# (e uma vez por host, com o cache em disco)
+@registro_versoes.dependente("censo")
+@cache_instrumentado("agrupamento", st.cache_resource(max_entries=4))
+@persistente
+def calcular_agrupamentos(versao):
+    pre_calculado = artefatos.ler("agrupamento", censo=versao)
+    if pre_calculado is not None:
+        return pre_calculado
+    cubo = montar_cubo(ler_censo(instantaneo_atual(CAMINHO_CSV)))
+    nomes_classes = dict(zip(cubo.classes["CL_GAL"], cubo.classes["NOM_CL_GAL"]))
+    return agrupamento.agrupar(agrupamento.matriz_perfis(cubo, "UF")), nomes_classes
+
+
+@cache_instrumentado("carga_geojson", st.cache_data)
+def load_geojson(url):
+    # Geometria pré-calculada pelo precomputar.py, quando houver (sem ir à rede)
+    geojson_data = artefatos.ler("geometria", url=url)
+    if geojson_data is not None:
+        return geojson_data
+    try:
+        return galinaceos.normalizar_geojson(rede.baixar_json(url, TEMPO_LIMITE_GEOJSON))
+    except Exception as e:
+        st.error(f"Erro ao carregar o arquivo GeoJSON: {e}. O mapa não será exibido.")
+        return None
+
+
+@cache_instrumentado("mapa_base", st.cache_resource)
+def mapa_base(url):
+    geojson_data = load_geojson(url)
+    return None if geojson_data is None else galinaceos.figura_mapa_base(geojson_data, url)
+
+
+with st.spinner("Agrupando os estados..."):
+    resultado, nomes_classes = calcular_agrupamentos(registro_versoes.versao("censo"))
+
+st.title("🧩 Agrupamento de Estados pelo Perfil da Avicultura")
+st.markdown(
+    "Os estados são comparados pela **composição do plantel por sistema de criação**, pela "
+    "**distribuição dos estabelecimentos por classe de cabeças**, pela **intensidade de mão de obra** "
+    "e pela **orientação ao mercado**. Os atributos são padronizados antes do agrupamento."
+)
+
+st.subheader("📈 Escolha do número de grupos")
+plotly_chart(graficos_agrupamento.figura_silhueta(resultado.resumo), use_container_width=True)
+st.caption("Silhueta próxima de 1: grupos bem separados; próxima de 0: grupos sobrepostos.")
+
+# Filtros (espelhados na URL: ?metodo=...&k=...)
+col1, col2 = st.columns(2)
+with col1:
+    metodo = selecionar(st.selectbox, "Método:", agrupamento.METODOS, "metodo",
+                        format_func=agrupamento.NOMES_METODOS.get)
+with col2:
+    faixa = sorted(resultado.resumo["K"].unique().tolist())
+    k = selecionar(st.selectbox, "Número de grupos (k):", faixa, "k",
+                   index=faixa.index(resultado.melhor(metodo)),
+                   format_func=lambda valor: f"{valor} (melhor silhueta)" if valor == resultado.melhor(metodo) else str(valor))
+
+grupos = resultado.grupos(metodo, k)
+
+with medir("figuras"):
+    rotulos = {
+        atributo: graficos_agrupamento.descrever_atributo(atributo, MAPEAMENTO_SISTEMAS, nomes_classes)
+        for atributo in resultado.perfis.columns
+    }
+    fig_perfis = graficos_agrupamento.figura_perfis(resultado.centroides(metodo, k), rotulos)
+
+st.subheader("🗺️ Estados por grupo")
+base = mapa_base(GEOJSON_BR_STATES_URL)
+if base is not None:
+    plotly_chart(
+        graficos_agrupamento.figura_mapa_grupos(grupos, base, f"Grupos de estados ({k})"),
+        use_container_width=True,
+    )
+for grupo, estados in grupos.groupby(grupos).groups.items():
+    st.markdown(f"**Grupo {grupo}:** {', '.join(estados)}")
+
+st.subheader("🧬 Perfil dos grupos")
+plotly_chart(fig_perfis, use_container_width=True)
+
+finalizar_pagina()
@@ -1,7 +1,14 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import unicodedata
+
+from dados import artefatos, banco_das_paginas, instantaneo_atual, ler_censo, versao_banco
+from dados.cache import persistente
+from dados.compartilhado import congelar, vista
+from dados.indices import IndiceBitmap
+from dados.versao import registro_versoes
+from exibicao import plotly_chart
+from filtros_url import cache_compartilhado, pontos_selecionados, selecionar
+from graficos import sistemas
+from instrumentacao import cache_instrumentado, finalizar_pagina, fragmento, iniciar_pagina, medir
 
 # Configuração da página
 st.set_page_config(
@@ -10,44 +17,86 @@ st.set_page_config(
     layout="wide",
     initial_sidebar_state="expanded",
 )
+iniciar_pagina("2_sistemas")
+registro_versoes.vigiar()
 
 # Título principal
 st.title('Análise de Sistemas de Criação Avícola')
 st.markdown("Uma visão aprofundada dos diferentes sistemas de criação de aves e seus impactos na produção.")
 st.markdown("---")
 
-# Carregamento do arquivo local
-try:
-    df = pd.read_csv("GALINACEOS.csv", sep=';')
-    # Limpar nomes das colunas (remover espaços, acentos, padronizar maiúsculas)
-    df.columns = [unicodedata.normalize('NFKD', col).encode('ASCII', 'ignore').decode('utf-8').strip().upper() for col in df.columns]
-    # REMOVIDO: st.write("Colunas disponíveis no DataFrame:", list(df.columns))
-    
-    # Convertendo para numérico e preenchendo NaNs
-    for col in ['GAL_TOTAL', 'GAL_VEND', 'Q_DZ_PROD']:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-        else:
-            st.warning(f"A coluna '{col}' não foi encontrada no dataset.")
-    
-    # Convertendo 'SIST_CRIA' para string e removendo espaços
-    if 'SIST_CRIA' in df.columns:
-        df['SIST_CRIA'] = df['SIST_CRIA'].astype(str).str.strip()
-        # Mapeamento e Limpeza da coluna SIST_CRIA
-        mapeamento_sistemas = {
-            '1-SIST_POC': 'Produtores de Ovos para Consumo',
-            '2-SIST_POI': 'Produtores de Ovos para Incubacao',
-            '3-SIST_PFC': 'Produtores de Frangos de Corte',
-            '4-Outro': 'Outros Produtores'
-        }
-        df['SIST_CRIA'] = df['SIST_CRIA'].replace(mapeamento_sistemas)
+# Carregamento do arquivo local (um único quadro, congelado, e o seu índice bitmap
+# das dimensões, para todas as sessões; refeitos quando o arquivo muda). Com o banco
+# embarcado (CENSO_BANCO), as linhas vêm do banco
+@registro_versoes.dependente("censo")
+@cache_instrumentado("carga", st.cache_resource)
+def load_data(versao):
+    banco = banco_das_paginas()
+    if banco is None:
+        df = ler_censo(instantaneo_atual(), colunas=sistemas.COLUNAS_LIDAS)
     else:
-        st.warning("A coluna 'SIST_CRIA' não foi encontrada no dataset. Gráficos dependentes dela podem não funcionar corretamente.")
+        df = banco.ler(sistemas.COLUNAS_LIDAS)
+    with medir("limpeza"):
+        df = sistemas.preparar(df)
+    with medir("indice"):
+        indice = IndiceBitmap(df)
+    return congelar(df), indice
+
+
+# Gráfico de produção de um tipo ('aves' ou 'ovos'), pronto para qualquer sessão que o abra
+@registro_versoes.dependente("censo")
+@cache_compartilhado("figura_producao")
+@persistente
+def figura_producao(versao, tipo_producao):
+    fig = artefatos.ler(f"figura_producao_{tipo_producao}", censo=versao)
+    if fig is None:
+        # A soma por sistema é uma consulta no banco, quando configurado
+        banco = banco_das_paginas()
+        fonte = vista(load_data(versao)[0]) if banco is None else banco
+        fig = sistemas.figura_producao_por_sistema(fonte, tipo_producao)
+    return fig
+
+
+# Densidade e histograma de uma seleção de sistemas (lista vazia: todos), idem
+def dados_selecao(versao, selecao):
+    dados_pagina, indice = load_data(versao)
+    return indice.filtrar(vista(dados_pagina), SIST_CRIA=selecao)[['SIST_CRIA', 'GAL_TOTAL']].dropna()
+
+
+@registro_versoes.dependente("censo")
+@cache_compartilhado("figura_densidade")
+@persistente
+def figura_densidade(versao, selecao):
+    return sistemas.figura_densidade_aves(dados_selecao(versao, selecao))
+
 
+@registro_versoes.dependente("censo")
+@cache_compartilhado("figura_histograma")
+@persistente
+def figura_histograma(versao, selecao):
+    return sistemas.figura_histograma_aves(dados_selecao(versao, selecao))
+
+
+try:
+    banco = banco_das_paginas()
+    versao = registro_versoes.versao("censo") if banco is None else versao_banco(banco)
+    dados_pagina, indice = load_data(versao)
+    df = vista(dados_pagina)
 except Exception as e:
     st.error(f"Erro ao carregar o arquivo GALINACEOS.csv: {e}")
     st.stop()
 
+# Filtro cruzado: sistemas clicados no gráfico de produção restringem a densidade e o histograma
+sistemas_selecionados = pontos_selecionados("selecao_sistemas", "x")
+with medir("filtro"):
+    df_selecao = indice.filtrar(df, SIST_CRIA=sistemas_selecionados)
+
+
+def legenda_filtro():
+    if sistemas_selecionados:
+        st.caption(f"🔎 Filtrado pela seleção no gráfico de produção: {', '.join(sistemas_selecionados)} "
+                   "(clique duas vezes naquele gráfico para limpar)")
+
 
 # ---
 # Gráfico de Densidade de Aves por Sistema de Criação
@@ -60,29 +109,14 @@ def gerar_grafico_densidade_aves_por_sistema(df):
         st.write("Colunas atuais:", df.columns)
         return
 
+    legenda_filtro()
     df_plot = df[['SIST_CRIA', 'GAL_TOTAL']].dropna()
     if df_plot.empty:
         st.warning("Não há dados suficientes para gerar o gráfico de densidade.")
         return
 
-    fig = px.density_heatmap(
-        df_plot,
-        x='GAL_TOTAL',
-        y='SIST_CRIA', # Agora com os nomes completos
-        title='Distribuição da Densidade de Aves por Sistema de Criação',
-        labels={'GAL_TOTAL': 'Total de Aves (Cabeça)', 'SIST_CRIA': 'Sistema de Criação'},
-        color_continuous_scale='Plasma',
-        nbinsx=30,
-        height=500,
-        template='plotly_white'
-    )
-    fig.update_layout(
-        title_font_size=20,
-        xaxis_title_font_size=16,
-        yaxis_title_font_size=16,
-        coloraxis_colorbar=dict(title='Densidade')
-    )
-    st.plotly_chart(fig, use_container_width=True)
+    fig = figura_densidade(versao, sistemas_selecionados)
+    plotly_chart(fig, use_container_width=True)
     
     with st.expander("💡 Interpretação do Gráfico de Densidade"):
         st.info("""
@@ -101,19 +135,11 @@ def gerar_grafico_densidade_aves_por_sistema(df):
 # Gráfico de Distribuição da Produção por Sistema
 # ---
 def gerar_grafico_distribuicao_producao_por_sistema(df, tipo_producao='aves'):
-    if tipo_producao == 'aves':
-        coluna_producao = 'GAL_VEND'
-        rotulo_eixo_y = 'Quantidade de Aves Vendidas (Cabeça)'
-        titulo_grafico = '📈 Distribuição da Venda de Aves por Sistema de Criação'
-        hover_data = ['GAL_VEND']
-    elif tipo_producao == 'ovos':
-        coluna_producao = 'Q_DZ_PROD'
-        rotulo_eixo_y = 'Quantidade de Ovos Produzidos (Dúzia)'
-        titulo_grafico = '🥚 Distribuição da Produção de Ovos por Sistema de Criação'
-        hover_data = ['Q_DZ_PROD']
-    else:
+    if tipo_producao not in sistemas.TIPOS_PRODUCAO:
         st.warning("Tipo de produção inválido. Escolha 'aves' ou 'ovos'.")
         return
+    coluna_producao = sistemas.TIPOS_PRODUCAO[tipo_producao]['coluna']
+    titulo_grafico = sistemas.TIPOS_PRODUCAO[tipo_producao]['titulo']
     
     st.subheader(titulo_grafico)
     st.markdown(f"Visualize como a {'venda de aves' if tipo_producao == 'aves' else 'produção de ovos'} se distribui entre os diferentes sistemas de criação.")
@@ -123,35 +149,10 @@ def gerar_grafico_distribuicao_producao_por_sistema(df, tipo_producao='aves'):
         st.write("Colunas atuais:", df.columns)
         return
     
-    producao_por_sistema = df.groupby('SIST_CRIA')[coluna_producao].sum().reset_index()
-    
-    fig = px.bar(
-        producao_por_sistema,
-        x='SIST_CRIA',
-        y=coluna_producao,
-        title=titulo_grafico,
-        labels={'SIST_CRIA': 'Sistema de Criação', coluna_producao: rotulo_eixo_y},
-        color=coluna_producao,
-        color_continuous_scale='Viridis',
-        text=coluna_producao,
-        template='plotly_white',
-        hover_data=hover_data
-    )
-    fig.update_traces(
-        texttemplate='%{text:,.0f}',
-        textposition='outside',
-        marker_line_color='rgb(8,48,107)',
-        marker_line_width=1.5
-    )
-    fig.update_layout(
-        xaxis_tickangle=-45,
-        title_font_size=20,
-        xaxis_title_font_size=16,
-        yaxis_title_font_size=16,
-        uniformtext_minsize=8,
-        uniformtext_mode='hide'
-    )
-    st.plotly_chart(fig, use_container_width=True)
+    fig = figura_producao(versao, tipo_producao)
+    st.caption("Clique numa barra (ou selecione várias) para filtrar a densidade e o histograma.")
+    plotly_chart(fig, use_container_width=True, on_select="rerun", selection_mode=("points", "box"),
+                 key="selecao_sistemas")
     
     with st.expander(f"💡 Interpretação do Gráfico de {('Venda de Aves' if tipo_producao == 'aves' else 'Produção de Ovos')}"):
         st.info(f"""
@@ -177,31 +178,14 @@ def gerar_histograma_aves_por_sistema(df):
         st.write("Colunas atuais:", df.columns)
         return
 
+    legenda_filtro()
     df_plot = df[['SIST_CRIA', 'GAL_TOTAL']].dropna()
     if df_plot.empty:
         st.warning("Não há dados suficientes para gerar o histograma.")
         return
 
-    fig = px.histogram(
-        df_plot,
-        x='GAL_TOTAL',
-        color='SIST_CRIA',
-        title='Distribuição de Aves por Sistema de Criação',
-        labels={'GAL_TOTAL': 'Total de Aves (Cabeça)', 'SIST_CRIA': 'Sistema de Criação'},
-        color_discrete_sequence=px.colors.qualitative.Pastel,
-        nbins=40,
-        barmode='overlay',
-        opacity=0.7,
-        template='plotly_white',
-        hover_data=['GAL_TOTAL']
-    )
-    fig.update_layout(
-        title_font_size=20,
-        xaxis_title_font_size=16,
-        yaxis_title_font_size=16,
-        legend_title_text='Sistema de Criação'
-    )
-    st.plotly_chart(fig, use_container_width=True)
+    fig = figura_histograma(versao, sistemas_selecionados)
+    plotly_chart(fig, use_container_width=True)
     
     with st.expander("💡 Interpretação do Histograma"):
         st.info("""
@@ -217,25 +201,37 @@ def gerar_histograma_aves_por_sistema(df):
         - Essas informações são relevantes para o planejamento do setor, permitindo identificar oportunidades de apoio e desenvolvimento conforme o perfil produtivo predominante em cada sistema.
         """)
 
+# Tipo de produção e o seu gráfico: trocar aves/ovos reexecuta só este trecho
+@fragmento("fragmento_producao")
+def secao_producao():
+    col1, col2 = st.columns([3, 1])
+    with col2:
+        st.markdown("Selecione o tipo de produção para visualizar as vendas:")
+        # Espelhado na URL: ?producao=aves ou ?producao=ovos
+        tipo = selecionar(
+            st.radio,
+            "Tipo de Produção:",
+            ('aves', 'ovos'),
+            'producao',
+            format_func=lambda x: "Aves Vendidas" if x=="aves" else "Ovos Produzidos",
+            key='tipo_producao'
+        )
+    with col1:
+        gerar_grafico_distribuicao_producao_por_sistema(df, tipo_producao=tipo)
+    # Seleção nova no gráfico: a densidade e o histograma, fora do fragmento, são refeitos
+    if pontos_selecionados("selecao_sistemas", "x") != sistemas_selecionados:
+        st.rerun()
+
+
 # Seção de gráficos
-col1, col2 = st.columns([3, 1])
-with col1:
-    gerar_grafico_densidade_aves_por_sistema(df)
-with col2:
-    st.markdown("Selecione o tipo de produção para visualizar as vendas:")
-    tipo = st.radio(
-        "Tipo de Produção:",
-        ('aves', 'ovos'),
-        format_func=lambda x: "Aves Vendidas" if x=="aves" else "Ovos Produzidos",
-        key='tipo_producao'
-    )
-
-# Garantir que os gráficos de produção e histograma sempre sejam exibidos
-gerar_grafico_distribuicao_producao_por_sistema(df, tipo_producao=tipo)
-gerar_histograma_aves_por_sistema(df)
+gerar_grafico_densidade_aves_por_sistema(df_selecao)
+secao_producao()
+gerar_histograma_aves_por_sistema(df_selecao)
 
 # Rodapé
 st.markdown("---")
 st.caption("""
 🔎 *Análise desenvolvida com base em dados de produção avícola* 📅 *Atualizado em Outubro 2023*
 """)
+
+finalizar_pagina()
@@ -1,6 +1,8 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
+
+from exibicao import plotly_chart
+from graficos import lucratividade
+from instrumentacao import finalizar_pagina, iniciar_pagina, medir
 
 # Configuração da página
 st.set_page_config(
@@ -8,66 +10,22 @@ st.set_page_config(
     page_icon="📊",
     layout="wide", # Mudar para wide para melhor visualização 3D
 )
+iniciar_pagina("3_lucratividade")
 
 # Título principal
 st.title("💰 Fatores que Mais Impactam a Lucratividade da Granja (Visualização 3D)")
 
-# Dados dos coeficientes
-coefs = {
-    "Tecnologia": 0.9,
-    "Terra": -0.8,
-    "Mão de Obra": 0.5,
-    "Marketing": -0.3,
-    "Capital": 0.2,
-    "Insumos": -0.1,
-}
-
 # Preparação dos dados
-coef_df = pd.DataFrame(list(coefs.items()), columns=["Fator", "Coeficiente"])
-coef_df["Categoria"] = coef_df["Coeficiente"].apply(lambda x: "Positivo" if x > 0 else "Negativo")
-# Adicionar uma "terceira dimensão" para o 3D: pode ser a Magnitude
-coef_df["Magnitude_Absoluta"] = coef_df["Coeficiente"].abs()
-# Ou uma variável dummy fixa para apenas visualizar os pontos em um plano 3D:
-# coef_df["Z_Dummy"] = 1 # Todos os pontos em Z=1
-
-coef_df = coef_df.sort_values("Coeficiente", key=abs, ascending=True)
+with medir("carga"):
+    coef_df = lucratividade.tabela_coeficientes()
 
 # Gráfico de Dispersão 3D
 st.subheader("🌐 Visualização 3D dos Coeficientes de Impacto")
 
-fig_3d = px.scatter_3d(
-    coef_df,
-    x="Fator",
-    y="Coeficiente",
-    z="Magnitude_Absoluta", # Usar a magnitude como o terceiro eixo (profundidade)
-    color="Categoria", # Colorir pela categoria (Positivo/Negativo)
-    color_discrete_map={"Positivo": "#4CAF50", "Negativo": "#F44336"},
-    size="Magnitude_Absoluta", # Fazer o tamanho do ponto proporcional à magnitude
-    hover_name="Fator",
-    hover_data={"Coeficiente": ":.2f", "Magnitude_Absoluta": False}, # Mostrar coeficiente no hover, ocultar magnitude
-    title='Impacto dos Fatores na Lucratividade (3D)',
-    labels={
-        "Fator": "Fator",
-        "Coeficiente": "Coeficiente de Impacto",
-        "Magnitude_Absoluta": "Magnitude do Impacto"
-    },
-    height=600,
-    template="plotly_dark" # Tema escuro para um visual mais "tecnológico" em 3D
-)
+with medir("figura_3d"):
+    fig_3d = lucratividade.figura_coeficientes_3d(coef_df)
 
-fig_3d.update_layout(
-    scene = dict(
-        xaxis_title='Fator',
-        yaxis_title='Coeficiente de Impacto',
-        zaxis_title='Magnitude Absoluta',
-        # Ajustar a câmera para uma melhor visão inicial
-        camera = dict(
-            eye=dict(x=1.8, y=1.8, z=0.8) # Mais de cima e de lado
-        )
-    )
-)
-
-st.plotly_chart(fig_3d, use_container_width=True)
+plotly_chart(fig_3d, use_container_width=True)
 
 with st.expander("💡 Interpretação do Gráfico 3D"):
     st.info("""
@@ -138,3 +96,5 @@ with col2:
 # Rodapé
 st.markdown("---")
 st.caption("Análise desenvolvida com base em modelo de regressão linear multivariada | Dados simulados")
+
+finalizar_pagina()
@@ -1,73 +1,55 @@
 import streamlit as st
-import plotly.express as px
-import pandas as pd
+
+from dados import ler_censo
+from dados.compartilhado import congelar, vista
+from exibicao import plotly_chart
+from filtros_url import cache_compartilhado, selecionar
+from graficos import correlacao
+from graficos.correlacao import DESCRICAO_VARIAVEIS as descricao_variaveis
+from instrumentacao import cache_instrumentado, finalizar_pagina, iniciar_pagina
 
 # URL do arquivo CSV no GitHub (versão raw)
 url = "https://raw.githubusercontent.com/calazansiesb/CIADM1A/main/GALINACEOS.csv"
 
-# Carregar os dados corretamente
-df = pd.read_csv(url, sep=";", encoding="utf-8")
-
-# Dicionário de descrições das variáveis
-descricao_variaveis = {
-    "SIST_CRIA": "Sistema de criação",
-    "NIV_TERR": "Nível das unidades territoriais",
-    "COD_TERR": "Código das unidades territoriais",
-    "NOM_TERR": "Nome das unidades territoriais",
-    "GAL_TOTAL": "Total efetivo de galináceos",
-    "V_GAL_VEND": "Valor dos galináceos vendidos",
-    "E_RECEBE_ORI": "Estabelecimentos com orientação técnica",
-    "VTP_AGRO": "Valor total da produção agropecuária",
-    "E_ORI_GOV": "Orientação do governo",
-    "A_PAST_PLANT": "Área de pastagem plantada",
-    "GAL_ENG": "Galináceos para engorda",
-    "E_ASSOC_COOP": "Associação a cooperativas",
-    "CL_GAL": "Classe de cabeças de galináceos",
-    "GAL_POED": "Total de poedeiras",
-    "Q_DZ_VEND": "Ovos vendidos em dúzias",
-    "E_COMERC": "Estabelecimentos comerciais",
-    "E_AGRIFAM": "Agricultura familiar",
-    "E_FINANC": "Estabelecimentos com investimento",
-    "RECT_AGRO": "Receita total agropecuária",
-    "E_FINANC_COOP": "Investimento de cooperativas",
-    "E_CNPJ": "Estabelecimentos com CNPJ",
-    "E_SUBS": "Produção para consumo próprio",
-    "E_DAP": "Possui DAP/PRONAF",
-    "N_TRAB_TOTAL": "Total de trabalhadores",
-    "E_PRODUTOR": "Produtor individual",
-    "GAL_MATR": "Total de matrizes",
-    "GAL_VEND": "Galináceos vendidos",
-    "E_ORI_INTEG": "Orientação de integradoras",
-    "E_GAL_MATR": "Estabelecimentos com matrizes"
-}
+iniciar_pagina("6_correlacao")
+
+# Carregar os dados corretamente (um único quadro, congelado, para todas as sessões)
+@cache_instrumentado("carga", st.cache_resource)
+def load_data(url):
+    return congelar(ler_censo(url))
+
+
+# Gráfico de uma combinação de eixos e nível, pronto para qualquer sessão que a abra
+@cache_compartilhado("figura_dispersao")
+def figura_por_filtros(col_x, col_y, regiao):
+    df = vista(load_data(url))
+    df_filtrado = df[df["NIV_TERR"] == regiao] if regiao is not None else df
+    return correlacao.figura_dispersao(df_filtrado, col_x, col_y, regiao)
+
+
+df = vista(load_data(url))
 
 # Configuração da interface do Streamlit
 st.title("Gráfico de Dispersão - Correlação entre Métricas")
 
-# Seletores para métricas
-col_x = st.selectbox("Selecione a métrica para o eixo X:", df.columns, format_func=lambda x: descricao_variaveis.get(x, x))
-col_y = st.selectbox("Selecione a métrica para o eixo Y:", df.columns, format_func=lambda y: descricao_variaveis.get(y, y))
+# Seletores para métricas (espelhados na URL: ?x=...&y=...&nivel=...)
+col_x = selecionar(st.selectbox, "Selecione a métrica para o eixo X:", df.columns, "x",
+                   format_func=lambda x: descricao_variaveis.get(x, x))
+col_y = selecionar(st.selectbox, "Selecione a métrica para o eixo Y:", df.columns, "y",
+                   format_func=lambda y: descricao_variaveis.get(y, y))
 
 # Seletor para região
 if "NIV_TERR" in df.columns:
-    regiao = st.selectbox("Selecione a Região:", df["NIV_TERR"].unique())
-    df_filtrado = df[df["NIV_TERR"] == regiao]
+    regiao = selecionar(st.selectbox, "Selecione a Região:", df["NIV_TERR"].unique(), "nivel")
 else:
     st.error("Coluna 'NIV_TERR' não encontrada no arquivo.")
-    df_filtrado = df
+    regiao = None
 
 # Criar o gráfico de dispersão
-fig = px.scatter(
-    df_filtrado, 
-    x=col_x, 
-    y=col_y, 
-    color="NOM_TERR" if "NOM_TERR" in df.columns else None,
-    title=f"Correlação entre {col_x} e {col_y} para {regiao}",
-    labels={col_x: col_x, col_y: col_y}
-)
+fig = figura_por_filtros(col_x, col_y, regiao)
 
 # Exibir o gráfico no Streamlit
-st.plotly_chart(fig)
+plotly_chart(fig)
 
 # Expander para exibir sugestões adicionais
 with st.expander("Sugestões de Análises"):
@@ -107,3 +89,5 @@ with st.expander("Sugestões de Análises"):
     - **Filtro:** {descricao_variaveis["E_CNPJ"]}  
     - **Objetivo:** Avaliar se acesso a financiamento está ligado a maiores receitas.  
     """)
+
+finalizar_pagina()
@@ -1,7 +1,10 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import os # Embora 'os' não seja estritamente necessário para esta URL, é bom manter se usado em outras partes do seu script.
+
+from dados import ler_censo
+from exibicao import plotly_chart
+from graficos import colaboradores
+from instrumentacao import finalizar_pagina, iniciar_pagina, medir
 
 # ===============================================================================
 # 0. Carregamento do DataFrame (USANDO DADOS REAIS DO GITHUB)
@@ -9,9 +12,12 @@ import os # Embora 'os' não seja estritamente necessário para esta URL, é bom
 # URL direta para o arquivo CSV no GitHub (usando raw.githubusercontent.com)
 url_galinaceos_csv = "https://raw.githubusercontent.com/calazansiesb/CIADM1A/main/GALINACEOS.csv"
 
+iniciar_pagina("7_colaboradores")
+
 try:
-    # CORREÇÃO AQUI: Adicionando sep=';' para o delimitador correto
-    df = pd.read_csv(url_galinaceos_csv, sep=';')
+    # Delimitador ';' e números com separador de milhares tratados pelo esquema do censo
+    with medir("carga"):
+        df = ler_censo(url_galinaceos_csv, colunas=colaboradores.COLUNAS_LIDAS)
     # st.success(f"Dados carregados com sucesso de: {url_galinaceos_csv}") # Removido para limpeza
 except Exception as e:
     st.error(f"Erro ao carregar o DataFrame do GitHub: {e}")
@@ -27,29 +33,19 @@ st.header('👥 Relação entre Tamanho do Estabelecimento e Número de Trabalha
 # Verifica se as colunas necessárias existem no DataFrame
 # Esta verificação é crucial para evitar erros se o DataFrame estiver vazio ou mal formatado
 if not df.empty and 'GAL_TOTAL' in df.columns and 'N_TRAB_TOTAL' in df.columns and 'SIST_CRIA' in df.columns:
-    # Converte as colunas para numérico, tratando erros
-    df['GAL_TOTAL'] = pd.to_numeric(df['GAL_TOTAL'], errors='coerce')
-    df['N_TRAB_TOTAL'] = pd.to_numeric(df['N_TRAB_TOTAL'], errors='coerce')
-
-    # Remove linhas com valores NaN resultantes da coerção para as colunas essenciais
-    df_clean = df.dropna(subset=['GAL_TOTAL', 'N_TRAB_TOTAL', 'SIST_CRIA'])
+    # Converte as colunas para numérico e remove linhas com valores NaN nas colunas essenciais
+    with medir("limpeza"):
+        df_clean = colaboradores.preparar(df)
 
     if not df_clean.empty:
         # Calcula a correlação
-        corr = df_clean['GAL_TOTAL'].corr(df_clean['N_TRAB_TOTAL'])
+        with medir("agregacao"):
+            corr = df_clean['GAL_TOTAL'].corr(df_clean['N_TRAB_TOTAL'])
 
         # Cria o gráfico de dispersão com linha de tendência OLS e cor por sistema de criação
-        fig3 = px.scatter(
-            df_clean,
-            x='GAL_TOTAL',
-            y='N_TRAB_TOTAL',
-            title='Relação entre Tamanho do Estabelecimento e Número de Trabalhadores',
-            labels={'GAL_TOTAL': 'Total de Galináceos', 'N_TRAB_TOTAL': 'Número de Trabalhadores'},
-            trendline="ols",
-            color='SIST_CRIA',
-            hover_name="SIST_CRIA" # Adiciona o nome do sistema de criação ao passar o mouse
-        )
-        st.plotly_chart(fig3, use_container_width=True)
+        with medir("figura_dispersao"):
+            fig3 = colaboradores.figura_tamanho_trabalhadores(df_clean)
+        plotly_chart(fig3, use_container_width=True)
 
         # Exibe a correlação calculada
         st.info(f"**Correlação Calculada:** {corr:.2f}")
@@ -75,3 +71,5 @@ if not df.empty and 'GAL_TOTAL' in df.columns and 'N_TRAB_TOTAL' in df.columns a
         st.warning("Não há dados válidos (não-nulos) nas colunas 'GAL_TOTAL', 'N_TRAB_TOTAL' ou 'SIST_CRIA' para exibir o gráfico após o tratamento de valores ausentes. Verifique seus dados de origem.")
 else:
     st.warning("As colunas 'GAL_TOTAL', 'N_TRAB_TOTAL' ou 'SIST_CRIA' não foram encontradas no DataFrame principal. Verifique o nome das colunas no seu arquivo CSV e a acessibilidade do mesmo.")
+
+finalizar_pagina()
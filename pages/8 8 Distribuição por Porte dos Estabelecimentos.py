@@ -1,40 +1,51 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px # Adicione esta importação se ainda não tiver
+
+from dados import (
+    MAPEAMENTO_SISTEMAS,
+    MEDIDAS_DISTRIBUICAO,
+    NIVEIS_DISTRIBUICAO,
+    DistribuicaoBanco,
+    DistribuicaoPorte,
+    artefatos,
+    banco_das_paginas,
+    instantaneo_atual,
+    ler_censo,
+    montar_cubo,
+    versao_banco,
+)
+from dados.versao import registro_versoes
+from exibicao import plotly_chart
+from filtros_url import cache_compartilhado, selecionar
+from graficos import porte
+from instrumentacao import cache_instrumentado, finalizar_pagina, iniciar_pagina
 
 # =============================================
 # Carregar os dados
 # =============================================
 # Função para carregar os dados do CSV
-@st.cache_data # Usar cache para otimizar o carregamento do DataFrame
-def load_data(file_path):
+iniciar_pagina("8_porte")
+registro_versoes.vigiar()
+
+TODOS_OS_SISTEMAS = "Todos os sistemas"
+TODAS_AS_REGIOES = "Todas as regiões"
+
+# Somas por classe de cada nível, região e sistema, montadas uma vez para todas as
+# sessões e refeitas quando o arquivo muda: cada seleção só lê uma linha delas.
+# Com o banco embarcado (CENSO_BANCO), cada seleção vira uma consulta no banco
+@registro_versoes.dependente("censo")
+@cache_instrumentado("carga", st.cache_resource)
+def load_data(file_path, versao):
+    banco = banco_das_paginas()
+    if banco is not None:
+        return DistribuicaoBanco(banco)
     try:
-        # AQUI ESTÁ A PARTE CRUCIAL: carregando o CSV e especificando o separador
-        df = pd.read_csv(file_path, sep=';', encoding='utf-8')
-
-        # Limpeza e conversão de colunas que podem ser úteis para outros gráficos
-        if 'NOM_TERR' in df.columns:
-            df['NOM_TERR'] = df['NOM_TERR'].astype(str).str.strip().str.title()
-
-        numeric_cols = ['GAL_MATR', 'GAL_TOTAL', 'N_TRAB_TOTAL'] # Exemplo de colunas numéricas
-        for col in numeric_cols:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-            else:
-                #st.warning(f"Coluna '{col}' não encontrada durante o pré-processamento.")
-                df[col] = 0 # Define como 0 para evitar erros se a coluna não existir
-
-        # Mapeamento de SIST_CRIA (se existir e for necessário)
-        if 'SIST_CRIA' in df.columns:
-            df['SIST_CRIA'] = df['SIST_CRIA'].astype(str).str.strip()
-            mapeamento_sistemas = {
-                '1-SIST_POC': 'Produtores de ovos para consumo',
-                '2-SIST_POI': 'Produtores de ovos para incubação',
-                '3-SIST_PFC': 'Produtores de frangos de corte',
-                '4-Outro': 'Outros produtores'
-            }
-            df['SIST_CRIA'] = df['SIST_CRIA'].replace(mapeamento_sistemas)
-        return df
+        # Cubo pré-calculado pelo precomputar.py, quando em dia com o arquivo;
+        # senão, só as colunas do gráfico são lidas do arquivo
+        cubo = artefatos.ler("cubo", censo=versao)
+        if cubo is None:
+            df = ler_censo(instantaneo_atual(file_path), encoding='utf-8', colunas=porte.COLUNAS_LIDAS)
+            cubo = montar_cubo(df, medidas=list(MEDIDAS_DISTRIBUICAO), derivadas=False)
+        return DistribuicaoPorte(cubo)
     except FileNotFoundError:
         st.error("Erro: Arquivo 'GALINACEOS.csv' não encontrado. Por favor, certifique-se de que o arquivo está no mesmo diretório da aplicação.")
         st.stop() # Interrompe a execução do script
@@ -42,40 +53,82 @@ def load_data(file_path):
         st.error(f"Erro ao carregar ou processar o arquivo CSV: {e}. Verifique o formato do arquivo e o separador.")
         st.stop() # Interrompe a execução do script
 
-# Chama a função para carregar o DataFrame
-df = load_data("GALINACEOS.csv")
+
+# Gráfico de uma seleção, pronto para qualquer sessão que a abra
+@registro_versoes.dependente("censo")
+@cache_compartilhado("figura_porte")
+def figura_porte(versao, medida, nivel, sistema, regiao, escala_log):
+    if (medida, nivel, sistema, regiao, escala_log) == ('E_TEM_GAL', 'BR', None, None, False):
+        # Pré-calculada pelo precomputar.py, quando em dia com o arquivo
+        fig = artefatos.ler("figura_porte", censo=versao)
+        if fig is not None:
+            return fig
+    distribuicao = load_data("GALINACEOS.csv", versao)
+    # Sem região escolhida, GR e UF mostram a contribuição de cada região (barras empilhadas)
+    if nivel != 'BR' and regiao is None:
+        tabela = distribuicao.por_regiao(nivel, sistema)
+    else:
+        tabela = distribuicao.tabela(nivel, sistema, regiao)
+    titulo = porte.titulo_distribuicao(medida, nivel, sistema, regiao)
+    return porte.figura_distribuicao_porte(tabela, medida, titulo, escala_log)
+
+
+# Chama a função para carregar as somas (a versão é a do banco, quando configurado)
+banco = banco_das_paginas()
+versao = registro_versoes.versao("censo") if banco is None else versao_banco(banco)
+distribuicao = load_data("GALINACEOS.csv", versao)
 
 # =============================================
 # 5. Distribuição por Porte dos Estabelecimentos
 # =============================================
 st.header('🏭 Distribuição por Porte dos Estabelecimentos')
+st.markdown(
+    "Número de estabelecimentos em cada faixa de cabeças de galináceos (classes do IBGE), "
+    "somado dentro de um nível territorial: Brasil, regiões ou estados, sem misturar os níveis."
+)
 
-# O restante do seu código para o gráfico de porte
-if not df.empty and 'NOM_CL_GAL' in df.columns:
-    freq_portes = df['NOM_CL_GAL'].value_counts().sort_index()
-    fig4 = px.bar(
-        x=freq_portes.index,
-        y=freq_portes.values,
-        title='Distribuição de Estabelecimentos por Porte (Faixas IBGE)',
-        labels={'x': 'Porte do Estabelecimento', 'y': 'Quantidade'},
-        color_discrete_sequence=['#636EFA', '#EF553B', '#00CC96', '#AB63FA', '#FFA15A']
-    )
-    st.plotly_chart(fig4, use_container_width=True)
+# Filtros (espelhados na URL: ?medida=...&nivel=...&sistema=...&regiao=...)
+col1, col2, col3, col4 = st.columns(4)
+with col1:
+    medida = selecionar(st.selectbox, "Medida:", MEDIDAS_DISTRIBUICAO, "medida",
+                        format_func=MEDIDAS_DISTRIBUICAO.get)
+with col2:
+    nivel = selecionar(st.selectbox, "Nível territorial:", NIVEIS_DISTRIBUICAO, "nivel",
+                       format_func=porte.NOMES_NIVEIS.get)
+with col3:
+    sistema = selecionar(st.selectbox, "Sistema de criação:", [TODOS_OS_SISTEMAS] + distribuicao.sistemas,
+                         "sistema", format_func=lambda codigo: MAPEAMENTO_SISTEMAS.get(codigo, codigo))
+with col4:
+    # Detalhamento por região: só nos níveis abaixo do Brasil
+    regiao = selecionar(st.selectbox, "Região:", [TODAS_AS_REGIOES] + list(distribuicao.regioes), "regiao",
+                        disabled=nivel == 'BR')
+escala_log = st.checkbox("Escala logarítmica", key="escala_log",
+                         help="As faixas menores somam milhões de estabelecimentos; as maiores, poucos milhares.")
+
+sistema = None if sistema == TODOS_OS_SISTEMAS else sistema
+regiao = None if regiao == TODAS_AS_REGIOES or nivel == 'BR' else regiao
+
+if distribuicao.classes.empty:
+    st.warning("Não há classes de cabeças no arquivo. Verifique o arquivo CSV.")
+else:
+    plotly_chart(figura_porte(versao, medida, nivel, sistema, regiao, escala_log), use_container_width=True)
+    if nivel != 'BR':
+        st.caption("Valores sob sigilo (X) nas regiões e estados ficam fora das somas, "
+                   "que podem ficar abaixo das do Brasil.")
 
     with st.expander("💡 Interpretação do Gráfico de Distribuição por Porte dos Estabelecimentos"):
         st.info("""
         **🏭 Análise da Distribuição por Porte dos Estabelecimentos**
 
-        O gráfico mostra a quantidade de estabelecimentos distribuídos por diferentes faixas de porte (definidas pelo IBGE):
+        Cada barra soma os estabelecimentos de uma faixa de cabeças de galináceos (definidas pelo IBGE) no nível e no sistema escolhidos:
 
-        - As faixas intermediárias, especialmente entre **201 e 5.000 aves**, concentram os maiores números de estabelecimentos, sugerindo predominância de produtores de médio porte no setor.
-        - Pequenos produtores ("De 1 a 100" e "De 101 a 200") também são numerosos, mas em menor quantidade que as faixas intermediárias.
-        - Faixas extremas ("De 100.001 e mais" e "Sem galináceos em 30.09.2017") apresentam participação reduzida, indicando que grandes produtores e estabelecimentos temporariamente inativos são minoria.
-        - A categoria "Total" pode representar registros agregados ou casos não classificados nas demais faixas, devendo ser analisada com cautela.
-        - A presença de estabelecimentos "Sem galináceos" reforça a importância de considerar sazonalidade ou inatividade temporária.
+        - Os pequenos criatórios (**"De 1 a 100"** cabeças) são a imensa maioria dos estabelecimentos: no Brasil, mais de 2,7 milhões, contra cerca de 120 mil nas demais faixas somadas. A escala logarítmica ajuda a comparar as faixas maiores.
+        - Entre os grandes, a faixa **"De 10.001 a 50.000"** se destaca, puxada pelos **produtores de frangos de corte** (escolha o sistema para ver).
+        - **"Sem galináceos em 30.09.2017"** aparece só entre os estabelecimentos que criam galináceos (**E_CRIA_GAL**): criam, mas não tinham aves na data de referência.
+        - Nas regiões e nos estados, sem região escolhida, as barras se dividem pela contribuição de cada região; escolher uma região mostra só ela.
 
         **Conclusão:**
-        - O perfil da produção avícola brasileira é fortemente marcado pela presença de estabelecimentos de porte intermediário, com pequena participação de grandes produtores e um contingente relevante de pequenos estabelecimentos. Isso tem implicações para políticas públicas, estratégias de mercado e apoio ao setor.
+        - A avicultura brasileira combina um contingente enorme de pequenos estabelecimentos com poucos milhares de granjas de grande porte, que concentram o plantel. Isso tem implicações para políticas públicas, estratégias de mercado e apoio ao setor.
         """)
-else:
-    st.warning("A coluna 'NOM_CL_GAL' não foi encontrada no dataset ou o dataset está vazio. Verifique o arquivo CSV.")
+
+finalizar_pagina()
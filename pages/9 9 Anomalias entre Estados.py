@@ -0,0 +1,138 @@
+import streamlit as st
+
+from dados import (
+    CAMINHO_CSV,
+    MAPEAMENTO_SISTEMAS,
+    anomalias,
+    artefatos,
+    instantaneo_atual,
+    ler_censo,
+    montar_cubo,
+)
+from dados.cache import persistente
+from dados.versao import registro_versoes
+from exibicao import plotly_chart
+from filtros_url import selecionar
+from graficos import anomalias as graficos_anomalias
+from graficos.correlacao import DESCRICAO_VARIAVEIS as descricao_variaveis
+from instrumentacao import cache_instrumentado, finalizar_pagina, iniciar_pagina, medir
+
+# Configuração da página
+st.set_page_config(
+    page_title="Anomalias entre Estados",
+    page_icon="🔎",
+    layout="wide",
+)
+iniciar_pagina("9_anomalias")
+registro_versoes.vigiar()
+
+TODOS_OS_SISTEMAS = "Todos os sistemas"
+LIMIARES = [2.0, 2.5, 3.0, 3.5, 5.0, 10.0]
+
+
+# Triagem de todas as medidas e sistemas, refeita só quando o arquivo muda
+# (e uma vez por host, com o cache em disco)
+@registro_versoes.dependente("censo")
+@cache_instrumentado("triagem", st.cache_resource(max_entries=4))
+@persistente
+def calcular_triagem(versao):
+    tabela = artefatos.ler("triagem", censo=versao)
+    if tabela is None:
+        tabela = anomalias.triagem(montar_cubo(ler_censo(instantaneo_atual(CAMINHO_CSV))))
+    return tabela
+
+
+# Descrições da planilha do IBGE (pré-calculadas pelo precomputar.py) sobre as da página 6
+@registro_versoes.dependente("descricoes")
+@cache_instrumentado("descricoes", st.cache_resource)
+def carregar_descricoes(versao):
+    return {**descricao_variaveis, **(artefatos.ler("descricoes", descricoes=versao) or {})}
+
+
+def nome_sistema(codigo):
+    return MAPEAMENTO_SISTEMAS.get(codigo, codigo)
+
+
+def nome_medida(medida):
+    return descricoes.get(medida, medida)
+
+
+tabela = calcular_triagem(registro_versoes.versao("censo"))
+descricoes = carregar_descricoes(registro_versoes.versao("descricoes"))
+
+st.title("🔎 Anomalias entre Estados")
+st.markdown(
+    "Para cada medida do censo e cada sistema de criação, compara as UFs pela "
+    "**mediana** e pelo **desvio absoluto mediano (MAD)**: o escore z robusto não é "
+    "puxado pelos próprios estados extremos (quando o MAD é quase nulo diante da "
+    "dispersão da coluna, a escala usa um piso proporcional ao desvio absoluto médio). "
+    "A **razão à região** mostra quanto a UF "
+    "se afasta da média dos estados da sua Grande Região."
+)
+
+# Filtros (espelhados na URL: ?sistema=...&limiar=...)
+col1, col2 = st.columns(2)
+with col1:
+    sistema = selecionar(st.selectbox, "Sistema de criação:", [TODOS_OS_SISTEMAS] + list(MAPEAMENTO_SISTEMAS),
+                         "sistema", format_func=nome_sistema)
+with col2:
+    limiar = selecionar(st.selectbox, "Limiar do |escore z robusto|:", LIMIARES, "limiar",
+                        index=LIMIARES.index(anomalias.LIMIAR_Z))
+
+with medir("principais"):
+    if sistema != TODOS_OS_SISTEMAS:
+        tabela_sistema = tabela[tabela["SIST_CRIA"] == sistema]
+    else:
+        tabela_sistema = tabela
+    atipicos = anomalias.principais(tabela_sistema, n=50, limiar=limiar)
+
+total = int((tabela_sistema["Z_ROBUSTO"].abs() >= limiar).sum())
+st.metric("Células atípicas (UF × sistema × medida)", f"{total:,}".replace(",", "."))
+
+st.subheader("📋 Principais anomalias")
+if atipicos.empty:
+    st.info("Nenhuma célula acima do limiar escolhido.")
+    finalizar_pagina()
+    st.stop()
+
+exibicao = atipicos.assign(
+    SIST_CRIA=atipicos["SIST_CRIA"].map(nome_sistema),
+    MEDIDA=atipicos["MEDIDA"].map(nome_medida),
+)
+st.dataframe(
+    exibicao[["NOM_TERR", "REGIAO", "SIST_CRIA", "MEDIDA", "VALOR", "MEDIANA", "Z_ROBUSTO", "RAZAO_REGIAO"]],
+    column_config={
+        "NOM_TERR": "Estado",
+        "REGIAO": "Região",
+        "SIST_CRIA": "Sistema de criação",
+        "MEDIDA": "Medida",
+        "VALOR": st.column_config.NumberColumn("Valor", format="%.2f"),
+        "MEDIANA": st.column_config.NumberColumn("Mediana das UFs", format="%.2f"),
+        "Z_ROBUSTO": st.column_config.NumberColumn("Escore z robusto", format="%.1f"),
+        "RAZAO_REGIAO": st.column_config.NumberColumn(
+            "Razão à região", format="%.2f", help="Valor da UF sobre a média das UFs da sua região"
+        ),
+    },
+    hide_index=True,
+    use_container_width=True,
+)
+
+# Detalhe de uma anomalia: a medida em todas as UFs
+st.subheader("📊 Detalhe")
+posicoes = list(range(len(atipicos)))
+escolha = st.selectbox(
+    "Anomalia:",
+    posicoes,
+    format_func=lambda i: (f"{atipicos['NOM_TERR'].iloc[i]} — {nome_medida(atipicos['MEDIDA'].iloc[i])} "
+                           f"({nome_sistema(atipicos['SIST_CRIA'].iloc[i])})"),
+)
+linha = atipicos.iloc[escolha]
+with medir("figura_detalhe"):
+    detalhe = graficos_anomalias.tabela_detalhe(tabela, linha["MEDIDA"], linha["SIST_CRIA"])
+    fig = graficos_anomalias.figura_detalhe(
+        detalhe, f"{nome_medida(linha['MEDIDA'])} — {nome_sistema(linha['SIST_CRIA'])}", linha["NOM_TERR"], limiar
+    )
+plotly_chart(fig, use_container_width=True)
+st.caption("Linha tracejada: mediana das UFs. Faixa cinza: mediana ± limiar × MAD.")
+
+finalizar_pagina()
@@ -0,0 +1,302 @@
+"""Pré-calcula os artefatos lidos pelas páginas (para imagens de contêiner já aquecidas).
+
+A partir do GALINACEOS.csv e da planilha de descrição das variáveis, grava
+em ``artefatos/`` (ver ``dados.artefatos``) o que as páginas leem antes de
+calcular: o instantâneo Parquet (ao lado do CSV), as descrições das
+variáveis, o cubo do censo (página 8), a triagem de anomalias (página 9), os
+agrupamentos de estados (página 10), o modelo de regressão padrão da página
+4, a geometria dos estados (páginas 5 e 10) e as figuras mais abertas das
+páginas 2, 4 e 8. As demais páginas calculam na requisição.
+
+Os passos formam um grafo de dependências e rodam num pool de processos
+assim que as suas dependências terminam. O manifesto guarda o hash das
+entradas de cada artefato (versão dos arquivos de origem, hashes das
+dependências e código que o constrói): na execução seguinte, os artefatos em
+dia são pulados, e os demais são refeitos com tudo o que depende deles.
+
+Uso: python precomputar.py [--saida artefatos] [--processos N] [--sem-rede] [--forcar] [passo ...]
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+
+import pandas as pd
+
+from dados import (
+    CAMINHO_CSV,
+    CAMINHO_DESCRICOES,
+    DistribuicaoPorte,
+    agrupamento,
+    anomalias,
+    artefatos,
+    colunas_leitura,
+    gravar_instantaneo,
+    ler_censo,
+    montar_cubo,
+    rede,
+)
+from dados.memoria_compartilhada import Publicacao, anexar_quadro
+from dados.versao import versao_arquivo
+from graficos import galinaceos, porte, producao, sistemas
+
+GEOJSON_BR_STATES_URL = 'https://raw.githubusercontent.com/codeforamerica/click_that_hood/master/public/data/brazil-states.geojson'
+
+RAIZ = Path(__file__).resolve().parent
+
+# origem: arquivos ("censo", "descricoes") ou URL de que o artefato é calculado;
+# modulos: arquivos de código cujo conteúdo entra no hash das entradas
+Passo = namedtuple("Passo", "nome arquivo origem dependencias modulos construir parametros")
+
+# Estado de cada processo do pool, preenchido por _iniciar_trabalhador
+_caminhos = {}
+_publicado = {}
+
+
+def _iniciar_trabalhador(caminho_csv, caminho_descricoes, saida, descritor_censo):
+    _caminhos.update(csv=Path(caminho_csv), descricoes=Path(caminho_descricoes), saida=Path(saida))
+    if descritor_censo is not None:
+        # O censo lido pelo processo principal, em memória compartilhada (sem cópia)
+        _publicado["censo"] = anexar_quadro(descritor_censo)
+
+
+def _ler_artefato(nome):
+    """Artefato de uma dependência, já gravado por um passo anterior desta execução."""
+    registro = artefatos.ler_manifesto(_caminhos["saida"])[nome]
+    return artefatos.carregar(_caminhos["saida"] / registro["arquivo"])
+
+
+def _censo(colunas=None):
+    censo = _publicado.get("censo")
+    if censo is None:
+        # O instantâneo é sempre dependência de quem lê o censo
+        return ler_censo(_caminhos["csv"].with_suffix(".parquet"), colunas=colunas)
+    if colunas is None:
+        return censo.copy(deep=False)
+    # As mesmas colunas que ler_censo devolveria, na mesma ordem
+    lidas = set(colunas_leitura(colunas)) | set(colunas)
+    return censo[[col for col in censo.columns if col in lidas]]
+
+
+# ---------------------------------------------------------------------------
+# Construção de cada artefato (executada nos processos do pool)
+# ---------------------------------------------------------------------------
+
+def _instantaneo():
+    return gravar_instantaneo(_caminhos["csv"], _caminhos["csv"].with_suffix(".parquet.tmp"))
+
+
+def _descricoes():
+    # Primeira coluna: nome da variável (com espaços sobrando na planilha); segunda: descrição
+    tabela = pd.read_excel(_caminhos["descricoes"], dtype=str).dropna()
+    return {variavel.strip(): descricao.strip() for variavel, descricao in tabela.iloc[:, :2].itertuples(index=False)}
+
+
+def _cubo():
+    return montar_cubo(_censo())
+
+
+def _triagem():
+    return anomalias.triagem(_ler_artefato("cubo"))
+
+
+def _agrupamento():
+    cubo = _ler_artefato("cubo")
+    nomes_classes = dict(zip(cubo.classes["CL_GAL"], cubo.classes["NOM_CL_GAL"]))
+    # Os passos já ocupam os processos do pool: os ajustes rodam no próprio processo
+    return agrupamento.agrupar(agrupamento.matriz_perfis(cubo, "UF"), processos=0), nomes_classes
+
+
+def _regressao():
+    return producao.ajustar_modelo(producao.dados_simulados(), producao.PREDITORAS_PADRAO)
+
+
+def _geometria():
+    return galinaceos.normalizar_geojson(rede.baixar_json(GEOJSON_BR_STATES_URL, (5, 30)))
+
+
+def _figura_producao(tipo_producao):
+    return sistemas.figura_producao_por_sistema(sistemas.preparar(_censo(sistemas.COLUNAS_LIDAS)), tipo_producao)
+
+
+def _figura_porte():
+    # A seleção padrão da página 8 (E_TEM_GAL, Brasil, todos os sistemas)
+    return porte.figura_distribuicao_porte(DistribuicaoPorte(_ler_artefato("cubo")).tabela())
+
+
+def _figura_pagina4(figura):
+    if figura in ("dispersao_3d", "correlacao"):
+        df = producao.dados_simulados()
+        return getattr(producao, f"figura_{figura}")(df)
+    ajuste = _ler_artefato("regressao")
+    if figura == "coeficientes":
+        return producao.figura_coeficientes(ajuste['colunas'], ajuste['modelo'].coef_)
+    return getattr(producao, f"figura_{figura}")(ajuste['y_test'], ajuste['y_pred'])
+
+
+def listar_passos(caminho_csv=CAMINHO_CSV, com_rede=True):
+    modulo = {m.__name__: Path(m.__file__).relative_to(RAIZ).as_posix()
+              for m in (agrupamento, anomalias, galinaceos, porte, producao, sistemas)}
+    carga = ["dados/carregamento.py", "dados/derivadas.py", "dados/esquema.py"]
+    passos = [
+        Passo("instantaneo", str(Path(caminho_csv).resolve().with_suffix(".parquet")), ("censo",), (), carga,
+              _instantaneo, {}),
+        Passo("descricoes", "descricoes.json", ("descricoes",), (), [], _descricoes, {}),
+        Passo("cubo", "cubo.pkl", ("censo",), ("instantaneo",), ["dados/cubo.py"], _cubo, {}),
+        Passo("triagem", "triagem.parquet", ("censo",), ("cubo",), [modulo["dados.anomalias"]], _triagem, {}),
+        Passo("agrupamento", "agrupamento.pkl", ("censo",), ("cubo",), [modulo["dados.agrupamento"]],
+              _agrupamento, {}),
+        Passo("regressao", "regressao.pkl", (), (), [modulo["graficos.producao"]], _regressao, {}),
+        Passo("figura_porte", "figuras/porte.fig.json", ("censo",), ("cubo",),
+              [modulo["graficos.porte"], "dados/distribuicao.py"], _figura_porte, {}),
+    ]
+    for tipo in sistemas.TIPOS_PRODUCAO:
+        passos.append(Passo(f"figura_producao_{tipo}", f"figuras/producao_{tipo}.fig.json", ("censo",),
+                            ("instantaneo",), [modulo["graficos.sistemas"]], _figura_producao,
+                            {"tipo_producao": tipo}))
+    for figura in ["dispersao_3d", "correlacao", "previsoes_3d", "residuos", "coeficientes"]:
+        dependencias = () if figura in ("dispersao_3d", "correlacao") else ("regressao",)
+        passos.append(Passo(f"figura_p4_{figura}", f"figuras/p4_{figura}.fig.json", (), dependencias,
+                            [modulo["graficos.producao"]], _figura_pagina4, {"figura": figura}))
+    if com_rede:
+        passos.append(Passo("geometria", "geometria.json", ("url",), (), [modulo["graficos.galinaceos"]],
+                            _geometria, {}))
+    return passos
+
+
+def _hash_codigo(arquivos):
+    digest = hashlib.sha256(Path(__file__).read_bytes())
+    for arquivo in arquivos:
+        digest.update((RAIZ / arquivo).read_bytes())
+    return digest.hexdigest()
+
+
+def _executar(passo, saida):
+    """Executada no pool: constrói o artefato e o grava."""
+    inicio = time.perf_counter()
+    resultado = passo.construir(**passo.parametros)
+    destino = saida / passo.arquivo
+    if passo.nome == "instantaneo":
+        os.replace(resultado, destino)
+    else:
+        artefatos.gravar(resultado, destino)
+    return time.perf_counter() - inicio
+
+
+def _ordenar(passos, pedidos):
+    """Passos pedidos e as suas dependências (todos, se ``pedidos`` for vazio), em ordem topológica."""
+    por_nome = {passo.nome: passo for passo in passos}
+    desconhecidos = set(pedidos) - set(por_nome)
+    if desconhecidos:
+        raise SystemExit(f"Passos desconhecidos: {', '.join(sorted(desconhecidos))}")
+    ordem, vistos = [], set()
+
+    def visitar(nome):
+        if nome not in vistos:
+            vistos.add(nome)
+            for dependencia in por_nome[nome].dependencias:
+                visitar(dependencia)
+            ordem.append(por_nome[nome])
+
+    for nome in pedidos or por_nome:
+        visitar(nome)
+    return ordem
+
+
+def precomputar(saida=None, caminho_csv=CAMINHO_CSV, caminho_descricoes=CAMINHO_DESCRICOES, processos=None,
+                com_rede=True, forcar=False, pedidos=()):
+    saida = Path(saida or artefatos.pasta_artefatos())
+    saida.mkdir(parents=True, exist_ok=True)
+    versoes = {
+        "censo": versao_arquivo(caminho_csv),
+        "descricoes": versao_arquivo(caminho_descricoes),
+        "url": GEOJSON_BR_STATES_URL,
+    }
+    passos = _ordenar(listar_passos(caminho_csv, com_rede), pedidos)
+    manifesto = artefatos.ler_manifesto(saida)
+
+    # Hash das entradas de cada passo; as dependências entram pelo hash delas
+    hashes, pendentes = {}, set()
+    for passo in passos:
+        conteudo = json.dumps(
+            [{ativo: versoes[ativo] for ativo in passo.origem}, [hashes[d] for d in passo.dependencias],
+             _hash_codigo(passo.modulos), passo.arquivo, passo.parametros],
+            sort_keys=True, default=str,
+        )
+        hashes[passo.nome] = hashlib.sha256(conteudo.encode()).hexdigest()
+        registro = manifesto.get(passo.nome, {})
+        em_dia = registro.get("hash") == hashes[passo.nome] and (saida / passo.arquivo).exists()
+        if forcar or not em_dia or pendentes & set(passo.dependencias):
+            pendentes.add(passo.nome)
+
+    print(f"{len(passos)} artefatos; {len(passos) - len(pendentes)} em dia, {len(pendentes)} a gerar.")
+    por_nome = {passo.nome: passo for passo in passos}
+    concluidos = set(por_nome) - pendentes
+    falhas = set()
+    # Lido uma vez aqui e anexado pelos processos, se algum passo pendente usar o censo
+    le_censo = any("instantaneo" in por_nome[nome].dependencias for nome in pendentes)
+    with Publicacao() as publicacao, ProcessPoolExecutor(
+        max_workers=processos, initializer=_iniciar_trabalhador,
+        initargs=(caminho_csv, caminho_descricoes, saida,
+                  publicacao.quadro(ler_censo(caminho_csv)) if le_censo else None),
+    ) as pool:
+        em_curso = {}
+        while pendentes or em_curso:
+            # Passos cujas dependências terminaram (ou falharam, e então falham também)
+            for nome in sorted(pendentes):
+                dependencias = set(por_nome[nome].dependencias)
+                if dependencias & falhas:
+                    pendentes.discard(nome)
+                    falhas.add(nome)
+                    print(f"  PULADO {nome}: dependência falhou", file=sys.stderr)
+                elif dependencias <= concluidos:
+                    pendentes.discard(nome)
+                    em_curso[pool.submit(_executar, por_nome[nome], saida)] = nome
+            if not em_curso:
+                break
+            prontos, _ = wait(em_curso, return_when=FIRST_COMPLETED)
+            for futuro in prontos:
+                nome = em_curso.pop(futuro)
+                passo = por_nome[nome]
+                try:
+                    duracao = futuro.result()
+                except Exception as e:
+                    falhas.add(nome)
+                    print(f"  ERRO {nome}: {e}", file=sys.stderr)
+                    continue
+                manifesto[nome] = {
+                    "arquivo": passo.arquivo,
+                    "hash": hashes[nome],
+                    "origem": {ativo: versoes[ativo] for ativo in passo.origem},
+                }
+                # Gravado a cada passo: os dependentes, em outros processos, leem o artefato pelo manifesto
+                artefatos.gravar_manifesto(manifesto, saida)
+                concluidos.add(nome)
+                print(f"  {nome} ({duracao:.2f}s)")
+
+    artefatos.gravar_manifesto(manifesto, saida)
+    return len(falhas)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pré-calcula os artefatos lidos pelas páginas.")
+    parser.add_argument("passos", nargs="*", help="só estes passos (e as suas dependências); padrão: todos")
+    parser.add_argument("--saida", default=None, help=f"pasta dos artefatos (padrão: ${artefatos.VARIAVEL_AMBIENTE} "
+                                                      f"ou {artefatos.PASTA_PADRAO.relative_to(RAIZ)})")
+    parser.add_argument("--csv", default=str(CAMINHO_CSV))
+    parser.add_argument("--descricoes", default=str(CAMINHO_DESCRICOES))
+    parser.add_argument("--processos", type=int, default=None, help="processos no pool (padrão: núcleos da máquina)")
+    parser.add_argument("--sem-rede", action="store_true", help="não baixa a geometria dos estados")
+    parser.add_argument("--forcar", action="store_true", help="ignora o manifesto e gera tudo de novo")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    falhas = precomputar(args.saida, Path(args.csv), Path(args.descricoes), args.processos,
+                         com_rede=not args.sem_rede, forcar=args.forcar, pedidos=args.passos)
+    print(f"Concluído em {time.perf_counter() - inicio:.1f}s" + (f" ({falhas} falhas)" if falhas else ""))
+    sys.exit(1 if falhas else 0)